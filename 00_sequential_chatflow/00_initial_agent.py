@@ -1,38 +1,89 @@
+"""A minimal chat agent answering one prompt, or a file of prompts in batch.
+
+Batch mode answers a file of prompts offline (content generation, evaluation
+sets) with a bounded pool of concurrent requests over the shared, rate-limited
+client, appending answers to a JSONL file as they finish:
+
+    python 00_initial_agent.py --batch prompts.jsonl --output answers.jsonl --concurrency 16
+
+Each input line is a prompt, either plain text or JSON: {"prompt": "...", "id": "haiku-1"}.
+Progress is checkpointed to <output>.ckpt, so running the same command again
+after a crash continues where it stopped. See common/batch.py.
+"""
+from __future__ import annotations
+
+import argparse
 import os
-from dotenv import load_dotenv
+import sys
 import asyncio
-from semantic_kernel.agents import ChatCompletionAgent
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from typing import TYPE_CHECKING
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import rate_limiter
+from common.batch import CheckpointError, run_jsonl_batch
+from common.config import bootstrap, create_chat_service
+from common.service_registry import get_registry
+
+if TYPE_CHECKING:
+    from semantic_kernel.agents import ChatCompletionAgent
 
 # Load environment variables
-if os.path.exists('../.env'):
-    load_dotenv(dotenv_path='../.env')
-elif os.path.exists('.env'):
-    load_dotenv(dotenv_path='.env')
-else:
-    print("Warning: .env file not found. Please ensure Azure OpenAI credentials are set.")
+bootstrap()
 
 
-async def main():
+def create_agent(service=None) -> ChatCompletionAgent:
+    # Imported on first use: --help and argument errors do not pay for it
+    from semantic_kernel.agents import ChatCompletionAgent
+
     # Initialize a chat agent with basic instructions
-    agent = ChatCompletionAgent(
-        service = AzureChatCompletion(
-            deployment_name=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            endpoint=os.getenv("AZURE_OPENAI_API_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION")
-        ),
+    return ChatCompletionAgent(
+        service = service or create_chat_service(),
         name="SK-Assistant",
         instructions="You are a helpful assistant.",
     )
 
+
+async def run_batch(args: argparse.Namespace):
+    # One pooled client for every request of the batch
+    agent = create_agent(get_registry().service)
+
+    async def answer(record: dict) -> str:
+        response = await agent.get_response(messages=record["prompt"])
+        return str(response.content)
+
+    try:
+        # Interactive chats of the same process are admitted first (SK_RATE_* settings)
+        with rate_limiter.priority(rate_limiter.BATCH):
+            stats = await run_jsonl_batch(args.batch, args.output, answer, args.concurrency,
+                                          checkpoint_path=args.checkpoint or f"{args.output}.ckpt")
+    except (CheckpointError, FileExistsError) as e:
+        # Nothing was written: the output and checkpoint belong to another run
+        sys.exit(f"# {e}")
+    finally:
+        await get_registry().aclose()
+    if stats.resumed_at > 1:
+        print(f"# Resumed at line {stats.resumed_at}", file=sys.stderr)
+    print(f"# {stats.report()}", file=sys.stderr)
+
+
+async def main():
+    agent = create_agent()
+
     # Get a response to a user message
     response = await agent.get_response(messages="Write a haiku about Semantic Kernel.")
     print(response.content)
 
-asyncio.run(main()) 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer one prompt, or a JSONL file of prompts in batch.")
+    parser.add_argument("--batch", help="file of prompts (plain text or JSONL), one per line")
+    parser.add_argument("--output", default="answers.jsonl", help="JSONL file the answers are appended to")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("SK_BATCH_CONCURRENCY", 8)),
+                        help="prompts answered at the same time")
+    parser.add_argument("--checkpoint", help="progress file for resuming (default: <output>.ckpt)")
+    args = parser.parse_args()
+    asyncio.run(run_batch(args) if args.batch else main())
 
 # Output:
 # Language's essence,
 # Semantic threads intertwine,
-# Meaning's core revealed.
\ No newline at end of file
+# Meaning's core revealed.
@@ -1,255 +1,260 @@
+from __future__ import annotations
+
 import os
+import sys
+from typing import TYPE_CHECKING
+
 import chainlit as cl
-import semantic_kernel as sk
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from dotenv import load_dotenv
-from semantic_kernel.agents import ChatCompletionAgent
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common import telemetry
+from common.config import bootstrap
+from common.conversation_log import ConversationLog
+from common.service_registry import get_registry
+from common.flow_engine import ActionSpec, Transition
+from common.history import BoundedHistory, agent_summarizer, count_tokens
+from common.intent_classifier import IntentClassifier
+from common.prewarm import Prewarmer
+from common.response_cache import ResponseCache, memory_context
+from common.single_flight import SingleFlight
+from common.streaming import TokenCoalescer
+from tech_support_flow import INTENT_EXAMPLES, TECH_SUPPORT_FLOW
+from tech_support_state import TechSupportSession
+
+if TYPE_CHECKING:
+    from semantic_kernel.agents import ChatCompletionAgent
 
 # Load environment variables
-if os.path.exists('../.env'):
-    load_dotenv(dotenv_path='../.env')
-elif os.path.exists('.env'):
-    load_dotenv(dotenv_path='.env')
-else:
-    print("Warning: .env file not found. Please ensure Azure OpenAI credentials are set.")
-
-# Define conversation states
-STATE_INITIAL = "INITIAL"
-STATE_INTERNET_ASK_RESTART = "INTERNET_ASK_RESTART"
-STATE_INTERNET_RESTARTED_YES = "INTERNET_RESTARTED_YES"
-STATE_INTERNET_RESTARTED_NO = "INTERNET_RESTARTED_NO"
-STATE_SOFTWARE_ASK_NAME = "SOFTWARE_ASK_NAME"
-STATE_SOFTWARE_ASK_PROBLEM = "SOFTWARE_ASK_PROBLEM"
-STATE_HARDWARE_ASK_SYMPTOMS = "HARDWARE_ASK_SYMPTOMS"
-STATE_FINAL = "FINAL"
+bootstrap()
 
-@cl.on_chat_start
-async def on_chat_start():
-    kernel = sk.Kernel()
+SUMMARIZER_INSTRUCTIONS = "You summarize tech support conversations faithfully and concisely."
+INTENT_ROUTER_INSTRUCTIONS = (
+    "You route tech support requests. Answer with exactly one of the option names you are given, "
+    "or 'none' if no option fits. Do not add anything else."
+)
+
+# Answers to common follow-ups, shared by every session of this process
+response_cache = ResponseCache.from_env()
+
+# Identical prompts arriving together (e.g. during an outage) share one generation
+single_flight = SingleFlight()
+
+# The flow is compiled once at import time; handlers only look up transitions
+FLOW = TECH_SUPPORT_FLOW
+
+# Maps typed text to the buttons of scripted states without a model call
+intent_classifier = IntentClassifier.from_file(INTENT_EXAMPLES)
+
+# Every turn is also written to SQLite in batches, off the request path (SK_CONVERSATION_* settings)
+conversation_log = ConversationLog.from_env()
+
+# Opt-in: keeps the connection to Azure OpenAI warm and prefetches the prompt
+# of the first LLM turn while the user is still in the scripted steps (SK_PREWARM_*)
+prewarmer = Prewarmer.from_env()
+
+AGENT_INSTRUCTIONS = "You are a friendly and helpful Tech Support Bot. Follow the conversational flow provided by the system."
+
+
+def to_cl_actions(specs: tuple[ActionSpec, ...]) -> list[cl.Action]:
+    # Chainlit tracks actions by id per message, so every message gets fresh
+    # instances built from the precompiled action set
+    return [cl.Action(name=a.name, value=a.value, label=a.label, payload={"value": a.value}) for a in specs]
+
+
+def conversation_id() -> str:
+    # The thread id survives reconnects, the Chainlit session id does not
+    return cl.context.session.thread_id
+
+
+def current_session() -> TechSupportSession | None:
+    """The session's state, read once per event; ``None`` if it failed to start."""
+    return cl.user_session.get("session")
+
+
+async def start_session(history: BoundedHistory, state: str) -> TechSupportSession | None:
+    """Set up the session's agent, history and state; report errors to the user."""
     try:
-        ai_service = AzureChatCompletion(
-            deployment_name=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            endpoint=os.getenv("AZURE_OPENAI_API_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION")
-        )
-        kernel.add_service(ai_service)
+        # The kernel, chat service and agent are shared by every session of this process
+        # Agent instructions are minimal as the flow is mostly scripted
+        agent = get_registry().agent(name="TechSupportBot", instructions=AGENT_INSTRUCTIONS)
+        summarizer = get_registry().agent(name="Summarizer", instructions=SUMMARIZER_INSTRUCTIONS)
     except Exception as e:
         await cl.Message(content=f"Error initializing AI service: {e}").send()
+        return None
+
+    # Bounded window of recent turns; older turns are summarized in the background
+    history.summarizer = agent_summarizer(summarizer)
+    # Everything a handler needs, under one key and changed in place
+    session = TechSupportSession(agent, history, state, conversation_id())
+    cl.user_session.set("session", session)
+    return session
+
+
+@cl.on_chat_start
+async def on_chat_start():
+    session = await start_session(BoundedHistory(), FLOW.initial_state)
+    if session is None:
         return
+    # In the background: the welcome message does not wait for the handshake
+    prewarmer.start()
+    welcome = FLOW.start()
+    await cl.Message(content=welcome.response, actions=to_cl_actions(welcome.actions), author=session.agent.name).send()
+    conversation_log.record(session.conversation_id, "assistant", welcome.response, welcome.next_state)
+
+
+@cl.on_chat_resume
+async def on_chat_resume(thread: dict):
+    """Rebuild the history window, the flow state and remembered values from the conversation log."""
+    history = BoundedHistory()
+    # Only the window is rehydrated; added before the summarizer is set so
+    # nothing is sent to the model while rebuilding
+    turns = await conversation_log.turns(thread["id"], last=history.max_turns)
+    for turn in turns:
+        history.append({"role": turn.role, "content": turn.content})
+    state = turns[-1].state if turns and turns[-1].state in FLOW.states else FLOW.initial_state
+    session = await start_session(history, state)
+    if session is not None:
+        for name, value in (await conversation_log.memory(thread["id"])).items():
+            session.remember(name, value)
+
+
+async def apply_transition(session: TechSupportSession, transition: Transition, user_entry: str,
+                           user_input: str = ""):
+    """Log the user's turn, answer it (scripted or via the LLM) and move to the next state."""
+    agent = session.agent
+    cl_history = session.history
+    state = session.state
+    cl_history.append({"role": "user", "content": user_entry})
+    # Logged before answering, so a failed or interrupted answer still leaves the question
+    conversation_log.record(session.conversation_id, "user", user_entry, state)
+
+    if transition.llm:
+        response_content = await respond_with_llm(session, user_input, transition.response)
+    else:
+        if transition.store:
+            session.remember(transition.store, user_input)
+            conversation_log.remember(session.conversation_id, transition.store, user_input)
+        response_content = transition.response
+        await telemetry.timed("ui.send", cl.Message(
+            content=response_content, actions=to_cl_actions(transition.actions), author=agent.name).send())
 
-    # Agent instructions are minimal as the flow is mostly scripted
-    agent_instructions = "You are a friendly and helpful Tech Support Bot. Follow the conversational flow provided by the system."
-    agent = ChatCompletionAgent(kernel=kernel, name="TechSupportBot", instructions=agent_instructions)
-
-    cl.user_session.set("agent", agent)
-    cl.user_session.set("conversation_state", STATE_INITIAL)
-    cl.user_session.set("cl_history", [])
-    # Store the agent for use in action callbacks if needed
-    cl.user_session.set("tech_support_agent", agent)
-
-
-    initial_actions = [
-        cl.Action(name="internet_issue", value="Internet Issue", label="Internet Issue", payload={"value": "Internet Issue"}),
-        cl.Action(name="software_problem", value="Software Problem", label="Software Problem", payload={"value": "Software Problem"}),
-        cl.Action(name="hardware_failure", value="Hardware Failure", label="Hardware Failure", payload={"value": "Hardware Failure"}),
-    ]
-    await cl.Message(
-        content="Welcome to Tech Support! How can I help you today? Please choose an option:",
-        actions=initial_actions,
-        author=agent.name
-    ).send()
-
-async def send_response_after_action(
-    triggering_action: cl.Action,
-    response_content: str,
-    new_actions_to_present: list[cl.Action],
-    next_state: str,
-    author_name: str = "TechSupportBot"
-):
-    """Helper function to log user action, send message, update history and state."""
-    cl_history: list = cl.user_session.get("cl_history", [])
-
-    # Log the action the user just took, using the label for readability
-    cl_history.append({"role": "user", "content": f"Action: {triggering_action.label}"})
-
-    # Send the bot's response message with new actions
-    await cl.Message(content=response_content, actions=new_actions_to_present, author=author_name).send()
-
-    # Log the assistant's response
     cl_history.append({"role": "assistant", "content": response_content})
+    conversation_log.record(session.conversation_id, "assistant", response_content, transition.next_state)
+    session.move_to(transition.next_state)
+    if not transition.llm and FLOW.hands_off(transition.next_state):
+        # The user's next message goes to the model after this very prompt
+        prewarmer.speculate(agent, cl_history.to_chat_messages(),
+                            cl_history.prompt_tokens + count_tokens(agent.instructions))
+
+
+async def stream_from_agent(agent: ChatCompletionAgent, messages: list):
+    async for response in agent.invoke_stream(messages=messages):
+        if response.message.content:
+            yield response.message.content
+
+
+async def respond_with_llm(session: TechSupportSession, user_input: str, fallback: str) -> str:
+    """Stream a generic follow-up from the LLM (or the response cache) and return the full answer."""
+    agent: ChatCompletionAgent = session.agent
+    turn = telemetry.current_turn()
+    response_msg_llm = cl.Message(content="", author=agent.name)
+    # First token goes out at once, the rest in batches (SK_STREAM_FLUSH_* settings)
+    stream = TokenCoalescer(turn.wrap("ui.send", response_msg_llm.stream_token))
+
+    # Follow-ups on the same topic share answers, as long as the remembered
+    # values that topic's prompt mentions (e.g. the software) are the same
+    context = memory_context(session.memory, FLOW.memory_fields(session.topic))
+    cache_key = response_cache.key(user_input, agent.name, session.topic, context)
+    # The prompt is the running summary plus the recent window (which ends with
+    # the user's message), so its size stays flat however long the chat runs
+    messages = session.history.to_chat_messages()
+    flight_key = single_flight.key(agent, messages)
+
+    def generate():
+        return single_flight.stream(flight_key, lambda: stream_from_agent(agent, messages))
+
+    with turn.span("llm.generation"):
+        try:
+            async for token in response_cache.stream(cache_key, generate):
+                turn.first_token()
+                await stream.push(token)
+        finally:
+            # Also on errors: sends what was buffered and stops the flush timer
+            await stream.aclose()
+    full_llm_response = stream.text
+
+    if response_msg_llm.streaming:
+        await telemetry.timed("ui.send", response_msg_llm.send())
+    elif full_llm_response:
+        response_msg_llm.content = full_llm_response
+        await telemetry.timed("ui.send", response_msg_llm.send())
+    else:
+        await telemetry.timed("ui.send", cl.Message(content=fallback, author=agent.name).send())
+
+    return full_llm_response or fallback
+
+
+async def classify_with_llm(user_input: str, labels: tuple[str, ...], state: str) -> str | None:
+    """Ask the model which of ``labels`` the text means; answers are cached per state."""
+    cache_key = response_cache.key(user_input, "IntentRouter", state)
+    answer = response_cache.get(cache_key) if cache_key else None
+    if answer is None:
+        try:
+            router = get_registry().agent(name="IntentRouter", instructions=INTENT_ROUTER_INSTRUCTIONS)
+            response = await router.get_response(
+                messages=f"Options: {', '.join(labels)}\nUser message: {user_input}")
+        except Exception:
+            return None
+        answer = str(response.message.content).strip().strip("'\"`.").lower()
+        if cache_key:
+            response_cache.put(cache_key, answer)
+    return answer if answer in labels else None
+
+
+async def resolve_intent(state: str, user_input: str) -> str | None:
+    """Action the user's text stands for in a classify state, or ``None``."""
+    labels = FLOW.intent_labels(state)
+    if not labels:
+        return None
+    with telemetry.current_turn().span("intent"):
+        intent = intent_classifier.predict(user_input, labels)
+    if intent is not None:
+        return intent.label
+    # Only text the classifier is unsure about costs a model call
+    return await classify_with_llm(user_input, labels, state)
+
+
+async def on_action(action: cl.Action):
+    session = current_session()
+    if session is None:
+        await cl.Message(content="Agent not initialized. Please restart chat.").send()
+        return
+    state = session.state
+    with telemetry.turn("action", state=state) as turn:
+        with turn.span("transition"):
+            transition = FLOW.dispatch(state, action=action.name)
+        # Log the action the user just took, using the label for readability
+        await apply_transition(session, transition, f"Action: {action.label}")
 
-    # Update history and state in the session
-    cl.user_session.set("cl_history", cl_history)
-    cl.user_session.set("conversation_state", next_state)
-
-@cl.action_callback("internet_issue")
-async def on_action_internet_issue(action: cl.Action):
-    agent: ChatCompletionAgent = cl.user_session.get("tech_support_agent")
-    response_content = "Okay, for Internet Issues, have you tried restarting your modem and router?"
-    new_actions = [
-        cl.Action(name="internet_restarted_yes", value="Yes", label="Yes, I tried", payload={"value": "Yes"}),
-        cl.Action(name="internet_restarted_no", value="No", label="No, I haven't", payload={"value": "No"}),
-    ]
-    await send_response_after_action(action, response_content, new_actions, STATE_INTERNET_ASK_RESTART, agent.name)
-
-@cl.action_callback("software_problem")
-async def on_action_software_problem(action: cl.Action):
-    agent: ChatCompletionAgent = cl.user_session.get("tech_support_agent")
-    response_content = "For Software Problems, which software are you having trouble with? Please type the name."
-    await send_response_after_action(action, response_content, [], STATE_SOFTWARE_ASK_NAME, agent.name)
-
-@cl.action_callback("hardware_failure")
-async def on_action_hardware_failure(action: cl.Action):
-    agent: ChatCompletionAgent = cl.user_session.get("tech_support_agent")
-    response_content = "I'm sorry to hear you're having a hardware failure. To help us diagnose it, please describe the symptoms you're observing."
-    await send_response_after_action(action, response_content, [], STATE_HARDWARE_ASK_SYMPTOMS, agent.name)
-
-@cl.action_callback("internet_restarted_yes")
-async def on_action_internet_restarted_yes(action: cl.Action):
-    agent: ChatCompletionAgent = cl.user_session.get("tech_support_agent")
-    response_content = "Got it. Could you please describe the issue in more detail? For example, are websites loading slowly, or are you completely disconnected?"
-    await send_response_after_action(action, response_content, [], STATE_INTERNET_RESTARTED_YES, agent.name)
-
-@cl.action_callback("internet_restarted_no")
-async def on_action_internet_restarted_no(action: cl.Action):
-    agent: ChatCompletionAgent = cl.user_session.get("tech_support_agent")
-    response_content = "Please try restarting your modem and router first. This often resolves common connectivity issues. Let me know if that helps!"
-    await send_response_after_action(action, response_content, [], STATE_INTERNET_RESTARTED_NO, agent.name)
-
-
-@cl.action_callback("start_over")
-async def on_action_start_over(action: cl.Action): # 'action' is the "start_over" action
-    agent: ChatCompletionAgent = cl.user_session.get("tech_support_agent")
-    response_content = "Welcome back to Tech Support! How can I help you today? Please choose an option:"
-    new_actions = [
-        cl.Action(name="internet_issue", value="Internet Issue", label="Internet Issue", payload={"value": "Internet Issue"}),
-        cl.Action(name="software_problem", value="Software Problem", label="Software Problem", payload={"value": "Software Problem"}),
-        cl.Action(name="hardware_failure", value="Hardware Failure", label="Hardware Failure", payload={"value": "Hardware Failure"}),
-    ]
-    # The helper will log "Action: Start Over" (using action.label)
-    # and then send the response_content with new_actions.
-    # It will also set the state to STATE_INITIAL.
-    await send_response_after_action(action, response_content, new_actions, STATE_INITIAL, agent.name)
+
+# One callback serves every button of the flow
+for action_name in FLOW.action_names:
+    cl.action_callback(action_name)(on_action)
 
 
 @cl.on_message
 async def on_message(message: cl.Message):
-    agent: ChatCompletionAgent = cl.user_session.get("agent") # or "tech_support_agent"
-    state: str = cl.user_session.get("conversation_state")
-    cl_history: list = cl.user_session.get("cl_history", [])
-
-    if not agent:
+    session = current_session()
+    if session is None:
         await cl.Message(content="Agent not initialized. Please restart chat.").send()
         return
 
-    user_input = message.content
-    cl_history.append({"role": "user", "content": str(user_input)})
-
-    response_content = ""
-    actions = []
-    next_state = state
-    send_standard_response = True
-
-
-    if state == STATE_INITIAL:
-        # This state should ideally be handled by action callbacks.
-        # If user types something unexpected here.
-        response_content = "Sorry, I didn\'t understand that. Please choose one of the options above."
-        actions = [
-            cl.Action(name="internet_issue", value="Internet Issue", label="Internet Issue", payload={"value": "Internet Issue"}),
-            cl.Action(name="software_problem", value="Software Problem", label="Software Problem", payload={"value": "Software Problem"}),
-            cl.Action(name="hardware_failure", value="Hardware Failure", label="Hardware Failure", payload={"value": "Hardware Failure"}),
-        ]
-        next_state = STATE_INITIAL
-
-    elif state == STATE_INTERNET_ASK_RESTART:
-        # This state is now primarily handled by internet_restarted_yes/no actions
-        # If user types something instead of clicking Yes/No
-        response_content = "Please select \'Yes\' or \'No\' using the buttons."
-        actions = [
-            cl.Action(name="internet_restarted_yes", value="Yes", label="Yes, I tried", payload={"value": "Yes"}),
-            cl.Action(name="internet_restarted_no", value="No", label="No, I haven\'t", payload={"value": "No"}),
-        ]
-        next_state = STATE_INTERNET_ASK_RESTART
-
-    elif state == STATE_INTERNET_RESTARTED_YES: # User describes the issue
-        response_content = f"Thank you for the details about your internet issue: \'{user_input}\'. We\'ll look into it. Is there anything else I can help with today?"
-        next_state = STATE_FINAL
-        actions = [cl.Action(name="start_over", value="Start Over", label="Start Over", payload={"value": "Start Over"})]
-
-    elif state == STATE_INTERNET_RESTARTED_NO: # User confirms if they restarted or describes issue
-        # This state might need refinement based on what user types after being told to restart.
-        # For now, assume they are providing more details or confirming restart.
-        response_content = f"Okay, you mentioned: \'{user_input}\'. If restarting didn\'t help or you have other concerns, let me know. Otherwise, is there anything else?"
-        next_state = STATE_FINAL
-        actions = [cl.Action(name="start_over", value="Start Over", label="Start Over", payload={"value": "Start Over"})]
-
-    elif state == STATE_SOFTWARE_ASK_NAME:
-        cl.user_session.set("software_name", user_input) # Store software name
-        response_content = f"Okay, and what specific problem are you experiencing with {user_input}?"
-        next_state = STATE_SOFTWARE_ASK_PROBLEM
-
-    elif state == STATE_SOFTWARE_ASK_PROBLEM:
-        software_name = cl.user_session.get("software_name", "the software")
-        response_content = f"Thanks for explaining the issue with {software_name}: '{user_input}'. We'll investigate this. Can I help with anything else?"
-        next_state = STATE_FINAL
-        actions = [cl.Action(name="start_over", value="Start Over", label="Start Over", payload={"value": "Start Over"})]
-
-    elif state == STATE_HARDWARE_ASK_SYMPTOMS:
-        response_content = f"Thank you for describing the hardware symptoms: '{user_input}'. A specialist will review this. Is there further assistance you need?"
-        next_state = STATE_FINAL
-        actions = [cl.Action(name="start_over", value="Start Over", label="Start Over", payload={"value": "Start Over"})]
-    
-    elif state == STATE_FINAL:
-        if user_input.lower() == "start over": # Handle typed "start over"
-            await on_action_start_over(cl.Action(name="start_over", value="Start Over", label="Start Over"))
-            send_standard_response = False # on_action_start_over handles its own response
-        else:
-            # Use LLM for generic follow-up
-            send_standard_response = False # LLM part will send its own message
-            response_msg_llm = cl.Message(content="", author=agent.name)
-            full_llm_response = ""
-            # Ensure thread is initialized for LLM interaction if not already
-            thread_id = cl.user_session.get("thread_id") 
-            if not thread_id:
-                # Create a new thread if one doesn't exist.
-                # This part depends on how your ChatCompletionAgent handles threads.
-                # For simplicity, let's assume invoke_stream can handle a None thread or creates one.
-                # Or, you might need to create/get a thread_id explicitly here.
-                # For now, we'll pass what we have.
-                pass
-
-
-            async for chunk in agent.invoke_stream(user_input=user_input, thread_id=thread_id): # Pass thread_id
-                if hasattr(chunk, 'content') and chunk.content:
-                    await response_msg_llm.stream_token(chunk.content)
-                    full_llm_response += chunk.content
-                # Update thread_id if the agent provides it
-                if hasattr(chunk, 'thread_id') and chunk.thread_id:
-                     cl.user_session.set("thread_id", chunk.thread_id)
-                elif hasattr(chunk, 'thread') and hasattr(chunk.thread, 'id'): # Alternative way thread might be passed
-                     cl.user_session.set("thread_id", chunk.thread.id)
-
-            if response_msg_llm.streaming:
-                await response_msg_llm.send()
-            elif full_llm_response:
-                response_msg_llm.content = full_llm_response
-                await response_msg_llm.send()
-            else:
-                await cl.Message(content="Is there anything specific I can help you with regarding that?", author=agent.name).send()
-            
-            cl_history.append({"role": "assistant", "content": full_llm_response or "Is there anything specific I can help you with regarding that?"})
-            cl.user_session.set("cl_history", cl_history)
-            # STATE_FINAL remains STATE_FINAL unless "Start Over"
-            cl.user_session.set("conversation_state", STATE_FINAL)
-
-
-    if send_standard_response:
-        await cl.Message(content=response_content, actions=actions, author=agent.name).send()
-        cl_history.append({"role": "assistant", "content": response_content})
-        cl.user_session.set("conversation_state", next_state)
-    
-    cl.user_session.set("cl_history", cl_history)
-
-# To run: chainlit run examples/13_multi_choice_agent.py -w
+    state = session.state
+    user_input = str(message.content)
+    with telemetry.turn("message", state=state) as turn:
+        action = await resolve_intent(state, user_input)
+        with turn.span("transition"):
+            transition = FLOW.dispatch(state, action=action, text=user_input, memory=session.memory)
+        await apply_transition(session, transition, user_input, user_input)
+
+# To run: chainlit run 00_sequential_chatflow/02_multi_choice_agent.py -w
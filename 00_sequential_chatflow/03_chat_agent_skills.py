@@ -1,58 +1,86 @@
 import chainlit as cl
-from semantic_kernel import Kernel
-from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
 import os
+import sys
 
-# Initialize Semantic Kernel once
-kernel = Kernel()
-kernel.add_text_completion_service(
-    "openai", OpenAIChatCompletion("gpt-4", api_key="your-openai-api-key")
-)
-welcome_skill = Kernel.read_skill_from_directory("skills", "WelcomeSkill")
-generate_welcome = welcome_skill["generate_welcome_message"]
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.config import bootstrap, get_settings
+from common.prompt_templates import KernelSkill
+from common.service_registry import get_registry
+from common.telemetry import instrument_kernel
+from common.session_store import SessionStore
+from onboarding_state import OnboardingState
 
-# Store session state
-user_state = {}
+# Load environment variables
+bootstrap()
+
+SKILLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills")
+WELCOME_SKILL = "WelcomeSkill"
+
+# Store session state, keyed by the Chainlit thread id (SK_SESSION_* settings)
+sessions = SessionStore.from_env(OnboardingState)
+
+
+def conversation_id() -> str:
+    # The thread id survives reconnects and restarts, the Chainlit session id does not
+    return cl.context.session.thread_id
+
+
+# The skill, registered on a kernel of its own on first use
+welcome_skill: KernelSkill | None = None
+
+
+def get_kernel():
+    global welcome_skill
+    if welcome_skill is None:
+        from semantic_kernel import Kernel
+
+        # A kernel of its own on the shared chat service: every agent on the
+        # registry's kernel would otherwise be offered the skill as a tool
+        kernel = Kernel()
+        kernel.add_service(get_registry().service)
+        welcome_skill = KernelSkill(instrument_kernel(kernel), SKILLS_DIR, WELCOME_SKILL)
+    # A cache lookup per function; the skill is only re-added after its files changed
+    return welcome_skill.refresh()
 
 
 @cl.on_chat_start
 async def on_chat_start():
     try:
-        ai_service = AzureChatCompletion(
-            deployment_name=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            endpoint=os.getenv("AZURE_OPENAI_API_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION")
-        )
-        kernel.add_service(ai_service)
+        get_settings().require()
     except Exception as e:
         await cl.Message(content=f"Error initializing AI service: {e}").send()
         return
 
     await cl.Message(content="Hi! Welcome to Acme Software. Let's get you onboarded.").send()
     await cl.Message(content="What’s your name?").send()
-    user_state["next_step"] = "ask_company"
+    user_state = await sessions.aget(conversation_id())
+    user_state.next_step = "ask_company"
+    await sessions.asave(user_state)
 
 @cl.on_message
 async def on_message(message: cl.Message):
-    next_step = user_state.get("next_step")
+    user_state = await sessions.aget(conversation_id())
+    next_step = user_state.next_step
 
     if next_step == "ask_company":
-        user_state["name"] = message.content.strip()
-        await cl.Message(content=f"Great, {user_state['name']}! What's the name of your company?").send()
-        user_state["next_step"] = "complete"
+        user_state.name = message.content.strip()
+        user_state.next_step = "complete"
+        await sessions.asave(user_state)
+        await cl.Message(content=f"Great, {user_state.name}! What's the name of your company?").send()
 
     elif next_step == "complete":
-        user_state["company"] = message.content.strip()
-        user_state["next_step"] = "finshed"
+        user_state.company = message.content.strip()
+        user_state.next_step = "finshed"
+        await sessions.asave(user_state)
 
         # Call Semantic Kernel
         context = {
-            "name": user_state["name"],
-            "company": user_state["company"]
+            "name": user_state.name,
+            "company": user_state.company
         }
-        welcome_msg = await kernel.run_async(generate_welcome, input_context=context)
+        welcome_msg = await get_kernel().invoke(
+            plugin_name=WELCOME_SKILL, function_name="generate_welcome_message", **context
+        )
 
         await cl.Message(content=str(welcome_msg)).send()
         await cl.Message(content="Thanks! You're all set.").send()
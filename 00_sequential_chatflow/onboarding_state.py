@@ -0,0 +1,10 @@
+"""Session record of the onboarding chat (01_simple_chat_agent.py, 03_chat_agent_skills.py)."""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.session_store import SessionRecord
+
+
+class OnboardingState(SessionRecord):
+    __slots__ = ("next_step", "name", "company")
@@ -0,0 +1,112 @@
+"""Conversation flow of the multi-choice Tech Support bot (02_multi_choice_agent.py).
+
+Kept free of Chainlit imports so the flow can be compiled and benchmarked on
+its own.
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.flow_engine import ActionSpec, Flow, FlowSpec, StateSpec, Step
+
+# Define conversation states
+STATE_INITIAL = "INITIAL"
+STATE_INTERNET_ASK_RESTART = "INTERNET_ASK_RESTART"
+STATE_INTERNET_RESTARTED_YES = "INTERNET_RESTARTED_YES"
+STATE_INTERNET_RESTARTED_NO = "INTERNET_RESTARTED_NO"
+STATE_SOFTWARE_ASK_NAME = "SOFTWARE_ASK_NAME"
+STATE_SOFTWARE_ASK_PROBLEM = "SOFTWARE_ASK_PROBLEM"
+STATE_HARDWARE_ASK_SYMPTOMS = "HARDWARE_ASK_SYMPTOMS"
+STATE_FINAL = "FINAL"
+
+TECH_SUPPORT_SPEC = FlowSpec(
+    start=Step(
+        "Welcome to Tech Support! How can I help you today? Please choose an option:",
+        STATE_INITIAL, actions="main_menu",
+    ),
+    action_sets={
+        "main_menu": (
+            ActionSpec("internet_issue", "Internet Issue", "Internet Issue"),
+            ActionSpec("software_problem", "Software Problem", "Software Problem"),
+            ActionSpec("hardware_failure", "Hardware Failure", "Hardware Failure"),
+        ),
+        "internet_restart": (
+            ActionSpec("internet_restarted_yes", "Yes, I tried", "Yes"),
+            ActionSpec("internet_restarted_no", "No, I haven't", "No"),
+        ),
+        "start_over": (
+            ActionSpec("start_over", "Start Over", "Start Over"),
+        ),
+    },
+    # What each button leads to
+    actions={
+        "internet_issue": Step(
+            "Okay, for Internet Issues, have you tried restarting your modem and router?",
+            STATE_INTERNET_ASK_RESTART, actions="internet_restart",
+        ),
+        "software_problem": Step(
+            "For Software Problems, which software are you having trouble with? Please type the name.",
+            STATE_SOFTWARE_ASK_NAME,
+        ),
+        "hardware_failure": Step(
+            "I'm sorry to hear you're having a hardware failure. To help us diagnose it, please describe the symptoms you're observing.",
+            STATE_HARDWARE_ASK_SYMPTOMS,
+        ),
+        "internet_restarted_yes": Step(
+            "Got it. Could you please describe the issue in more detail? For example, are websites loading slowly, or are you completely disconnected?",
+            STATE_INTERNET_RESTARTED_YES,
+        ),
+        "internet_restarted_no": Step(
+            "Please try restarting your modem and router first. This often resolves common connectivity issues. Let me know if that helps!",
+            STATE_INTERNET_RESTARTED_NO,
+        ),
+        "start_over": Step(
+            "Welcome back to Tech Support! How can I help you today? Please choose an option:",
+            STATE_INITIAL, actions="main_menu",
+        ),
+    },
+    # What typed input leads to in each state. In classify states typed text
+    # is first matched to one of the buttons; the step below is the answer
+    # when neither the intent classifier nor the LLM recognizes it
+    states={
+        STATE_INITIAL: StateSpec(Step(
+            "Sorry, I didn't understand that. Please choose one of the options above.",
+            STATE_INITIAL, actions="main_menu",
+        ), classify=True),
+        STATE_INTERNET_ASK_RESTART: StateSpec(Step(
+            "Please select 'Yes' or 'No' using the buttons.",
+            STATE_INTERNET_ASK_RESTART, actions="internet_restart",
+        ), classify=True),
+        STATE_INTERNET_RESTARTED_YES: StateSpec(Step(
+            "Thank you for the details about your internet issue: '{input}'. We'll look into it. Is there anything else I can help with today?",
+            STATE_FINAL, actions="start_over",
+        )),
+        STATE_INTERNET_RESTARTED_NO: StateSpec(Step(
+            "Okay, you mentioned: '{input}'. If restarting didn't help or you have other concerns, let me know. Otherwise, is there anything else?",
+            STATE_FINAL, actions="start_over",
+        )),
+        STATE_SOFTWARE_ASK_NAME: StateSpec(Step(
+            "Okay, and what specific problem are you experiencing with {input}?",
+            STATE_SOFTWARE_ASK_PROBLEM, store="software_name",
+        )),
+        STATE_SOFTWARE_ASK_PROBLEM: StateSpec(Step(
+            "Thanks for explaining the issue with {software_name}: '{input}'. We'll investigate this. Can I help with anything else?",
+            STATE_FINAL, actions="start_over",
+        )),
+        STATE_HARDWARE_ASK_SYMPTOMS: StateSpec(Step(
+            "Thank you for describing the hardware symptoms: '{input}'. A specialist will review this. Is there further assistance you need?",
+            STATE_FINAL, actions="start_over",
+        )),
+        # Free-text follow-ups go to the LLM; typing "start over" works like the button
+        STATE_FINAL: StateSpec(
+            Step("Is there anything specific I can help you with regarding that?", STATE_FINAL, llm=True),
+            commands={"start over": "start_over"},
+        ),
+    },
+    defaults={"software_name": "the software"},
+)
+
+TECH_SUPPORT_FLOW = Flow(TECH_SUPPORT_SPEC)
+
+# Example phrases for the buttons of the classify states
+INTENT_EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tech_support_intents.json")
@@ -0,0 +1,37 @@
+"""Session state of the multi-choice tech support bot (02_multi_choice_agent.py).
+
+A worker may hold tens of thousands of open chats, most of them idle, so the
+state of one is a single ``__slots__`` object stored under one
+``cl.user_session`` key. Handlers fetch it once per event and change it in
+place:
+
+- ``agent`` references the registry's agent shared by every session,
+- flow states are interned, so sessions in the same state share one string
+  (also those restored from the conversation log),
+- values the flow remembers (``Step.store``) live in ``memory``, which is
+  only created when the first one is stored.
+"""
+import sys
+
+
+class TechSupportSession:
+    __slots__ = ("agent", "history", "state", "topic", "memory", "conversation_id")
+
+    def __init__(self, agent, history, state: str, conversation_id: str):
+        self.agent = agent
+        self.history = history
+        self.state = sys.intern(state)
+        self.topic: str | None = None     # state the conversation came from, for follow-up caching
+        self.memory: dict[str, str] | None = None
+        self.conversation_id = conversation_id
+
+    def move_to(self, state: str):
+        if state != self.state:
+            # The state we came from tells what the follow-ups are about
+            self.topic = self.state
+            self.state = sys.intern(state)
+
+    def remember(self, name: str, value: str):
+        if self.memory is None:
+            self.memory = {}
+        self.memory[name] = value
@@ -1,57 +1,140 @@
 import asyncio
+import json
 import os
-from dotenv import load_dotenv
-from typing import Annotated
-from pydantic import BaseModel
+import sys
+from typing import Annotated, Any, Callable
 from semantic_kernel.agents import ChatCompletionAgent
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion, OpenAIChatPromptExecutionSettings
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
 from semantic_kernel.functions import kernel_function, KernelArguments
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from menu_catalog import MenuCatalog, MenuItem, MenuItems, load_catalog
+from common.config import bootstrap
+from common.json_stream import parse_stream
+from common.plugin_executor import get_plugin_executor
+from common.service_registry import get_registry
+
 # Load environment variables
-if os.path.exists('../.env'):
-    load_dotenv(dotenv_path='../.env')
-elif os.path.exists('.env'):
-    load_dotenv(dotenv_path='.env')
-else:
-    print("Warning: .env file not found. Please ensure Azure OpenAI credentials are set.")
+bootstrap()
 
 class MenuPlugin:
+    """Menu tools backed by the indexed catalog in data/menu.json.
+
+    The batch functions answer a whole order in one tool call instead of one
+    round trip per item.
+    """
+
+    def __init__(self, catalog: MenuCatalog | None = None):
+        self.catalog = catalog or load_catalog()
+
     @kernel_function(description="Provides a list of specials from the menu.")
     def get_specials(self) -> Annotated[str, "Returns the specials from the menu."]:
-        return """
-        Special Soup: Clam Chowder
-        Special Salad: Cobb Salad
-        Special Drink: Chai Tea
-        """
+        return self.catalog.specials_text
 
     @kernel_function(description="Provides the price of the requested menu item.")
     def get_item_price(
         self, menu_item: Annotated[str, "The name of the menu item."]
     ) -> Annotated[str, "Returns the price of the menu item."]:
-        return "$9.99"
+        entry = self.catalog.lookup(menu_item)
+        if entry is not None:
+            return f"${entry.price:.2f}"
+        candidates = self.catalog.candidates(menu_item)
+        if candidates:
+            # Let the model ask which one was meant rather than pick for the user
+            return f"'{menu_item}' could mean: {', '.join(self._describe(e) for e in candidates)}. Ask which one."
+        return f"{menu_item} is not on the menu."
 
-class MenuItem(BaseModel):
-    price: float
-    name: str
+    @kernel_function(description="Provides the prices of several menu items in one call.")
+    def get_item_prices(
+        self, menu_items: Annotated[list[str], "The names of the menu items, e.g. ['soup special', 'cobb salad']."]
+    ) -> Annotated[str, "Returns a JSON list of {query, name, price}; name and price are null for unknown or "
+                        "ambiguous items, which list the 'candidates' to ask about or 'suggestions'."]:
+        return json.dumps([self._item(query) for query in menu_items])
 
-async def main():
+    @kernel_function(description="Describes several menu items (category, description, price) in one call.")
+    def describe_items(
+        self, menu_items: Annotated[list[str], "The names of the menu items."]
+    ) -> Annotated[str, "Returns a JSON list of {query, name, price, category, description}."]:
+        results = []
+        for query in menu_items:
+            result = self._item(query)
+            entry = self.catalog.lookup(query)
+            if entry is not None:
+                result.update(category=entry.category, description=entry.description)
+            results.append(result)
+        return json.dumps(results)
+
+    def _item(self, query: str) -> dict:
+        entry = self.catalog.lookup(query)
+        if entry is not None:
+            return {"query": query, **entry.as_item().model_dump()}
+        candidates = self.catalog.candidates(query)
+        if candidates:
+            return {"query": query, "name": None, "price": None,
+                    "candidates": [self._describe(e) for e in candidates]}
+        return {"query": query, "name": None, "price": None, "suggestions": self.catalog.suggestions(query)}
+
+    @staticmethod
+    def _describe(entry) -> str:
+        return f"{entry.name} (the {entry.special.lower()} special)" if entry.special else entry.name
+
+def create_agent(service=None) -> ChatCompletionAgent:
     # Configure structured output format
     settings = OpenAIChatPromptExecutionSettings()
     settings.response_format = MenuItem
 
-    # Create agent with plugin and settings
+    # The menu functions run on the shared plugin thread pool, so the tool
+    # calls of one turn run in parallel and never block other sessions
+    executor = get_plugin_executor()
+
+    # Create agent with plugin and settings; the shared service records or
+    # replays its traffic when SK_CASSETTE is set (see common/cassette.py)
     agent = ChatCompletionAgent(
-        service = AzureChatCompletion(
-            deployment_name=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            endpoint=os.getenv("AZURE_OPENAI_API_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION")
-        ),
+        service = service or get_registry().service,
         name="SK-Assistant",
         instructions="You are a helpful assistant.",
-        plugins=[MenuPlugin()],
+        plugins=[executor.offload(MenuPlugin())],
         arguments=KernelArguments(settings)
     )
+    agent.kernel.add_filter("function_invocation", executor)
+    return agent
+
+
+def with_response_format(agent: ChatCompletionAgent, target) -> ChatCompletionAgent:
+    """``agent`` answering in the JSON schema of ``target``, leaving ``agent`` itself unchanged.
+
+    The agent merges per-call ``arguments`` into its own execution settings in
+    place, so the format is set on a shallow copy (same kernel and plugins).
+    """
+    settings = OpenAIChatPromptExecutionSettings()
+    settings.response_format = target
+    return agent.model_copy(update={"arguments": KernelArguments(settings)})
+
+
+async def stream_structured(agent: ChatCompletionAgent, question: str, target=MenuItem,
+                            on_field: Callable[[str, Any], Any] | None = None,
+                            on_item: Callable[[int, Any], Any] | None = None):
+    """Ask ``question`` and parse the JSON answer, requested in ``target``'s schema, while it streams.
+
+    ``on_field(name, value)`` fires as soon as a field of the answer is
+    complete and ``on_item(index, item)`` with each element of a list field
+    (e.g. ``target=MenuItems``; the response format cannot be a bare list),
+    well before generation ends; the final object is validated against
+    ``target`` once and returned.
+    """
+    structured = with_response_format(agent, target)
+
+    async def chunks():
+        async for response in structured.invoke_stream(messages=question):
+            if response.message.content:
+                yield str(response.message.content)
+
+    return await parse_stream(chunks(), target, on_field=on_field, on_item=on_item)
+
+
+async def main():
+    agent = create_agent()
 
     response = await agent.get_response(messages="What is the price of the soup special?")
     print(response.content)
@@ -59,4 +142,17 @@ async def main():
     # Output:
     # The price of the Clam Chowder, which is the soup special, is $9.99.
 
-asyncio.run(main()) 
\ No newline at end of file
+    # Same question, with each field reported as soon as it has streamed in
+    item = await stream_structured(
+        agent, "What is the price of the soup special?",
+        on_field=lambda name, value: print(f"  {name}: {value}"),
+    )
+    print(item)
+
+    # Output:
+    #   price: 9.99
+    #   name: Clam Chowder
+    # price=9.99 name='Clam Chowder'
+
+if __name__ == "__main__":
+    asyncio.run(main())
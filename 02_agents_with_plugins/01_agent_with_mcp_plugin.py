@@ -1,25 +1,54 @@
 # Copyright (c) Microsoft. All rights reserved.
 
+import argparse
 import asyncio
+import json
 import os
-from dotenv import load_dotenv
+import sys
+import time
 from semantic_kernel.agents import ChatCompletionAgent, ChatHistoryAgentThread
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.connectors.mcp import MCPStdioPlugin
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.contents import ChatHistory
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from common.batch import bounded_as_completed
+from common.cassette import get_cassette
+from common.config import bootstrap
+from common.mcp_pool import MCPServerPool, github_plugin_factory
+from common.plugin_executor import get_plugin_executor
+from common import rate_limiter, telemetry
+from common.service_registry import get_registry
+from common.single_flight import SingleFlight
+from common.tool_cache import ToolResultCache
 
 """
 The following sample demonstrates how to create a chat completion agent that
 answers questions about Github using a Semantic Kernel Plugin from a MCP server. 
 The Chat Completion Service is passed directly via the ChatCompletionAgent constructor.
 Additionally, the plugin is supplied via the constructor.
+
+The GitHub MCP servers are started once and kept warm in an MCPServerPool;
+agents lease a connection instead of spawning their own `npx` process
+(set GITHUB_MCP_COMMAND to run an installed server without npx).
+
+Batch mode answers a file of questions, running independent conversations
+concurrently and printing answers as they finish:
+
+    python 01_agent_with_mcp_plugin.py --batch questions.jsonl --concurrency 8 --output answers.jsonl
+
+The file holds one question per line, either as plain text (each line is its
+own conversation) or as JSON: {"question": "...", "conversation": "triage-1"}.
+With SK_CASSETTE set, model calls and GitHub tool calls are recorded to (or
+replayed from) a cassette file, so runs can be profiled without network; see
+common/cassette.py.
+
+Questions of the same conversation run in order on one thread, so later ones
+can build on earlier answers. Batch calls are scheduled at batch priority, so
+interactive chats of the same process are served first and the deployment's
+rate budget (SK_RATE_* settings) is respected.
 """
 # Load environment variables
-if os.path.exists('../.env'):
-    load_dotenv(dotenv_path='../.env')
-elif os.path.exists('.env'):
-    load_dotenv(dotenv_path='.env')
-else:
-    print("Warning: .env file not found. Please ensure Azure OpenAI credentials are set.")
+bootstrap()
 
 # Simulate a conversation with the agent
 USER_INPUTS = [
@@ -29,38 +58,158 @@ USER_INPUTS = [
 ]
 
 
-async def main():
-    # 1. Create the agent
-    async with MCPStdioPlugin(
-        name="Github",
-        description="Github Plugin",
-        command="npx",
-        args=["-y", "@modelcontextprotocol/server-github"],
-    ) as github_plugin:
-        
-        agent = ChatCompletionAgent(
-        service = AzureChatCompletion(
-            deployment_name=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            endpoint=os.getenv("AZURE_OPENAI_API_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION")
-        ),
-            name="IssueAgent",
-            instructions="Answer questions about the Microsoft semantic-kernel github project.",
-            plugins=[github_plugin],
-        )
-
-        for user_input in USER_INPUTS:
+def load_questions(path: str) -> dict[str, list[str]]:
+    """Group the questions of a batch file by conversation, keeping file order."""
+    conversations: dict[str, list[str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                question = record["question"]
+                conversation = str(record.get("conversation", f"line-{line_no}"))
+            else:
+                question, conversation = line, f"line-{line_no}"
+            conversations.setdefault(conversation, []).append(question)
+    return conversations
+
+
+AGENT_NAME = "IssueAgent"
+
+# Results of read-only GitHub tools, shared by every agent of this process
+tool_cache = ToolResultCache(plugin_names={"Github"})
+
+# Duplicate questions asked at the same point of a conversation share one model call
+single_flight = SingleFlight()
+
+
+def make_agent(service: ChatCompletionClientBase, github_plugin) -> ChatCompletionAgent:
+    agent = ChatCompletionAgent(
+        service=service,
+        name=AGENT_NAME,
+        instructions="Answer questions about the Microsoft semantic-kernel github project.",
+        plugins=[github_plugin],
+    )
+    # Timing filter first, so tool latencies include cache hits
+    telemetry.instrument_kernel(agent.kernel)
+    agent.kernel.add_filter("function_invocation", tool_cache)
+    # Cache misses only: caps GitHub calls in flight and times out a hung server
+    agent.kernel.add_filter("function_invocation", get_plugin_executor())
+    cassette = get_cassette()
+    if cassette:
+        # Innermost, so only calls that reach the MCP server are recorded
+        cassette.record_tools(github_plugin)
+        agent.kernel.add_filter("function_invocation", cassette.tool_filter)
+    return agent
+
+
+def fork_thread(messages: list) -> ChatHistoryAgentThread:
+    """Private thread continuing from a snapshot of a thread whose answer was shared."""
+    return ChatHistoryAgentThread(chat_history=ChatHistory(messages=list(messages)))
+
+
+async def run_conversation(pool: MCPServerPool, service: ChatCompletionClientBase, conversation: str,
+                           questions: list[str], emit) -> int:
+    """Ask the questions of one conversation in order on a single thread."""
+    # Created up front, so an answer built on it is recognizably this conversation's own
+    thread = ChatHistoryAgentThread()
+    async with pool.lease() as github_plugin:
+        agent = make_agent(service, github_plugin)
+
+        async def ask(question: str):
+            response = await agent.get_response(messages=question, thread=thread)
+            # Snapshot taken inside the flight: the thread may move on before sharers copy it
+            return response, [m async for m in response.thread.get_messages()]
+
+        try:
+            for question in questions:
+                start = time.perf_counter()
+                history = [m async for m in thread.get_messages()]
+                key = single_flight.key(agent, [*history, question])
+                with telemetry.turn("question"):
+                    response, messages = await single_flight.call(key, lambda: ask(question))
+                if response.thread is not thread:
+                    # Answered on another conversation's thread: continue on a
+                    # copy of it and drop the thread this question was not asked on
+                    replaced, thread = thread, fork_thread(messages)
+                    await replaced.delete()
+                emit({
+                    "conversation": conversation,
+                    "question": question,
+                    "answer": str(response.message.content),
+                    "seconds": round(time.perf_counter() - start, 3),
+                })
+        finally:
+            # Cleanup: Clear the thread
+            await thread.delete()
+    return len(questions)
+
+
+async def run_batch(pool: MCPServerPool, service: ChatCompletionClientBase, conversations: dict[str, list[str]], concurrency: int, output):
+    def emit(record: dict):
+        if output:
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+        else:
+            print(f"# [{record['conversation']}] User: {record['question']}")
+            print(f"# [{record['conversation']}] {AGENT_NAME}: {record['answer']} ")
+
+    start = time.perf_counter()
+    answered = 0
+    with rate_limiter.priority(rate_limiter.BATCH):
+        async for (conversation, _), count, error in bounded_as_completed(
+            conversations.items(),
+            lambda item: run_conversation(pool, service, item[0], item[1], emit),
+            concurrency,
+        ):
+            if error:
+                print(f"# [{conversation}] failed: {error!r}", file=sys.stderr)
+            else:
+                answered += count
+    elapsed = time.perf_counter() - start
+    print(f"# Answered {answered} questions in {len(conversations)} conversations "
+          f"in {elapsed:.1f}s ({answered / elapsed if elapsed else 0:.2f} questions/s)", file=sys.stderr)
+    print(f"# Tool cache: {tool_cache.report()}", file=sys.stderr)
+    print(f"# Rate limiter: {get_registry().transport.stats()}", file=sys.stderr)
+    print(f"# Shared answers: {single_flight.stats}", file=sys.stderr)
+
+
+async def main(args: argparse.Namespace):
+    # Pooled client whose chat completions go through the rate limiter
+    service = get_registry().service
+
+    # 1. Start warm MCP servers; agents lease one instead of owning the process
+    cassette = get_cassette()
+    factory = cassette.plugin_factory("Github") if cassette and cassette.replaying else github_plugin_factory
+    async with MCPServerPool(factory, size=args.mcp_servers) as pool:
+        print(f"# {args.mcp_servers} MCP server(s) ready in {pool.stats.startup_seconds:.2f}s", file=sys.stderr)
+
+        if args.batch:
+            conversations = load_questions(args.batch)
+            if args.output:
+                with open(args.output, "a", encoding="utf-8") as output:
+                    await run_batch(pool, service, conversations, args.concurrency, output)
+            else:
+                await run_batch(pool, service, conversations, args.concurrency, None)
+            return
+
+        async with pool.lease() as github_plugin:
+            agent = make_agent(service, github_plugin)
+
             # 2. Create a thread to hold the conversation
             # If no thread is provided, a new thread will be
-            # created and returned with the initial response
+            # created and returned with the initial response.
+            # The thread is reused so follow-up questions keep their context.
             thread: ChatHistoryAgentThread | None = None
 
-            print(f"# User: {user_input}")
-            # 3. Invoke the agent for a response
-            response = await agent.get_response(messages=user_input, thread=thread)
-            print(f"# {response.name}: {response} ")
-            thread = response.thread
+            for user_input in USER_INPUTS:
+                print(f"# User: {user_input}")
+                # 3. Invoke the agent for a response
+                response = await agent.get_response(messages=user_input, thread=thread)
+                print(f"# {response.name}: {response} ")
+                thread = response.thread
 
             # 4. Cleanup: Clear the thread
             await thread.delete() if thread else None
@@ -129,4 +278,11 @@ You can view the issue [here](https://github.com/microsoft/semantic-kernel/issue
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Answer questions about the semantic-kernel GitHub project.")
+    parser.add_argument("--batch", help="file of questions (plain text or JSONL), one per line")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("SK_BATCH_CONCURRENCY", 8)),
+                        help="conversations answered at the same time")
+    parser.add_argument("--output", help="append answers as JSONL to this file instead of printing them")
+    parser.add_argument("--mcp-servers", type=int, default=int(os.getenv("SK_MCP_POOL_SIZE", 2)),
+                        help="warm GitHub MCP server processes shared by the agents")
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
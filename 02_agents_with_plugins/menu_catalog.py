@@ -0,0 +1,225 @@
+"""Menu catalog behind ``MenuPlugin`` (00_simple_agent_custom_plugin.py).
+
+The catalog is loaded once per process and indexed so a lookup touches only
+the entries that share words or letter trigrams with the query, not the
+whole menu:
+
+- exact index on the normalized name and aliases,
+- special index ("soup special" -> today's soup),
+- category index,
+- inverted word and trigram indexes for partial and misspelled names.
+
+Partial matches must account for most of the query: more than half of its
+content words have to appear in the item's name or an alias, exactly or
+misspelled. "grilled cheese" therefore finds nothing rather than Grilled
+Salmon, and the plugin offers suggestions instead of a wrong price.
+
+A query that fits several items equally well ("soup", "tea", a category
+name) is ambiguous: ``lookup`` returns ``None`` and ``candidates`` lists the
+items it may mean (a category's special first), so the agent can ask which
+one instead of quoting an arbitrary price.
+"""
+import json
+import os
+import heapq
+import re
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+from pydantic import BaseModel
+
+DEFAULT_MENU = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "menu.json")
+
+_WORDS = re.compile(r"[a-z0-9]+")
+# Words that say nothing about which item is meant
+_STOPWORDS = frozenset({"the", "a", "an", "of", "and", "price", "special", "specials", "today", "todays", "s",
+                        "please", "how", "much", "is", "for", "what", "whats", "does", "cost"})
+# Candidates checked against the query's words before giving up
+_CANDIDATES = 5
+
+
+class MenuItem(BaseModel):
+    price: float
+    name: str
+
+
+class MenuItems(BaseModel):
+    # A json_schema response format must be an object, so lists are wrapped
+    items: list[MenuItem]
+
+
+@dataclass(frozen=True, slots=True)
+class MenuEntry:
+    name: str
+    price: float
+    category: str
+    description: str = ""
+    special: str | None = None
+    aliases: tuple[str, ...] = ()
+
+    def as_item(self) -> MenuItem:
+        return MenuItem(name=self.name, price=self.price)
+
+
+def normalize(text: str) -> str:
+    return " ".join(_WORDS.findall(text.lower()))
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similar(word: str, other: str) -> bool:
+    """Same word, or close enough to be a misspelling of it (trigram Dice coefficient)."""
+    if word == other:
+        return True
+    # A misspelling changes a few letters: "cheese" is not "cheeseburger"
+    if abs(len(word) - len(other)) > max(2, min(len(word), len(other)) // 3):
+        return False
+    a, b = _trigrams(word), _trigrams(other)
+    return 4 * len(a & b) >= len(a) + len(b)
+
+
+class MenuCatalog:
+    def __init__(self, entries: list[MenuEntry]):
+        self.entries = tuple(entries)
+        self._by_name: dict[str, MenuEntry] = {}
+        self._by_special: dict[str, MenuEntry] = {}
+        self._by_category: dict[str, list[MenuEntry]] = {}
+        self._by_word: dict[str, list[int]] = {}
+        self._by_trigram: dict[str, list[int]] = {}
+        self._words: list[tuple[str, ...]] = []
+
+        for index, entry in enumerate(self.entries):
+            names = [normalize(entry.name), *(normalize(alias) for alias in entry.aliases)]
+            for name in names:
+                self._by_name.setdefault(name, entry)
+            self._by_category.setdefault(entry.category.lower(), []).append(entry)
+            if entry.special:
+                self._by_special[entry.special.lower()] = entry
+            words = tuple({w for name in names for w in name.split()})
+            self._words.append(words)
+            for word in words:
+                self._by_word.setdefault(word, []).append(index)
+            for gram in {g for name in names for g in _trigrams(name)}:
+                self._by_trigram.setdefault(gram, []).append(index)
+
+        self.specials = tuple(self._by_special.values())
+        self._max_postings = max(64, len(self.entries) // 50)
+        self.specials_text = "\n".join(f"Special {e.special}: {e.name}" for e in self.specials)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_MENU) -> "MenuCatalog":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([
+            MenuEntry(
+                name=item["name"],
+                price=float(item["price"]),
+                category=item.get("category", "Other"),
+                description=item.get("description", ""),
+                special=item.get("special"),
+                aliases=tuple(item.get("aliases", ())),
+            )
+            for item in data["items"]
+        ])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def category(self, name: str) -> tuple[MenuEntry, ...]:
+        return tuple(self._by_category.get(name.lower(), ()))
+
+    def lookup(self, query: str) -> MenuEntry | None:
+        """The one entry ``query`` names, or ``None`` if there is none or several fit."""
+        return self._search(query)[0]
+
+    def candidates(self, query: str) -> tuple[MenuEntry, ...]:
+        """Entries an ambiguous or partial ``query`` may mean, best first (empty if found or unrelated)."""
+        return self._search(query)[1]
+
+    def _search(self, query: str) -> tuple[MenuEntry | None, tuple[MenuEntry, ...]]:
+        """Exact name, a special, a category, then word and trigram overlap."""
+        normalized = normalize(query)
+        entry = self._by_name.get(normalized)
+        if entry is not None:
+            return entry, ()
+
+        all_words = normalized.split()
+        words = [w for w in all_words if w not in _STOPWORDS]
+        if "special" in all_words or "specials" in all_words:
+            for word in words:
+                special = self._by_special.get(word) or self._by_special.get(word.rstrip("s"))
+                if special is not None:
+                    return special, ()
+        if not words:
+            return None, ()
+
+        cleaned = " ".join(words)
+        entry = self._by_name.get(cleaned)
+        if entry is not None:
+            return entry, ()
+        members = self._by_category.get(cleaned) or self._by_category.get(cleaned.rstrip("s"))
+        if members:
+            # A category names all of its items, not one of them
+            return None, tuple(sorted(members, key=lambda e: e.special is None))
+
+        # Whole words first: they are precise and their postings are short
+        scores = Counter()
+        for word in words:
+            for index in self._by_word.get(word, ()):
+                scores[index] += 1
+        found = self._best(scores, words)
+        if found[0] is None and not found[1]:
+            # Then shared letter trigrams, for misspellings. Trigrams found in a
+            # large share of the menu say little and would make lookups scale
+            # with the menu size, so they are skipped.
+            query_grams = _trigrams(cleaned)
+            scores = self._trigram_scores(query_grams)
+            # Require a reasonable share of the query's trigrams to match
+            minimum = max(3, len(query_grams) // 2)
+            found = self._best(Counter({i: n for i, n in scores.items() if n >= minimum}), words)
+        index, others = found
+        return (None if index is None else self.entries[index]), tuple(self.entries[i] for i in others)
+
+    def _trigram_scores(self, grams: set[str]) -> Counter:
+        scores = Counter()
+        for gram in grams:
+            postings = self._by_trigram.get(gram, ())
+            if len(postings) <= self._max_postings:
+                for index in postings:
+                    scores[index] += 1
+        return scores
+
+    def _best(self, scores: Counter, words: list[str]) -> tuple[int | None, list[int]]:
+        """The entry whose names cover most of ``words`` best, and the candidates otherwise.
+
+        Returns ``(index, [])`` for a single best entry; ``(None, tied)`` when
+        several cover the query equally well, and ``(None, partial)`` with
+        the entries that matched only some of its words.
+        """
+        ranked = heapq.nlargest(_CANDIDATES, scores, key=scores.__getitem__)
+        covering, partial = [], []
+        for index in ranked:
+            matched = sum(any(_similar(word, name_word) for name_word in self._words[index]) for word in words)
+            if 2 * matched > len(words):
+                covering.append(((scores[index], matched), index))
+            elif matched:
+                partial.append(index)
+        if not covering:
+            return None, partial
+        best = max(rank for rank, _ in covering)
+        tied = [index for rank, index in covering if rank == best]
+        return (tied[0], []) if len(tied) == 1 else (None, tied)
+
+    def suggestions(self, query: str, limit: int = 3) -> list[str]:
+        scores = self._trigram_scores(_trigrams(normalize(query)))
+        return [self.entries[index].name for index, _ in scores.most_common(limit)]
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path: str = DEFAULT_MENU) -> MenuCatalog:
+    """The catalog stored at ``path``, loaded and indexed once per process."""
+    return MenuCatalog.from_file(path)
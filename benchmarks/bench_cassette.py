@@ -0,0 +1,89 @@
+"""Agent turns against the live (fake) endpoint, then replayed from a cassette.
+
+Records ``--turns`` streamed and non-streamed turns of a ``ChatCompletionAgent``
+against ``common.fake_openai`` (with ``--latency`` and ``--token-delay``),
+then replays the cassette at the recorded pace and with no delays. The
+no-delay replay is what is left of a turn without the model: the agent's own
+overhead. ``--profile`` prints the top functions of that run.
+
+    python benchmarks/bench_cassette.py --turns 50 --profile
+"""
+import argparse
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+from openai import AsyncAzureOpenAI
+from semantic_kernel.agents import ChatCompletionAgent
+
+from common.cassette import Cassette
+from common.config import AzureOpenAISettings, create_chat_service
+from common.fake_openai import FakeOpenAIServer
+
+QUESTIONS = ["My printer is on fire.", "The wifi keeps dropping.", "How do I reset my password?"]
+
+
+def make_agent(cassette: Cassette, endpoint: str) -> tuple[ChatCompletionAgent, httpx.AsyncClient]:
+    settings = cassette.settings(AzureOpenAISettings(
+        api_key="fake", endpoint=endpoint, api_version="2024-10-21", deployment_name="fake"))
+    http_client = httpx.AsyncClient(transport=cassette.transport())
+    client = AsyncAzureOpenAI(api_key=settings.api_key, azure_endpoint=settings.endpoint,
+                              api_version=settings.api_version, http_client=http_client, max_retries=0)
+    service = create_chat_service(settings, async_client=client)
+    return ChatCompletionAgent(service=service, name="TechSupportBot", instructions="You are a Tech Support Bot."), http_client
+
+
+async def run(cassette: Cassette, endpoint: str, turns: int) -> float:
+    agent, http_client = make_agent(cassette, endpoint)
+    start = time.perf_counter()
+    for i in range(turns):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        if i % 2:
+            async for _ in agent.invoke_stream(messages=question):
+                pass
+        else:
+            await agent.get_response(messages=question)
+    elapsed = time.perf_counter() - start
+    await http_client.aclose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="cassette-"), "turns.jsonl")
+    with FakeOpenAIServer(latency=args.latency, token_delay=args.token_delay) as server:
+        recorder = Cassette(path, mode="record")
+        elapsed = asyncio.run(run(recorder, server.url, args.turns))
+        print(f"{'live':14s} {elapsed / args.turns * 1000:8.2f} ms/turn  ({server.requests} requests, "
+              f"{recorder.stats.recorded} exchanges, {os.path.getsize(path) // 1024} KiB cassette)")
+
+    # The endpoint is gone: everything below is served from the file
+    for label, speed in (("replay 1x", 1.0), ("replay no wait", 0.0)):
+        cassette = Cassette(path, mode="replay", speed=speed)
+        profiler = cProfile.Profile() if args.profile and not speed else None
+        if profiler:
+            profiler.enable()
+        elapsed = asyncio.run(run(cassette, "https://replay.invalid", args.turns))
+        if profiler:
+            profiler.disable()
+        print(f"{label:14s} {elapsed / args.turns * 1000:8.2f} ms/turn  ({cassette.stats})")
+    if args.profile:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Write-behind conversation log vs. one committed INSERT per turn.
+
+Simulates ``--sessions`` concurrent chats of ``--turns`` turns each and
+measures the time a turn costs the request path and the overall throughput,
+then times rehydrating one session's last 40 turns from the full log.
+
+    python benchmarks/bench_conversation_log.py --sessions 200 --turns 20
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common.conversation_log import ConversationLog
+
+ANSWER = "Please try restarting your modem and router first. This often resolves common connectivity issues."
+
+
+class CommitPerTurn:
+    """The naive baseline: a synchronous INSERT and COMMIT inside the handler."""
+
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE turns (id INTEGER PRIMARY KEY, session_id TEXT, ts REAL, role TEXT, "
+                          "content TEXT, state TEXT)")
+
+    def record(self, session_id: str, role: str, content: str, state: str | None = None):
+        self.conn.execute("INSERT INTO turns (session_id, ts, role, content, state) VALUES (?, ?, ?, ?, ?)",
+                          (session_id, time.time(), role, content, state))
+
+
+async def chat(log, session: int, turns: int, costs: list[float]):
+    for i in range(turns):
+        start = time.perf_counter()
+        log.record(f"session-{session}", "user" if i % 2 == 0 else "assistant", ANSWER, "FINAL")
+        costs.append(time.perf_counter() - start)
+        await asyncio.sleep(0)  # other sessions' handlers run in between
+
+
+async def run(log, sessions: int, turns: int) -> tuple[list[float], float]:
+    costs = []
+    start = time.perf_counter()
+    await asyncio.gather(*(chat(log, s, turns, costs) for s in range(sessions)))
+    if isinstance(log, ConversationLog):
+        await log.flush()
+    return sorted(costs), time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    total = args.sessions * args.turns
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, log in (("commit per turn", CommitPerTurn(os.path.join(directory, "naive.db"))),
+                           ("write-behind", ConversationLog(os.path.join(directory, "log.db")))):
+            costs, elapsed = await run(log, args.sessions, args.turns)
+            print(f"{label:16s} request path p50 {statistics.median(costs) * 1e6:7.1f} us  "
+                  f"p99 {costs[int(len(costs) * 0.99)] * 1e6:7.1f} us  {total / elapsed:9.0f} turns/s")
+
+        print(f"write-behind used {log.batches} transactions for {log.written} turns")
+        start = time.perf_counter()
+        rows = await log.turns("session-7", last=40)
+        print(f"rehydrating {len(rows)} turns of one session out of {total}: "
+              f"{(time.perf_counter() - start) * 1000:.2f} ms")
+        await log.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
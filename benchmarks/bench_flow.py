@@ -0,0 +1,43 @@
+"""Cost of one scripted transition of the Tech Support flow.
+
+Times ``Flow.dispatch`` in isolation (no Chainlit, no model) for button
+clicks, templated typed input and typed commands.
+
+    python benchmarks/bench_flow.py --number 200000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "00_sequential_chatflow")))
+
+from common.flow_engine import Flow
+from tech_support_flow import (
+    STATE_FINAL, STATE_INITIAL, STATE_SOFTWARE_ASK_PROBLEM, TECH_SUPPORT_FLOW, TECH_SUPPORT_SPEC,
+)
+
+CASES = {
+    "button click": lambda: TECH_SUPPORT_FLOW.dispatch(STATE_INITIAL, action="internet_issue"),
+    "constant reply": lambda: TECH_SUPPORT_FLOW.dispatch(STATE_INITIAL, text="hello?"),
+    "templated reply": lambda: TECH_SUPPORT_FLOW.dispatch(
+        STATE_SOFTWARE_ASK_PROBLEM, text="it crashes on save", memory={"software_name": "Excel"}),
+    "typed command": lambda: TECH_SUPPORT_FLOW.dispatch(STATE_FINAL, text="Start over"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    compile_time = min(timeit.repeat(lambda: Flow(TECH_SUPPORT_SPEC), number=100, repeat=3)) / 100
+    print(f"{'compile flow':16s} {compile_time * 1e6:8.2f} us (once per process)")
+    for label, case in CASES.items():
+        best = min(timeit.repeat(case, number=args.number, repeat=3)) / args.number
+        print(f"{label:16s} {best * 1e6:8.2f} us/transition")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Import (cold start) time of the example scripts.
+
+Chainlit imports the app module when a worker starts and again on every
+``-w`` reload. This benchmark loads each script in a fresh interpreter, the
+same way, and reports the wall time of the import plus the slowest imported
+packages (from ``python -X importtime``), so eager SDK imports show up.
+
+    python benchmarks/bench_import_time.py --runs 5
+    python benchmarks/bench_import_time.py --scripts 00_sequential_chatflow/02_multi_choice_agent.py --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+SCRIPTS = [
+    "00_sequential_chatflow/00_initial_agent.py",
+    "00_sequential_chatflow/01_simple_chat_agent.py",
+    "00_sequential_chatflow/02_multi_choice_agent.py",
+    "00_sequential_chatflow/03_chat_agent_skills.py",
+    "02_agents_with_plugins/00_simple_agent_custom_plugin.py",
+    "02_agents_with_plugins/01_agent_with_mcp_plugin.py",
+]
+
+# Loads a script as a module (as Chainlit does) and prints how long it took
+LOADER = """
+import importlib.util, os, sys, time
+path = sys.argv[1]
+sys.path.insert(0, os.path.dirname(path))
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("app", path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+print(f"{time.perf_counter() - start:.6f}")
+"""
+
+
+def import_once(path: str, importtime: bool = False) -> tuple[float, str]:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", LOADER, path]
+    result = subprocess.run(command, cwd=os.path.dirname(path), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return float(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_packages(importtime_output: str, top: int) -> list[tuple[float, str]]:
+    """Top-level packages by cumulative import time (ms)."""
+    packages = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented further; top-level ones carry the cumulative cost
+        if len(name) - len(name.lstrip()) == 1:
+            root = name.strip().split(".")[0]
+            packages[root] = packages.get(root, 0.0) + int(cumulative) / 1000
+    return sorted(((ms, name) for name, ms in packages.items()), reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for script in args.scripts:
+        path = os.path.join(ROOT, script)
+        try:
+            times = [import_once(path)[0] for _ in range(args.runs)]
+            _, importtime_output = import_once(path, importtime=True)
+        except RuntimeError as error:
+            print(f"{script}: {error}")
+            continue
+        print(f"{script}: median {statistics.median(times) * 1000:.0f} ms, min {min(times) * 1000:.0f} ms "
+              f"over {args.runs} runs")
+        for ms, name in slowest_packages(importtime_output, args.top):
+            print(f"    {ms:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Accuracy, fallback rate and speed of the local intent classifier.
+
+Classifies held-out phrases typed in the two classify states of the Tech
+Support flow. A phrase the classifier is unsure about would go to the LLM
+(fallback); a confident wrong answer is an error.
+
+    python benchmarks/bench_intents.py
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "00_sequential_chatflow"))
+
+from common.intent_classifier import IntentClassifier
+from tech_support_flow import INTENT_EXAMPLES, STATE_INITIAL, STATE_INTERNET_ASK_RESTART, TECH_SUPPORT_FLOW
+
+# (state, typed text, expected action or None when no button fits)
+HELD_OUT = [
+    (STATE_INITIAL, "my interent is super slow", "internet_issue"),
+    (STATE_INITIAL, "the wifi keeps dropping out", "internet_issue"),
+    (STATE_INITIAL, "cannot connect to anything", "internet_issue"),
+    (STATE_INITIAL, "router keeps rebooting", "internet_issue"),
+    (STATE_INITIAL, "Word crashes on startup", "software_problem"),
+    (STATE_INITIAL, "the app won't install", "software_problem"),
+    (STATE_INITIAL, "I get an error when I open outlook", "software_problem"),
+    (STATE_INITIAL, "laptop screen went dark", "hardware_failure"),
+    (STATE_INITIAL, "my pc makes a weird noise", "hardware_failure"),
+    (STATE_INITIAL, "battery is dead and won't charge", "hardware_failure"),
+    (STATE_INITIAL, "printer offline", "hardware_failure"),
+    (STATE_INITIAL, "I need help", None),
+    (STATE_INITIAL, "what's the weather like", None),
+    (STATE_INITIAL, "no", None),
+    (STATE_INITIAL, "no idea", None),
+    (STATE_INITIAL, "yes I restarted but it still does not work", None),
+    (STATE_INTERNET_ASK_RESTART, "yes i have", "internet_restarted_yes"),
+    (STATE_INTERNET_ASK_RESTART, "I restarted both already", "internet_restarted_yes"),
+    (STATE_INTERNET_ASK_RESTART, "yes, twice", "internet_restarted_yes"),
+    (STATE_INTERNET_ASK_RESTART, "no", "internet_restarted_no"),
+    (STATE_INTERNET_ASK_RESTART, "nah not yet", "internet_restarted_no"),
+    (STATE_INTERNET_ASK_RESTART, "I have not restarted the modem", "internet_restarted_no"),
+    (STATE_INTERNET_ASK_RESTART, "didn't try", "internet_restarted_no"),
+    (STATE_INTERNET_ASK_RESTART, "what do you mean", None),
+    (STATE_INTERNET_ASK_RESTART, "maybe", None),
+    (STATE_INTERNET_ASK_RESTART, "it is not working", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup = timeit.timeit(lambda: IntentClassifier.from_file(INTENT_EXAMPLES), number=10) / 10
+    classifier = IntentClassifier.from_file(INTENT_EXAMPLES)
+    correct = fallbacks = errors = 0
+    for state, text, expected in HELD_OUT:
+        intent = classifier.predict(text, TECH_SUPPORT_FLOW.intent_labels(state))
+        label = intent.label if intent else None
+        if label is None:
+            fallbacks += 1
+            outcome = "correct (no button fits)" if expected is None else "fallback to LLM"
+            correct += expected is None
+        elif label == expected:
+            correct += 1
+            outcome = "correct"
+        else:
+            errors += 1
+            outcome = f"WRONG, expected {expected}"
+        print(f"  {state:22s} {text!r:40s} -> {label or '-':24s} {outcome}")
+
+    labels = TECH_SUPPORT_FLOW.intent_labels(STATE_INITIAL)
+    seconds = timeit.timeit(lambda: classifier.predict("my internet is super slow today", labels), number=args.number)
+    print(f"{correct}/{len(HELD_OUT)} correct, {fallbacks} without a confident answer, {errors} confidently wrong")
+    print(f"training {setup * 1000:.1f} ms, prediction {seconds / args.number * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
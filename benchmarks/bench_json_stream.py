@@ -0,0 +1,86 @@
+"""Structured output: time to the first usable item when parsing the JSON stream incrementally.
+
+Streams a JSON list of ``--items`` menu items at ``--tokens-per-second``
+(about four characters per token, as a model would) and compares when the
+first validated ``MenuItem`` is available through ``parse_stream`` with
+waiting for the whole answer and validating it at once. Also reports the
+parser's own cost per character.
+
+    python benchmarks/bench_json_stream.py --items 40 --tokens-per-second 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "02_agents_with_plugins"))
+
+from pydantic import TypeAdapter
+
+from common.json_stream import JSONStreamParser, parse_stream
+from menu_catalog import MenuItem
+
+CHARS_PER_TOKEN = 4
+
+
+def make_answer(count: int) -> str:
+    return json.dumps([{"price": round(4.5 + i * 0.25, 2), "name": f"Menu item {i}"} for i in range(count)])
+
+
+async def tokens(text: str, tokens_per_second: float):
+    delay = 1 / tokens_per_second if tokens_per_second else 0
+    for i in range(0, len(text), CHARS_PER_TOKEN):
+        if i and delay:
+            await asyncio.sleep(delay)
+        yield text[i:i + CHARS_PER_TOKEN]
+
+
+async def incremental(text: str, tokens_per_second: float) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    first = None
+
+    def on_item(index, item):
+        nonlocal first
+        if first is None:
+            first = time.perf_counter() - start
+
+    items = await parse_stream(tokens(text, tokens_per_second), list[MenuItem], on_item=on_item)
+    return first, time.perf_counter() - start, len(items)
+
+
+async def buffered(text: str, tokens_per_second: float) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    chunks = [chunk async for chunk in tokens(text, tokens_per_second)]
+    items = TypeAdapter(list[MenuItem]).validate_json("".join(chunks))
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    args = parser.parse_args()
+
+    text = make_answer(args.items)
+    print(f"{args.items} items, {len(text)} chars, ~{len(text) // CHARS_PER_TOKEN} tokens at {args.tokens_per_second:g}/s")
+    for label, run in (("incremental", incremental), ("buffered", buffered)):
+        first, total, count = asyncio.run(run(text, args.tokens_per_second))
+        print(f"{label:12s} first item {first * 1000:8.1f} ms   all {count} items {total * 1000:8.1f} ms")
+
+    rounds = 20
+    start = time.perf_counter()
+    for _ in range(rounds):
+        stream = JSONStreamParser()
+        for i in range(0, len(text), CHARS_PER_TOKEN):
+            stream.feed(text[i:i + CHARS_PER_TOKEN])
+    seconds = (time.perf_counter() - start) / rounds
+    print(f"parser       {seconds / len(text) * 1e9:8.1f} ns/char ({seconds * 1000:.2f} ms per answer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Memory and throughput of the JSONL batch runner as the prompt file grows.
+
+Runs ``common.batch.run_jsonl_batch`` over generated prompt files of
+``--sizes`` lines with a worker that answers after ``--latency`` seconds
+(jittered, so answers finish out of order), and reports items per second
+and the peak traced memory. Peak memory should stay flat across sizes.
+``--resume`` also kills a run halfway and checks that resuming answers every
+line exactly once.
+
+    python benchmarks/bench_jsonl_batch.py --sizes 1000 10000 100000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common.batch import run_jsonl_batch
+
+
+def write_prompts(path: str, size: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(size):
+            f.write(json.dumps({"id": f"item-{i}", "prompt": f"Write a haiku about topic {i}."}) + "\n")
+
+
+def make_worker(latency: float, seed: int = 3):
+    rng = random.Random(seed)
+
+    async def answer(record: dict) -> str:
+        await asyncio.sleep(latency * rng.uniform(0.5, 1.5))
+        return f"A haiku about {record['prompt'][-9:]}"
+
+    return answer
+
+
+async def interrupted(input_path: str, output_path: str, args: argparse.Namespace, lines: int) -> int:
+    """Run until about half of the lines are answered, then cancel like a crash would."""
+    task = asyncio.create_task(run_jsonl_batch(input_path, output_path, make_worker(args.latency), args.concurrency,
+                                               checkpoint_path=output_path + ".ckpt", checkpoint_every=0.05))
+    while not os.path.exists(output_path) or os.path.getsize(output_path) < lines * 40:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    with open(output_path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per answer")
+    parser.add_argument("--resume", action="store_true")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="jsonl-batch-")
+    for size in args.sizes:
+        input_path = os.path.join(directory, f"prompts-{size}.jsonl")
+        output_path = os.path.join(directory, f"answers-{size}.jsonl")
+        write_prompts(input_path, size)
+        tracemalloc.start()
+        stats = asyncio.run(run_jsonl_batch(input_path, output_path, make_worker(args.latency), args.concurrency))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{size:8d} lines  {stats.throughput:8.0f} items/s  peak {peak / 1024:8.1f} KiB  "
+              f"p50 {stats.latency.percentile(0.5) * 1000:5.1f} ms")
+
+        if args.resume:
+            os.remove(output_path)
+            first = asyncio.run(interrupted(input_path, output_path, args, size // 2))
+            stats = asyncio.run(run_jsonl_batch(input_path, output_path, make_worker(args.latency), args.concurrency,
+                                                checkpoint_path=output_path + ".ckpt"))
+            with open(output_path, encoding="utf-8") as f:
+                lines = [json.loads(line)["line"] for line in f]
+            print(f"{'':8s} resumed at line {stats.resumed_at} after {first} answers: {len(lines)} answers, "
+                  f"{len(set(lines))} distinct lines")
+            os.remove(output_path + ".ckpt")
+        os.remove(input_path)
+        os.remove(output_path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
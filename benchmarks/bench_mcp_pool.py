@@ -0,0 +1,83 @@
+"""Startup and tool-call latency: spawning an MCP server per run vs. a warm pool.
+
+Runs against ``benchmarks/stub_mcp_server.py``:
+
+- ``spawn per run``: start a server, call one tool, stop it (what the
+  sample did on every run),
+- ``pool``: start ``--pool-size`` servers once, then lease them for
+  ``--calls`` tool calls with ``--concurrency`` callers.
+
+    python benchmarks/bench_mcp_pool.py --calls 500 --concurrency 16 --pool-size 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from semantic_kernel.connectors.mcp import MCPStdioPlugin
+
+from common.mcp_pool import MCPServerPool
+
+STUB_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_mcp_server.py")
+
+
+def stub_plugin_factory():
+    return MCPStdioPlugin(name="Github", description="Stub Github Plugin",
+                          command=sys.executable, args=[STUB_SERVER])
+
+
+def report(label: str, latencies: list[float], elapsed: float):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{label:14s} p50 {statistics.median(latencies) * 1000:8.2f} ms  p95 {p95 * 1000:8.2f} ms  "
+          f"{len(latencies) / elapsed:8.1f} calls/s")
+
+
+async def spawn_per_run(runs: int):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(runs):
+        call_start = time.perf_counter()
+        async with stub_plugin_factory() as plugin:
+            await plugin.call_tool("get_issue", owner="microsoft", repo="semantic-kernel", issue_number=10785)
+        latencies.append(time.perf_counter() - call_start)
+    report("spawn per run", latencies, time.perf_counter() - start)
+
+
+async def pooled(calls: int, concurrency: int, pool_size: int):
+    async with MCPServerPool(stub_plugin_factory, size=pool_size, health_interval=5) as pool:
+        print(f"{'pool startup':14s} {pool.stats.startup_seconds * 1000:8.2f} ms for {pool_size} server(s)")
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def call():
+            async with semaphore:
+                call_start = time.perf_counter()
+                async with pool.lease() as plugin:
+                    await plugin.call_tool("get_issue", owner="microsoft", repo="semantic-kernel", issue_number=10785)
+                latencies.append(time.perf_counter() - call_start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(calls)))
+        report("pool", latencies, time.perf_counter() - start)
+        print(f"{'':14s} {pool.stats.leases} leases, {pool.stats.restarts} restarts")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="spawn-per-run iterations")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    await spawn_per_run(args.runs)
+    await pooled(args.calls, args.concurrency, args.pool_size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
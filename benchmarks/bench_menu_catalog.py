@@ -0,0 +1,46 @@
+"""Menu lookup time as the catalog grows.
+
+Builds synthetic catalogs around the real menu and times exact, special,
+partial and misspelled lookups; per-lookup time should stay roughly flat.
+
+    python benchmarks/bench_menu_catalog.py --sizes 100 1000 10000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "02_agents_with_plugins")))
+
+from menu_catalog import MenuCatalog, MenuEntry, load_catalog
+
+WORDS = ["smoked", "spicy", "garden", "classic", "roasted", "crispy", "golden", "house", "wild", "sweet",
+         "pepper", "garlic", "herb", "maple", "lime", "ginger", "honey", "citrus", "truffle", "basil"]
+DISHES = ["noodles", "tacos", "risotto", "curry", "wrap", "bowl", "skewers", "flatbread", "dumplings", "stew"]
+QUERIES = ["soup special", "Cobb Salad", "chowder", "cheesburger", "drink special", "grilled salmon please"]
+
+
+def synthetic_catalog(size: int, seed: int = 3) -> MenuCatalog:
+    rng = random.Random(seed)
+    entries = list(load_catalog().entries)
+    while len(entries) < size:
+        name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(DISHES).title()} {len(entries)}"
+        entries.append(MenuEntry(name=name, price=round(rng.uniform(3, 30), 2), category="Main"))
+    return MenuCatalog(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        catalog = synthetic_catalog(size)
+        best = min(timeit.repeat(lambda: [catalog.lookup(q) for q in QUERIES], number=args.number, repeat=3))
+        print(f"{size:7d} items  {best / (args.number * len(QUERIES)) * 1e6:8.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Turns with several tool calls against a slow menu backend, inline and offloaded.
+
+``--sessions`` concurrent users each ask one question whose model turn calls
+``--calls`` menu tools at once (in-process fake chat service). The menu
+plugin sleeps ``--backend`` seconds per call, like a blocking database or
+HTTP client would. Inline, the calls take turns on the event loop and stall
+every session; offloaded through ``PluginExecutor`` they run on the thread
+pool in parallel. ``loop lag`` is the worst delay of a 10 ms heartbeat task,
+i.e. how long any other session could have been kept waiting.
+
+    python benchmarks/bench_plugin_executor.py --sessions 20 --calls 4 --backend 0.05
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "02_agents_with_plugins")))
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.functions import kernel_function
+
+from common.fake_chat_service import FakeChatCompletion
+from common.plugin_executor import PluginExecutor
+from menu_catalog import load_catalog
+
+ITEMS = ["Clam Chowder", "Cobb Salad", "Chai Tea", "Cheeseburger", "Grilled Salmon", "Caesar Salad"]
+
+
+class SlowMenuPlugin:
+    """``MenuPlugin.get_item_price`` behind a blocking backend."""
+
+    def __init__(self, backend: float):
+        self.catalog = load_catalog()
+        self.backend = backend
+
+    @kernel_function(description="Provides the price of the requested menu item.")
+    def get_item_price(self, menu_item: str) -> str:
+        time.sleep(self.backend)
+        entry = self.catalog.lookup(menu_item)
+        return f"${entry.price:.2f}" if entry else f"{menu_item} is not on the menu."
+
+
+async def heartbeat(lags: list[float], stop: asyncio.Event, interval: float = 0.01):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        due = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - due)
+
+
+async def run(label: str, args: argparse.Namespace, executor: PluginExecutor | None):
+    service = FakeChatCompletion(
+        latency=args.latency,
+        tool_calls=[[("SlowMenuPlugin-get_item_price", {"menu_item": ITEMS[i % len(ITEMS)]})
+                     for i in range(args.calls)]],
+        reply="Here are the prices you asked for.",
+    )
+    plugin = SlowMenuPlugin(args.backend)
+    agent = ChatCompletionAgent(service=service, name="SK-Assistant", instructions="You are a helpful assistant.",
+                                plugins=[executor.offload(plugin) if executor else plugin])
+    if executor:
+        agent.kernel.add_filter("function_invocation", executor)
+
+    async def session() -> float:
+        start = time.perf_counter()
+        await agent.get_response(messages="What do the soup, the salad and the drinks cost?")
+        return time.perf_counter() - start
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(session() for _ in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    print(f"{label:10s} turn p50 {statistics.median(latencies) * 1000:7.1f} ms  max {max(latencies) * 1000:7.1f} ms  "
+          f"{elapsed:5.2f}s total  loop lag max {max(lags, default=0) * 1000:7.1f} ms")
+    if executor:
+        print(f"{'':10s} {executor.stats}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--calls", type=int, default=4, help="tool calls per model turn")
+    parser.add_argument("--backend", type=float, default=0.05, help="seconds the backing store blocks per call")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model latency in seconds")
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    await run("inline", args, None)
+    executor = PluginExecutor(max_workers=args.workers, max_concurrency=args.workers * 2)
+    await run("offloaded", args, executor)
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
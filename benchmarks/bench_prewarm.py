@@ -0,0 +1,77 @@
+"""Time to first token of a session's first LLM turn, cold and with a pre-warmed connection.
+
+Each session starts a fresh process-wide registry (a new worker, or one
+whose pooled connection has expired), spends ``--think`` seconds in the
+scripted steps and then streams its first LLM turn. The fake endpoint
+charges ``--connect`` seconds per new connection, like DNS plus a TLS
+handshake to Azure. With ``Prewarmer`` the connection is opened at chat
+start, in the background, so the welcome message is not held up either.
+
+    python benchmarks/bench_prewarm.py --sessions 20 --connect 0.15 --think 0.5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common.fake_openai import FakeOpenAIServer
+from common.prewarm import Prewarmer
+from common.service_registry import ServiceRegistry
+
+INSTRUCTIONS = "You are a friendly and helpful Tech Support Bot. Follow the conversational flow provided by the system."
+
+
+async def session(args: argparse.Namespace, warm: bool) -> tuple[float, float]:
+    """Time ``on_chat_start`` spends warming and the first-turn time to first token of one session."""
+    registry = ServiceRegistry()
+    prewarmer = Prewarmer(warm=registry.warm_up, enabled=warm)
+    agent = registry.agent(name="TechSupportBot", instructions=INSTRUCTIONS)
+    start = time.perf_counter()
+    prewarmer.start()
+    welcome = time.perf_counter() - start  # what the welcome message waits for
+
+    await asyncio.sleep(args.think)
+    start = time.perf_counter()
+    first_token = None
+    async for response in agent.invoke_stream(messages="My laptop screen flickers when I unplug it."):
+        if first_token is None and response.message.content:
+            first_token = time.perf_counter() - start
+    await prewarmer.aclose()
+    await registry.aclose()
+    return welcome, first_token
+
+
+async def run(label: str, args: argparse.Namespace, server: FakeOpenAIServer, warm: bool):
+    connections_before = server.connections
+    results = [await session(args, warm) for _ in range(args.sessions)]
+    welcome = [w for w, _ in results]
+    ttft = [t for _, t in results]
+    print(f"{label:6s} first-turn TTFT p50 {statistics.median(ttft) * 1000:7.1f} ms  max {max(ttft) * 1000:7.1f} ms  "
+          f"start() max {max(welcome) * 1000:5.2f} ms  {server.connections - connections_before} connections")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--connect", type=float, default=0.15, help="seconds per new connection (DNS + TLS)")
+    parser.add_argument("--think", type=float, default=0.5, help="seconds spent in scripted steps")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake endpoint latency in seconds")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency, token_delay=0.002, connect_delay=args.connect) as server:
+        os.environ.update({
+            "AZURE_OPENAI_API_KEY": "fake-key",
+            "AZURE_OPENAI_API_ENDPOINT": server.url,
+            "AZURE_OPENAI_API_VERSION": "2024-10-21",
+            "AZURE_OPENAI_API_DEPLOYMENT_NAME": "fake-deployment",
+        })
+        await run("cold", args, server, warm=False)
+        await run("warm", args, server, warm=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
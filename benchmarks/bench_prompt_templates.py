@@ -0,0 +1,117 @@
+"""Prompt rendering time: cached prompt functions vs. loading the skill per request.
+
+Creates ``--skills`` synthetic skills (one prompt function each) next to the
+real WelcomeSkill, then renders them with ``name``/``company`` arguments
+through Semantic Kernel's template engine, once from functions kept in the
+process-wide cache and once from functions built with
+``KernelFunctionFromPrompt.from_directory`` per request. It then times what
+``03_chat_agent_skills.py`` does per request to get the skill onto its
+kernel: ``KernelSkill.refresh()`` against loading the skill and adding it
+again. Finally it edits a template and checks that the cache picks the
+change up.
+
+    python benchmarks/bench_prompt_templates.py --skills 50
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+from semantic_kernel import Kernel
+from semantic_kernel.functions import KernelArguments
+
+from common.prompt_templates import (
+    CONFIG_FILE, TEMPLATE_FILE, KernelSkill, PromptTemplateCache, build_function, load_skill,
+)
+
+WELCOME_DIR = os.path.join(ROOT, "00_sequential_chatflow", "skills", "WelcomeSkill", "generate_welcome_message")
+WELCOME = os.path.join(WELCOME_DIR, TEMPLATE_FILE)
+SKILLS_DIR = os.path.dirname(os.path.dirname(WELCOME_DIR))
+ARGUMENTS = KernelArguments(name="Ada Lovelace", company="Contoso")
+
+
+async def render(kernel: Kernel, function) -> str:
+    return await function.prompt_template.render(kernel, ARGUMENTS)
+
+
+def make_skills(directory: str, count: int) -> list[str]:
+    with open(WELCOME, encoding="utf-8") as f:
+        text = f.read()
+    function_dirs = []
+    for i in range(count):
+        function_dir = os.path.join(directory, f"Skill{i}", "generate_message")
+        os.makedirs(function_dir)
+        with open(os.path.join(function_dir, TEMPLATE_FILE), "w", encoding="utf-8") as f:
+            f.write(f"[variant {i}]\n{text}")
+        shutil.copy(os.path.join(WELCOME_DIR, CONFIG_FILE), function_dir)
+        function_dirs.append(function_dir)
+    return function_dirs
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skills", type=int, default=50)
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    kernel = Kernel()
+    directory = tempfile.mkdtemp(prefix="skills-")
+    try:
+        function_dirs = [WELCOME_DIR] + make_skills(directory, args.skills)
+        plugins = [os.path.basename(os.path.dirname(d)) for d in function_dirs]
+        skills = list(zip(function_dirs, plugins))
+        cache = PromptTemplateCache(reload_interval=2.0)
+        for function_dir, plugin in skills:
+            cache.get(function_dir, plugin)
+
+        async def cached():
+            for function_dir, plugin in skills:
+                await render(kernel, cache.get(function_dir, plugin))
+
+        async def per_request():
+            for function_dir, plugin in skills:
+                await render(kernel, build_function(function_dir, plugin))
+
+        rounds = max(1, args.number // len(skills))
+        for label, fn in (("cached", cached), ("per request", per_request)):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    await fn()
+                best = min(best, time.perf_counter() - start)
+            print(f"{label:12s} {best / (rounds * len(skills)) * 1e6:8.2f} us/render over {len(skills)} templates")
+
+        skill = KernelSkill(Kernel(), SKILLS_DIR, "WelcomeSkill", cache)
+        reload_kernel = Kernel()
+        for label, fn in (("refresh", skill.refresh),
+                          ("re-add", lambda: reload_kernel.add_plugin(load_skill(SKILLS_DIR, "WelcomeSkill", cache)))):
+            best = min(timeit.repeat(fn, number=args.number, repeat=3))
+            print(f"{label:12s} {best / args.number * 1e6:8.2f} us/request to register the skill")
+        print(f"{'':12s} refresh registered the skill {skill.registrations} time(s)")
+
+        assert (await render(kernel, cache.get(WELCOME_DIR, "WelcomeSkill"))
+                == await render(kernel, build_function(WELCOME_DIR, "WelcomeSkill")))
+
+        # Hot reload: an edited template is rebuilt once the interval has passed
+        cache.reload_interval = 0.05
+        path = os.path.join(function_dirs[1], TEMPLATE_FILE)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\nSign it as the Acme onboarding team.")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+        time.sleep(0.06)
+        reloaded = (await render(kernel, cache.get(*skills[1]))).endswith("Acme onboarding team.")
+        print(f"compiles {cache.compiles}, reloads {cache.reloads}, edit picked up: {reloaded}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Chat completions against a throttling endpoint, with and without the rate limiter.
+
+Starts ``common.fake_openai`` with a concurrency quota (429 with Retry-After
+above ``--quota`` requests in flight) and fires ``--interactive`` and
+``--batch`` streamed chat requests at once, each retried on 429 after the
+advertised delay like the OpenAI client does. Without scheduling every
+request races for the quota; through ``ScheduledTransport`` the AIMD limit
+settles below it and interactive requests are admitted ahead of the batch.
+
+    python benchmarks/bench_rate_limiter.py --interactive 20 --batch 200 --quota 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx
+
+from common import rate_limiter
+from common.fake_openai import FakeOpenAIServer
+from common.rate_limiter import ChatScheduler, ScheduledTransport
+
+PATH = "/openai/deployments/fake/chat/completions?api-version=2024-10-21"
+MAX_RETRIES = 10
+
+
+async def ask(client: httpx.AsyncClient, url: str, level: int) -> tuple[float, int]:
+    """One streamed completion; returns its latency and the number of 429s it got."""
+    start = time.perf_counter()
+    throttled = 0
+    with rate_limiter.priority(level):
+        for _ in range(MAX_RETRIES):
+            async with client.stream("POST", url + PATH, json={
+                "messages": [{"role": "user", "content": "hello"}], "stream": True, "max_tokens": 64,
+            }) as response:
+                if response.status_code != 429:
+                    async for _ in response.aiter_bytes():
+                        pass
+                    return time.perf_counter() - start, throttled
+                await response.aread()
+                throttled += 1
+                delay = float(response.headers.get("retry-after", 1))
+            await asyncio.sleep(delay)
+    return time.perf_counter() - start, throttled
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[int(q * 100) - 1] if len(values) > 1 else values[0]
+
+
+async def run(server: FakeOpenAIServer, args: argparse.Namespace, scheduled: bool) -> dict:
+    limits = httpx.Limits(max_connections=args.interactive + args.batch)
+    if scheduled:
+        transport = ScheduledTransport(httpx.AsyncHTTPTransport(limits=limits),
+                                       scheduler_factory=lambda: ChatScheduler(max_concurrency=args.quota * 2))
+    else:
+        transport = httpx.AsyncHTTPTransport(limits=limits)
+    async with httpx.AsyncClient(transport=transport, timeout=120) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[ask(client, server.url, rate_limiter.INTERACTIVE) for _ in range(args.interactive)],
+            *[ask(client, server.url, rate_limiter.BATCH) for _ in range(args.batch)],
+        )
+        elapsed = time.perf_counter() - start
+    interactive = [latency for latency, _ in results[:args.interactive]]
+    batch = [latency for latency, _ in results[args.interactive:]]
+    return {
+        "elapsed": elapsed,
+        "throttled": sum(count for _, count in results),
+        "interactive": interactive,
+        "batch": batch,
+        "stats": transport.stats() if scheduled else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interactive", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=200)
+    parser.add_argument("--quota", type=int, default=8, help="requests in flight the endpoint accepts")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency, token_delay=0.002, max_concurrency=args.quota,
+                          retry_after=args.retry_after) as server:
+        for label, scheduled in (("unscheduled", False), ("scheduled", True)):
+            before = server.throttled
+            result = asyncio.run(run(server, args, scheduled))
+            print(f"{label:12s} {result['elapsed']:6.2f}s  429s {server.throttled - before:5d}  "
+                  f"interactive p50 {percentile(result['interactive'], 0.5) * 1000:7.1f} ms "
+                  f"p95 {percentile(result['interactive'], 0.95) * 1000:7.1f} ms  "
+                  f"batch p50 {percentile(result['batch'], 0.5) * 1000:7.1f} ms")
+            if result["stats"]:
+                print(f"{'':12s} {result['stats']}")
+
+
+if __name__ == "__main__":
+    main()
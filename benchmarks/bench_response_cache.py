@@ -0,0 +1,95 @@
+"""Follow-up latency and model calls with and without the response cache.
+
+Replays a skewed mix of ``STATE_FINAL`` follow-ups (a few phrases are very
+common, most are rare) against an agent backed by the in-process fake chat
+service, once straight to the agent and once through ``ResponseCache``.
+Keys are built like ``02_multi_choice_agent.py`` builds them: agent, topic,
+the normalized input and the remembered values the topic's prompt mentions
+(the software name on the software branch).
+
+    python benchmarks/bench_response_cache.py --turns 2000 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "00_sequential_chatflow")))
+
+from semantic_kernel.agents import ChatCompletionAgent
+
+from common.fake_chat_service import FakeChatCompletion
+from common.response_cache import ResponseCache, memory_context
+from tech_support_flow import TECH_SUPPORT_FLOW as FLOW
+
+COMMON_FOLLOW_UPS = ["Thanks!", "thanks", "No, that's all.", "How long will it take?", "ok thank you", "bye"]
+TOPICS = ["INTERNET_RESTARTED_YES", "SOFTWARE_ASK_PROBLEM", "HARDWARE_ASK_SYMPTOMS"]
+SOFTWARE = ["Excel", "excel", "Outlook", "Teams", "Word"]
+
+
+def follow_ups(turns: int, seed: int = 7) -> list[tuple[str, str, dict | None]]:
+    rng = random.Random(seed)
+    items = []
+    for i in range(turns):
+        text = rng.choice(COMMON_FOLLOW_UPS) if rng.random() < 0.7 else f"Something unusual happened, case {i}"
+        topic = rng.choice(TOPICS)
+        memory = {"software_name": rng.choice(SOFTWARE)} if topic == "SOFTWARE_ASK_PROBLEM" else None
+        items.append((text, topic, memory))
+    return items
+
+
+async def stream_from_agent(agent: ChatCompletionAgent, text: str):
+    async for response in agent.invoke_stream(messages=text):
+        if response.message.content:
+            yield response.message.content
+
+
+async def run(label: str, agent: ChatCompletionAgent, cache: ResponseCache | None, items, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def turn(text: str, topic: str, memory: dict | None):
+        async with semaphore:
+            start = time.perf_counter()
+            if cache is not None:
+                key = cache.key(text, agent.name, topic, memory_context(memory, FLOW.memory_fields(topic)))
+                stream = cache.stream(key, lambda: stream_from_agent(agent, text))
+            else:
+                stream = stream_from_agent(agent, text)
+            async for _ in stream:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    calls_before = agent.service.calls
+    start = time.perf_counter()
+    await asyncio.gather(*(turn(*item) for item in items))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:10s} p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  "
+          f"{len(items) / elapsed:7.1f} turns/s  {agent.service.calls - calls_before:5d} model calls")
+    if cache is not None:
+        print(f"{'':10s} hit rate {cache.stats.hit_rate:.1%}, {len(cache)} entries")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.1, help="fake model latency in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=200)
+    args = parser.parse_args()
+
+    service = FakeChatCompletion(latency=args.latency, tokens_per_second=args.tokens_per_second)
+    agent = ChatCompletionAgent(service=service, name="TechSupportBot", instructions="You are a Tech Support Bot.")
+    items = follow_ups(args.turns)
+    await run("no cache", agent, None, items, args.concurrency)
+    await run("cache", agent, ResponseCache.from_env(), items, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
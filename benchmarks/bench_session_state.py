@@ -0,0 +1,136 @@
+"""Bytes per open session of the multi-choice bot, and the cost of reading its state per event.
+
+Builds ``--sessions`` sessions the way ``02_multi_choice_agent.py`` does and
+measures what they add to the process with ``tracemalloc``. Each session
+has a ``cl.user_session`` dict that already holds Chainlit's own six entries
+(id, env, chat_settings, user, chat_profile, client_type). On top of that it
+holds either the state as separate keys (the agent twice, the state string,
+the history, the topic, remembered values) or one ``TechSupportSession``.
+``idle`` sessions have only seen the welcome message. ``scripted`` ones went
+through the software branch, which leaves four turns in the history. Both
+layouts use the registry's shared agent and Chainlit's thread id string, so
+neither is counted.
+
+``cl.user_session.get`` copies those six fields into the dict on every call.
+The last line times the reads of one ``on_message`` event, done the old way
+and with the one state object.
+
+    python benchmarks/bench_session_state.py --sessions 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "00_sequential_chatflow")))
+
+from common.history import BoundedHistory
+from tech_support_flow import TECH_SUPPORT_FLOW as FLOW
+from tech_support_state import TechSupportSession
+
+SHARED = object()  # the registry's agent, Chainlit's env/settings objects
+CHAINLIT_FIELDS = ("id", "env", "chat_settings", "user", "chat_profile", "client_type")
+EVENTS = [("action", "software_problem"), ("text", "Excel"), ("text", "It crashes when I save")]
+
+
+def user_session_get(user_session: dict, key: str):
+    """What ``cl.user_session.get`` does besides the lookup."""
+    for field in CHAINLIT_FIELDS:
+        user_session[field] = SHARED
+    return user_session.get(key)
+
+
+def new_user_session() -> dict:
+    return dict.fromkeys(CHAINLIT_FIELDS, SHARED)
+
+
+def as_keys(thread_id: str, scripted: bool) -> dict:
+    user_session = new_user_session()
+    history = BoundedHistory()
+    user_session.update(agent=SHARED, conversation_state=FLOW.start().next_state, cl_history=history,
+                        tech_support_agent=SHARED)
+    if scripted:
+        for kind, value in EVENTS:
+            state = user_session["conversation_state"]
+            memory = {"software_name": user_session["software_name"]} if "software_name" in user_session else None
+            transition = FLOW.dispatch(state, **({"action": value} if kind == "action" else {"text": value}),
+                                       memory=memory)
+            if transition.store:
+                user_session[transition.store] = f"{value} {thread_id}"
+            history.append({"role": "user", "content": f"{value} {thread_id}"})
+            history.append({"role": "assistant", "content": transition.response})
+            if transition.next_state != state:
+                user_session["topic"] = state
+            # States restored from the conversation log are new string objects
+            user_session["conversation_state"] = "".join(transition.next_state)
+    return user_session
+
+
+def as_object(thread_id: str, scripted: bool) -> dict:
+    user_session = new_user_session()
+    session = TechSupportSession(SHARED, BoundedHistory(), FLOW.start().next_state, thread_id)
+    user_session["session"] = session
+    if scripted:
+        for kind, value in EVENTS:
+            transition = FLOW.dispatch(session.state, **({"action": value} if kind == "action" else {"text": value}),
+                                       memory=session.memory)
+            if transition.store:
+                session.remember(transition.store, f"{value} {thread_id}")
+            session.history.append({"role": "user", "content": f"{value} {thread_id}"})
+            session.history.append({"role": "assistant", "content": transition.response})
+            session.move_to("".join(transition.next_state))
+    return user_session
+
+
+def measure(build, thread_ids: list[str], scripted: bool) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(thread_id, scripted) for thread_id in thread_ids]
+    size = tracemalloc.get_traced_memory()[0] - before - sys.getsizeof(kept)
+    tracemalloc.stop()
+    return size / len(thread_ids)
+
+
+def read_keys(user_session: dict):
+    # on_message, then apply_transition and respond_with_llm, before this change
+    user_session_get(user_session, "agent")
+    user_session_get(user_session, "conversation_state")
+    user_session_get(user_session, "software_name")
+    user_session_get(user_session, "agent")
+    user_session_get(user_session, "cl_history")
+    user_session_get(user_session, "conversation_state")
+    user_session_get(user_session, "topic")
+
+
+def read_object(user_session: dict):
+    session = user_session_get(user_session, "session")
+    return session.agent, session.state, session.memory, session.history, session.topic
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20000)
+    args = parser.parse_args()
+
+    thread_ids = [f"3f0c1c2e-7d4b-4b8e-9a51-{i:012d}" for i in range(args.sessions)]
+    base = measure(lambda thread_id, scripted: new_user_session(), thread_ids, False)
+    history = measure(lambda thread_id, scripted: BoundedHistory(), thread_ids, False)
+    print(f"Chainlit's own user_session dict {base:5.0f} B; an empty BoundedHistory {history:5.0f} B")
+    for scripted in (False, True):
+        label = "scripted" if scripted else "idle"
+        keys = measure(as_keys, thread_ids, scripted) - base
+        state = measure(as_object, thread_ids, scripted) - base
+        print(f"{label:9s} separate keys {keys:6.0f} B/session   state object {state:6.0f} B/session   "
+              f"({state * 50000 / 2 ** 20:5.1f} MiB per 50k sessions)")
+
+    keys_session, object_session = as_keys(thread_ids[0], True), as_object(thread_ids[0], True)
+    number = 200000
+    keys_time = min(timeit.repeat(lambda: read_keys(keys_session), number=number, repeat=3)) / number
+    object_time = min(timeit.repeat(lambda: read_object(object_session), number=number, repeat=3)) / number
+    print(f"state reads per event: separate keys {keys_time * 1e9:5.0f} ns   state object {object_time * 1e9:5.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
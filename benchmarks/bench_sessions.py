@@ -0,0 +1,88 @@
+"""Sessions per second with and without the shared service registry.
+
+Simulates Chainlit sessions against the local fake endpoint. Each session
+runs what ``on_chat_start`` does plus one chat turn:
+
+- ``per-session``: a new ``Kernel`` and ``AzureChatCompletion`` per session
+  (the old behaviour, one HTTP client each),
+- ``registry``: the agent handed out by ``common.service_registry``.
+
+    python benchmarks/bench_sessions.py --sessions 300 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common.fake_openai import FakeOpenAIServer
+from common.service_registry import ServiceRegistry
+
+INSTRUCTIONS = "You are a friendly and helpful Tech Support Bot."
+
+
+async def per_session_turn():
+    import semantic_kernel as sk
+    from semantic_kernel.agents import ChatCompletionAgent
+    from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+
+    kernel = sk.Kernel()
+    service = AzureChatCompletion(
+        deployment_name=os.getenv("AZURE_OPENAI_API_DEPLOYMENT_NAME"),
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        endpoint=os.getenv("AZURE_OPENAI_API_ENDPOINT"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+    )
+    kernel.add_service(service)
+    agent = ChatCompletionAgent(kernel=kernel, name="TechSupportBot", instructions=INSTRUCTIONS)
+    await agent.get_response(messages="My printer is on fire.")
+    await service.client.close()
+
+
+def registry_turn(registry: ServiceRegistry):
+    async def turn():
+        agent = registry.agent(name="TechSupportBot", instructions=INSTRUCTIONS)
+        await agent.get_response(messages="My printer is on fire.")
+    return turn
+
+
+async def run(label: str, turn, sessions: int, concurrency: int, server: FakeOpenAIServer):
+    semaphore = asyncio.Semaphore(concurrency)
+    connections_before = server.connections
+
+    async def session():
+        async with semaphore:
+            await turn()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:12s} {sessions / elapsed:8.1f} sessions/s  "
+          f"{elapsed:6.2f}s total  {server.connections - connections_before:5d} TCP connections")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake endpoint latency in seconds")
+    args = parser.parse_args()
+
+    with FakeOpenAIServer(latency=args.latency) as server:
+        os.environ.update({
+            "AZURE_OPENAI_API_KEY": "fake-key",
+            "AZURE_OPENAI_API_ENDPOINT": server.url,
+            "AZURE_OPENAI_API_VERSION": "2024-10-21",
+            "AZURE_OPENAI_API_DEPLOYMENT_NAME": "fake-deployment",
+        })
+        await run("per-session", per_session_turn, args.sessions, args.concurrency, server)
+
+        registry = ServiceRegistry()
+        await run("registry", registry_turn(registry), args.sessions, args.concurrency, server)
+        await registry.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""Load spike of identical questions with and without single-flight deduplication.
+
+``--users`` sessions arrive within ``--spread`` seconds, each asking one of
+``--questions`` distinct follow-ups, and stream the answer from an agent
+backed by the in-process fake chat service. With ``SingleFlight`` identical
+prompts in flight at the same time share one generation. A share of the users
+(``--leave``) stops reading halfway through, which must not cut the answer
+short for the others.
+
+    python benchmarks/bench_single_flight.py --users 200 --questions 5 --latency 0.5
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from contextlib import aclosing
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from semantic_kernel.agents import ChatCompletionAgent
+
+from common.fake_chat_service import FakeChatCompletion
+from common.single_flight import SingleFlight
+
+# Closing a half-read Semantic Kernel stream makes OpenTelemetry log a harmless context detach error
+logging.getLogger("opentelemetry.context").setLevel(logging.CRITICAL)
+
+REPLY = "We are aware of the outage in your area and engineers are working on it. Service should be back within two hours."
+
+
+async def stream_from_agent(agent: ChatCompletionAgent, text: str):
+    async with aclosing(agent.invoke_stream(messages=text)) as responses:
+        async for response in responses:
+            if response.message.content:
+                yield str(response.message.content)
+
+
+async def run(label: str, agent: ChatCompletionAgent, flights: SingleFlight | None, args: argparse.Namespace):
+    rng = random.Random(3)
+    latencies = []
+    complete = 0
+
+    async def user(question: str, delay: float, leave: bool):
+        nonlocal complete
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        if flights:
+            key = flights.key(agent, question)
+            stream = flights.stream(key, lambda: stream_from_agent(agent, question))
+        else:
+            stream = stream_from_agent(agent, question)
+        parts = []
+        async for token in stream:
+            parts.append(token)
+            if leave and len(parts) == 5:
+                await stream.aclose()
+                return
+        latencies.append(time.perf_counter() - start)
+        complete += "".join(parts) == REPLY
+
+    calls_before = agent.service.calls
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        user(f"Is there an outage? (question {rng.randrange(args.questions)})", rng.uniform(0, args.spread),
+             rng.random() < args.leave)
+        for _ in range(args.users)
+    ))
+    elapsed = time.perf_counter() - start
+    calls = agent.service.calls - calls_before
+    if latencies:
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{label:14s} p50 {statistics.median(latencies) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  "
+              f"{elapsed:5.2f}s  {calls:4d} model calls  {complete}/{len(latencies)} complete answers")
+    else:
+        print(f"{label:14s} every user left early  {elapsed:5.2f}s  {calls:4d} model calls")
+    if flights:
+        print(f"{'':14s} {flights.stats}, {flights.in_flight} still in flight")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--spread", type=float, default=0.5, help="seconds over which users arrive")
+    parser.add_argument("--leave", type=float, default=0.2, help="share of users leaving mid-answer")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model latency in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=50)
+    args = parser.parse_args()
+
+    service = FakeChatCompletion(latency=args.latency, tokens_per_second=args.tokens_per_second, reply=REPLY)
+    agent = ChatCompletionAgent(service=service, name="TechSupportBot", instructions="You are a Tech Support Bot.")
+    await run("separate calls", agent, None, args)
+    await run("single flight", agent, SingleFlight(), args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,325 @@
+"""Offline benchmark suite for the example agents.
+
+Every scenario runs against ``FakeChatCompletion`` (deterministic latency,
+token rate and tool calls) and, for MCP, the stub server, so it needs neither
+Azure OpenAI nor network access:
+
+- ``initial_agent``: single response from 00_initial_agent.py's agent,
+- ``custom_plugin``: function calling into MenuPlugin plus structured output
+  validated as ``MenuItem`` (00_simple_agent_custom_plugin.py),
+- ``multi_choice_scripted``: a scripted Tech Support conversation through the
+  compiled flow and bounded history (02_multi_choice_agent.py),
+- ``multi_choice_llm``: a streamed STATE_FINAL follow-up through the response
+  cache and token coalescer,
+- ``mcp_agent``: the IssueAgent calling a GitHub tool on the stub MCP server.
+
+For each scenario it reports p50/p95/p99 latency, throughput and memory
+(peak and retained, measured in a separate traced pass).
+
+    python benchmarks/run_suite.py --iterations 200 --concurrency 10 --json results.json
+    python benchmarks/run_suite.py --baseline results.json --tolerance 0.25   # exit 1 on regression
+"""
+import argparse
+import asyncio
+import gc
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "00_sequential_chatflow"))
+sys.path.append(os.path.join(ROOT, "02_agents_with_plugins"))
+
+from common.fake_chat_service import FakeChatCompletion
+from common.history import BoundedHistory
+from common.response_cache import ResponseCache, memory_context
+from common.streaming import TokenCoalescer
+
+STUB_MCP_SERVER = os.path.join(ROOT, "benchmarks", "stub_mcp_server.py")
+
+
+def load_script(relative_path: str):
+    """Import one of the numbered example scripts (not importable by name)."""
+    path = os.path.join(ROOT, relative_path)
+    name = "bench_" + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@dataclass
+class Result:
+    scenario: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    throughput: float
+    peak_kib: float = 0.0
+    retained_kib: float = 0.0
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Scenario:
+    """Builds its fixtures once in ``setup`` and runs one request per ``run``."""
+
+    name = ""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+
+    def fake_service(self, **kwargs) -> FakeChatCompletion:
+        return FakeChatCompletion(latency=self.args.latency, tokens_per_second=self.args.tokens_per_second, **kwargs)
+
+    async def setup(self):
+        pass
+
+    async def run(self, i: int):
+        raise NotImplementedError
+
+    async def teardown(self):
+        pass
+
+
+class InitialAgent(Scenario):
+    name = "initial_agent"
+
+    async def setup(self):
+        module = load_script("00_sequential_chatflow/00_initial_agent.py")
+        self.agent = module.create_agent(self.fake_service(
+            reply="Language's essence, Semantic threads intertwine, Meaning's core revealed."))
+
+    async def run(self, i: int):
+        await self.agent.get_response(messages="Write a haiku about Semantic Kernel.")
+
+
+class CustomPlugin(Scenario):
+    name = "custom_plugin"
+
+    async def setup(self):
+        module = load_script("02_agents_with_plugins/00_simple_agent_custom_plugin.py")
+        self.menu_item = module.MenuItem
+        self.agent = module.create_agent(self.fake_service(
+            tool_calls=[
+                [("MenuPlugin-get_specials", {})],
+                [("MenuPlugin-get_item_price", {"menu_item": "Clam Chowder"})],
+            ],
+            reply='{"price": 9.99, "name": "Clam Chowder"}',
+        ))
+
+    async def run(self, i: int):
+        response = await self.agent.get_response(messages="What is the price of the soup special?")
+        self.menu_item.model_validate_json(str(response.message.content))
+
+
+class MultiChoiceScripted(Scenario):
+    name = "multi_choice_scripted"
+
+    async def setup(self):
+        from tech_support_flow import TECH_SUPPORT_FLOW
+        from tech_support_state import TechSupportSession
+        self.flow = TECH_SUPPORT_FLOW
+        self.session_class = TechSupportSession
+
+    async def run(self, i: int):
+        flow = self.flow
+        transition = flow.start()
+        session = self.session_class(None, BoundedHistory(), transition.next_state, f"conversation-{i}")
+        events = [("action", "software_problem"), ("text", f"Excel {i}"), ("text", "It crashes when I save"),
+                  ("action", "start_over"), ("action", "internet_issue"), ("action", "internet_restarted_yes"),
+                  ("text", "Websites load very slowly")]
+        for kind, value in events:
+            if kind == "action":
+                transition = flow.dispatch(session.state, action=value)
+                session.history.append({"role": "user", "content": f"Action: {value}"})
+            else:
+                transition = flow.dispatch(session.state, text=value, memory=session.memory)
+                session.history.append({"role": "user", "content": value})
+                if transition.store:
+                    session.remember(transition.store, value)
+            session.history.append({"role": "assistant", "content": transition.response})
+            session.move_to(transition.next_state)
+
+
+class MultiChoiceLLM(Scenario):
+    name = "multi_choice_llm"
+    FOLLOW_UPS = ["Thanks!", "How long will it take?", "No, that's all.", "Can you escalate this?"]
+
+    async def setup(self):
+        from semantic_kernel.agents import ChatCompletionAgent
+
+        self.agent = ChatCompletionAgent(
+            service=self.fake_service(reply="You're welcome! A technician will follow up within one business day. "
+                                            "Is there anything else I can help you with today?"),
+            name="TechSupportBot",
+            instructions="You are a friendly and helpful Tech Support Bot.",
+        )
+        self.cache = ResponseCache()
+        from tech_support_flow import TECH_SUPPORT_FLOW
+        self.flow = TECH_SUPPORT_FLOW
+
+    async def run(self, i: int):
+        history = BoundedHistory()
+        history.append({"role": "user", "content": "Action: Hardware Failure"})
+        history.append({"role": "assistant", "content": "Please describe the symptoms you're observing."})
+        # Every other follow-up is unique, so half the turns reach the model
+        user_input = self.FOLLOW_UPS[i % 4] if i % 2 else f"My laptop fan makes noise #{i}"
+        history.append({"role": "user", "content": user_input})
+
+        async def stream_from_agent():
+            async for response in self.agent.invoke_stream(messages=history.to_chat_messages()):
+                if response.message.content:
+                    yield response.message.content
+
+        async def send(chunk: str):
+            pass
+
+        stream = TokenCoalescer(send)
+        # Keyed like 02_multi_choice_agent.py
+        topic = "HARDWARE_ASK_SYMPTOMS"
+        context = memory_context(None, self.flow.memory_fields(topic))
+        key = self.cache.key(user_input, self.agent.name, topic, context)
+        async for token in self.cache.stream(key, stream_from_agent):
+            await stream.push(token)
+        await stream.aclose()
+        history.append({"role": "assistant", "content": stream.text})
+
+
+class MCPAgent(Scenario):
+    name = "mcp_agent"
+
+    async def setup(self):
+        from semantic_kernel.connectors.mcp import MCPStdioPlugin
+        from common.mcp_pool import MCPServerPool
+
+        module = load_script("02_agents_with_plugins/01_agent_with_mcp_plugin.py")
+        self.module = module
+        self.pool = MCPServerPool(
+            lambda: MCPStdioPlugin(name="Github", command=sys.executable, args=[STUB_MCP_SERVER]), size=1)
+        await self.pool.start()
+        self.service = self.fake_service(
+            tool_calls=[[("Github-get_issue", {"owner": "microsoft", "repo": "semantic-kernel", "issue_number": 10785})]],
+            reply="Issue #10785 is open and labelled python.",
+        )
+
+    async def run(self, i: int):
+        async with self.pool.lease() as plugin:
+            agent = self.module.make_agent(self.service, plugin)
+            await agent.get_response(messages="What is the status of issue #10785?")
+
+    async def teardown(self):
+        await self.pool.close()
+
+
+SCENARIOS = [InitialAgent, CustomPlugin, MultiChoiceScripted, MultiChoiceLLM, MCPAgent]
+
+
+async def measure(scenario: Scenario, iterations: int, concurrency: int) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await scenario.run(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(iterations)))
+    return sorted(latencies), time.perf_counter() - start
+
+
+async def run_scenario(cls, args: argparse.Namespace) -> Result:
+    scenario = cls(args)
+    await scenario.setup()
+    try:
+        await measure(scenario, args.warmup, args.concurrency)
+        latencies, elapsed = await measure(scenario, args.iterations, args.concurrency)
+
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await measure(scenario, args.memory_iterations, args.concurrency)
+        peak = tracemalloc.get_traced_memory()[1]
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    finally:
+        await scenario.teardown()
+
+    return Result(
+        scenario=cls.name,
+        iterations=args.iterations,
+        p50_ms=statistics.median(latencies) * 1000,
+        p95_ms=percentile(latencies, 0.95) * 1000,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        throughput=args.iterations / elapsed,
+        peak_kib=(peak - baseline) / 1024,
+        retained_kib=(retained - baseline) / 1024,
+    )
+
+
+def regressions(results: list[Result], baseline_path: str, tolerance: float) -> list[str]:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+    problems = []
+    for result in results:
+        before = baseline.get(result.scenario)
+        if not before:
+            continue
+        if result.p95_ms > before["p95_ms"] * (1 + tolerance):
+            problems.append(f"{result.scenario}: p95 {before['p95_ms']:.2f} -> {result.p95_ms:.2f} ms")
+        if result.throughput < before["throughput"] * (1 - tolerance):
+            problems.append(f"{result.scenario}: throughput {before['throughput']:.1f} -> {result.throughput:.1f}/s")
+        if result.peak_kib > max(before["peak_kib"], 64) * (1 + tolerance):
+            problems.append(f"{result.scenario}: peak memory {before['peak_kib']:.0f} -> {result.peak_kib:.0f} KiB")
+    return problems
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=[s.name for s in SCENARIOS])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--memory-iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="fake model latency in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="fake streaming rate, 0 = unthrottled")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    results = []
+    print(f"{'scenario':24s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'req/s':>9s} {'peak KiB':>9s} {'kept KiB':>9s}")
+    for cls in selected:
+        result = await run_scenario(cls, args)
+        results.append(result)
+        print(f"{result.scenario:24s} {result.p50_ms:9.2f} {result.p95_ms:9.2f} {result.p99_ms:9.2f} "
+              f"{result.throughput:9.1f} {result.peak_kib:9.1f} {result.retained_kib:9.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": [asdict(r) for r in results]}, f, indent=2)
+    if args.baseline:
+        problems = regressions(results, args.baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
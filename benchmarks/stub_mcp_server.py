@@ -0,0 +1,42 @@
+"""Minimal stdio MCP server that mimics a few GitHub tools.
+
+Used by the benchmarks instead of ``@modelcontextprotocol/server-github`` so
+they need neither Node nor network access. ``STUB_MCP_DELAY`` adds a fixed
+delay (seconds) to every tool call and ``STUB_MCP_STARTUP_DELAY`` to startup.
+
+    python benchmarks/stub_mcp_server.py
+"""
+import asyncio
+import json
+import os
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+DELAY = float(os.getenv("STUB_MCP_DELAY", 0))
+
+mcp = FastMCP("stub-github")
+
+
+@mcp.tool()
+async def list_issues(owner: str, repo: str, state: str = "open", labels: list[str] | None = None,
+                      per_page: int = 5) -> str:
+    """List issues in a GitHub repository."""
+    await asyncio.sleep(DELAY)
+    return json.dumps([
+        {"number": 11358 - i, "title": f"Python: stub issue {i}", "state": state, "labels": labels or ["python"]}
+        for i in range(per_page)
+    ])
+
+
+@mcp.tool()
+async def get_issue(owner: str, repo: str, issue_number: int) -> str:
+    """Get the details of a GitHub issue."""
+    await asyncio.sleep(DELAY)
+    return json.dumps({"number": issue_number, "title": "Port dotnet feature: Create MCP Sample",
+                       "state": "open", "labels": ["python"], "comments": 0})
+
+
+if __name__ == "__main__":
+    time.sleep(float(os.getenv("STUB_MCP_STARTUP_DELAY", 0)))
+    mcp.run()
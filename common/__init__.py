@@ -0,0 +1,6 @@
+"""Shared building blocks for the semantic-kernel examples.
+
+The example scripts live in numbered folders that are not importable packages,
+so each script puts the repository root on ``sys.path`` and imports helpers
+from here, e.g. ``from common.service_registry import get_registry``.
+"""
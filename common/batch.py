@@ -0,0 +1,294 @@
+"""Bounded-concurrency helpers for batch runs of agents.
+
+``bounded_as_completed`` runs a worker over a (possibly huge, possibly async)
+stream of items with at most ``concurrency`` calls in flight and yields
+results in completion order. Items are pulled lazily, so memory stays
+proportional to the concurrency limit rather than to the input size.
+
+    async for item, result, error in bounded_as_completed(questions, ask, concurrency=8):
+        ...
+
+``run_jsonl_batch`` builds a prompt-file runner on top of it. Prompts are read
+line by line from a JSONL (or plain text) file and answers are appended to an
+output JSONL file as they finish, in completion order and tagged with their
+input line. A ``Checkpoint`` file records how far the run has got:
+
+- the input offset below which every line is answered (the watermark), plus
+  the few lines above it that finished early,
+- the size of the output file at that moment,
+- the input file it belongs to (absolute path, size and modification time).
+
+It is replaced atomically every ``checkpoint_every`` seconds. Resuming seeks
+the input to the watermark and truncates the output to the recorded size, so
+a run killed at any point continues without duplicate or missing answers.
+A checkpoint written for another (or a since modified) input file raises
+``CheckpointError`` instead of skipping lines, and an existing output file
+without a checkpoint is never overwritten (``FileExistsError``).
+Latencies go into a fixed-bucket histogram. Memory therefore depends on the
+concurrency, not on the number of lines.
+
+    stats = await run_jsonl_batch("prompts.jsonl", "answers.jsonl", answer, concurrency=16,
+                                  checkpoint_path="answers.jsonl.ckpt")
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Iterator, TypeVar
+
+from common.telemetry import Histogram
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def _aiter(items: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def bounded_as_completed(
+    items: Iterable[T] | AsyncIterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: int = 8,
+) -> AsyncIterator[tuple[T, R | None, BaseException | None]]:
+    """Yield ``(item, result, error)`` for every item as soon as its worker finishes.
+
+    A failing worker does not stop the batch: its exception is returned as
+    ``error``. Cancelling the consumer cancels the workers still running.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    source = _aiter(items)
+    running: dict[asyncio.Task, Any] = {}
+    exhausted = False
+
+    async def fill():
+        nonlocal exhausted
+        while not exhausted and len(running) < concurrency:
+            try:
+                item = await source.__anext__()
+            except StopAsyncIteration:
+                exhausted = True
+                break
+            running[asyncio.ensure_future(worker(item))] = item
+
+    try:
+        await fill()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = running.pop(task)
+                error = asyncio.CancelledError() if task.cancelled() else task.exception()
+                yield item, (None if error else task.result()), error
+            await fill()
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+@dataclass
+class BatchStats:
+    answered: int = 0
+    failed: int = 0
+    resumed_at: int = 1            # first input line of this run
+    elapsed: float = 0.0
+    latency: Histogram = field(default_factory=Histogram)
+
+    @property
+    def throughput(self) -> float:
+        return (self.answered + self.failed) / self.elapsed if self.elapsed else 0.0
+
+    def report(self) -> str:
+        h = self.latency
+        return (f"{self.answered} answered, {self.failed} failed in {self.elapsed:.1f}s "
+                f"({self.throughput:.2f} items/s); latency p50 {h.percentile(0.5) * 1000:.0f} ms "
+                f"p95 {h.percentile(0.95) * 1000:.0f} ms max {h.max * 1000:.0f} ms")
+
+
+class CheckpointError(RuntimeError):
+    """The checkpoint does not describe the input or output file of this run."""
+
+
+def input_signature(path: str) -> dict:
+    """What identifies an input file between runs: its absolute path, size and modification time."""
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class Checkpoint:
+    """Progress of a batch over one input file; see the module docstring."""
+
+    def __init__(self, path: str | None, input_file: dict | None = None, next_line: int = 1, input_offset: int = 0,
+                 output_offset: int = 0, done: Iterable[int] = ()):
+        self.path = path
+        self.input_file = input_file        # input_signature() of the file being answered
+        self.next_line = next_line          # first line not known to be answered
+        self.input_offset = input_offset    # where that line starts
+        self.output_offset = output_offset
+        self.skip = set(done)               # lines above next_line answered by an earlier run
+        self._open: dict[int, list] = {}    # lines read and not yet passed, in input order: [offset, end, done]
+        self._last_read = next_line - 1
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.path) and os.path.exists(self.path)
+
+    @classmethod
+    def load(cls, path: str | None, input_path: str) -> "Checkpoint":
+        """Progress over ``input_path`` saved at ``path``; a fresh checkpoint if there is none."""
+        signature = input_signature(input_path)
+        if not path or not os.path.exists(path):
+            return cls(path, signature)
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("input") != signature:
+            # Resuming would skip (or repeat) lines of a file the checkpoint was not written for
+            recorded = (state.get("input") or {}).get("path", "an unknown input")
+            raise CheckpointError(f"{path} records progress over {recorded} and does not match {input_path} "
+                                  f"as it is now; remove it (and its output) or choose another output file")
+        return cls(path, signature, state["next_line"], state["input_offset"], state["output_offset"], state["done"])
+
+    def started(self, line_no: int, offset: int, end: int):
+        self._open[line_no] = [offset, end, False]
+        self._last_read = line_no
+
+    def finished(self, line_no: int):
+        self._open[line_no][2] = True
+        # Advance the watermark over the oldest lines that are all answered
+        while self._open:
+            first = next(iter(self._open))
+            offset, end, done = self._open[first]
+            if not done:
+                self.next_line, self.input_offset = first, offset
+                return
+            del self._open[first]
+            self.next_line, self.input_offset = first + 1, end
+
+    def passed(self, line_no: int, offset: int, end: int):
+        """Count a line that needs no answer (blank, or answered before the resume)."""
+        self.skip.discard(line_no)
+        self.started(line_no, offset, end)
+        self.finished(line_no)
+
+    def save(self, output_offset: int):
+        if not self.path:
+            return
+        self.output_offset = output_offset
+        done = [line for line, (_, _, answered) in self._open.items() if answered]
+        done += sorted(line for line in self.skip if line > self._last_read)
+        state = {"input": self.input_file, "next_line": self.next_line, "input_offset": self.input_offset,
+                 "output_offset": output_offset, "done": done}
+        # Written aside and renamed: a crash leaves the old or the new checkpoint, never half of one
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+
+def _parse_line(raw: bytes) -> dict | ValueError | None:
+    try:
+        text = raw.decode("utf-8").strip()
+        if not text:
+            return None
+        return json.loads(text) if text.startswith("{") else {"prompt": text}
+    except ValueError as e:
+        return ValueError(f"invalid input line: {e}")
+
+
+def read_prompts(path: str, checkpoint: Checkpoint) -> Iterator[tuple[int, int, int, dict | ValueError]]:
+    """Yield ``(line, offset, end, record)`` from the checkpoint's watermark on, skipping answered lines.
+
+    JSON lines are used as they are; other lines become ``{"prompt": line}``.
+    A line that is not valid UTF-8 or JSON is yielded with a ``ValueError``
+    in place of the record, so one bad line fails alone instead of the run.
+    """
+    with open(path, "rb") as f:
+        f.seek(checkpoint.input_offset)
+        line_no, offset = checkpoint.next_line, checkpoint.input_offset
+        for raw in f:
+            end = offset + len(raw)
+            record = _parse_line(raw)
+            if record is None or line_no in checkpoint.skip:
+                checkpoint.passed(line_no, offset, end)
+            else:
+                yield line_no, offset, end, record
+            line_no, offset = line_no + 1, end
+
+
+async def run_jsonl_batch(input_path: str, output_path: str, worker: Callable[[dict], Awaitable[str]],
+                          concurrency: int = 8, checkpoint_path: str | None = None,
+                          checkpoint_every: float = 1.0) -> BatchStats:
+    """Answer every prompt of ``input_path`` with ``worker`` and append the answers to ``output_path``.
+
+    Output records are ``{"line", "id", "response", "seconds"}`` (``"id"`` if
+    the input record has one), or ``{"line", "id", "error"}`` for failures.
+    A line that is not valid JSON gets an error record too. With
+    ``checkpoint_path`` an interrupted run resumes where it stopped; failed
+    lines count as answered and are not retried.
+
+    Raises ``CheckpointError`` if the checkpoint belongs to another input or
+    its output file is missing or shorter than recorded, and
+    ``FileExistsError`` if ``output_path`` has content but no checkpoint.
+    """
+    checkpoint = Checkpoint.load(checkpoint_path, input_path)
+    output_size = os.path.getsize(output_path) if os.path.exists(output_path) else None
+    if checkpoint.exists:
+        if (output_size or 0) < checkpoint.output_offset:
+            raise CheckpointError(f"{output_path} is missing answers recorded in {checkpoint_path}")
+    elif output_size:
+        # Only answers a checkpoint accounts for are ever dropped
+        raise FileExistsError(f"{output_path} already has answers and no checkpoint to resume from; "
+                              f"remove it or choose another output file")
+    stats = BatchStats(resumed_at=checkpoint.next_line)
+
+    async def timed(item):
+        if isinstance(item[3], ValueError):
+            raise item[3]
+        start = time.perf_counter()
+        response = await worker(item[3])
+        return response, time.perf_counter() - start
+
+    def prompts():
+        for item in read_prompts(input_path, checkpoint):
+            checkpoint.started(*item[:3])
+            yield item
+
+    with open(output_path, "wb" if output_size is None else "r+b") as output:
+        # Answers written after the last checkpoint are redone, so drop them
+        output.truncate(checkpoint.output_offset)
+        output.seek(0, os.SEEK_END)
+        start = last_save = time.perf_counter()
+        try:
+            async for (line_no, _, _, record), result, error in bounded_as_completed(prompts(), timed, concurrency):
+                entry = {"line": line_no}
+                if isinstance(record, dict) and "id" in record:
+                    entry["id"] = record["id"]
+                if error is None:
+                    response, seconds = result
+                    entry.update(response=response, seconds=round(seconds, 3))
+                    stats.answered += 1
+                    stats.latency.record(seconds)
+                else:
+                    entry["error"] = repr(error)
+                    stats.failed += 1
+                    print(f"# line {line_no} failed: {error!r}", file=sys.stderr)
+                output.write(json.dumps(entry, ensure_ascii=False).encode() + b"\n")
+                checkpoint.finished(line_no)
+                if time.perf_counter() - last_save >= checkpoint_every:
+                    output.flush()
+                    checkpoint.save(output.tell())
+                    last_save = time.perf_counter()
+        finally:
+            output.flush()
+            checkpoint.save(output.tell())
+            stats.elapsed = time.perf_counter() - start
+    return stats
@@ -0,0 +1,355 @@
+"""Record/replay cassettes of model and MCP tool traffic.
+
+Profiling the agents against live Azure OpenAI and the GitHub MCP server
+mixes their latency and variance into every run. A cassette is an
+append-only JSONL file with one line per exchange:
+
+- ``llm``: a chat completion request (keyed on its body, without the model
+  name) and the response bytes, split into the chunks the server sent, each
+  with the delay before it,
+- ``tools``: the tool definitions of a recorded plugin, so a replayed agent
+  offers the model exactly the same functions,
+- ``tool``: a tool call (keyed on plugin, function and arguments), its
+  result and how long it took.
+
+When recording, ``transport()`` sits under the OpenAI client's ``httpx``
+client and ``tool_filter`` in the kernel; when replaying, the same two
+answer from the file, at the recorded pace divided by ``speed`` (``0`` for
+no delays), and ``plugin_factory()`` stands in for the MCP server. The
+agent code runs unchanged, so what remains in a profile is its own work:
+the function-calling loop, thread handling, (de)serialization.
+
+    SK_CASSETTE=runs/issues.jsonl SK_CASSETTE_MODE=record python 01_agent_with_mcp_plugin.py
+    SK_CASSETTE=runs/issues.jsonl SK_CASSETTE_SPEED=0 python -m cProfile 01_agent_with_mcp_plugin.py
+
+Identical requests are answered in recorded order and then from the start
+again, so one recorded turn can be replayed in a loop. A request that is not
+in the cassette gets a 404 naming it.
+
+Configuration (``from_env``):
+
+    SK_CASSETTE         cassette file; unset disables recording and replay
+    SK_CASSETTE_MODE    record | replay (default replay)
+    SK_CASSETTE_SPEED   replay speed-up, 0 for no delays (default 1)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from functools import partial
+
+import httpx
+
+from common.config import AzureOpenAISettings
+from common.tool_cache import canonical_arguments
+
+
+# Response headers needed to decode a replayed body
+_KEPT_HEADERS = ("content-type", "content-encoding")
+
+
+class CassetteError(LookupError):
+    """Raised when a replayed exchange is not in the cassette."""
+
+
+@dataclass
+class CassetteStats:
+    recorded: int = 0
+    replayed: int = 0
+    missing: int = 0
+
+
+def request_key(body: bytes) -> str:
+    """Key of a chat completion request: its JSON body without the deployment's model name."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return hashlib.blake2b(body, digest_size=16).hexdigest()
+    payload.pop("model", None)
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def tool_key(plugin_name: str, function_name: str, arguments) -> str:
+    return f"{plugin_name}-{function_name}:{canonical_arguments(arguments)}"
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", speed: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"cassette mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.stats = CassetteStats()
+        self._lock = threading.Lock()
+        self._exchanges: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        self._positions: dict[tuple[str, str], int] = defaultdict(int)
+        self._tools: dict[str, list[dict]] = {}
+        if self.replaying:
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> "Cassette | None":
+        path = os.getenv("SK_CASSETTE")
+        if not path:
+            return None
+        return cls(path, mode=os.getenv("SK_CASSETTE_MODE", "replay"), speed=float(os.getenv("SK_CASSETTE_SPEED", 1)))
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def settings(self, settings: AzureOpenAISettings) -> AzureOpenAISettings:
+        """``settings`` with placeholders for what a replay does not need."""
+        if self.recording:
+            return settings.require()
+        return replace(
+            settings,
+            api_key=settings.api_key or "replay",
+            endpoint=settings.endpoint or "https://replay.invalid",
+            api_version=settings.api_version or "2024-10-21",
+            deployment_name=settings.deployment_name or "replay",
+        )
+
+    def transport(self, transport: httpx.AsyncBaseTransport | None = None) -> "CassetteTransport":
+        """``httpx`` transport recording to (or replaying from) this cassette."""
+        return CassetteTransport(self, transport)
+
+    def record_tools(self, plugin):
+        """Store the tool definitions of ``plugin`` (once per plugin name)."""
+        if not self.recording or plugin.name in self._tools:
+            return
+        functions = []
+        for attribute in sorted(dir(plugin)):
+            method = getattr(plugin, attribute, None)
+            if getattr(method, "__kernel_function__", False):
+                functions.append({
+                    "name": method.__kernel_function_name__,
+                    "description": method.__kernel_function_description__,
+                    # type_object is a Python class (MCP prompts, Python plugins); "type"/"type_" name it
+                    "parameters": [{k: v for k, v in parameter.items() if k != "type_object"}
+                                   for parameter in method.__kernel_function_parameters__],
+                })
+        self._tools[plugin.name] = functions
+        self._append({"type": "tools", "plugin": plugin.name, "functions": functions})
+
+    def plugin_factory(self, name: str):
+        """Factory of stand-ins for the MCP plugin ``name``, for ``MCPServerPool``."""
+        if name not in self._tools:
+            raise CassetteError(f"no tools of plugin {name!r} in {self.path}")
+        return partial(ReplayPlugin, name, self._tools[name])
+
+    async def tool_filter(self, context, next):
+        """Function-invocation filter recording or answering the calls of recorded plugins."""
+        function = context.function
+        if function.plugin_name not in self._tools:
+            await next(context)
+            return
+        key = tool_key(function.plugin_name, function.name, context.arguments)
+        if self.recording:
+            start = time.monotonic()
+            await next(context)
+            value = context.result.value if context.result is not None else None
+            self._append({"type": "tool", "key": key, "seconds": round(time.monotonic() - start, 4),
+                          **_dump_result(value)})
+            return
+        exchange = self._next("tool", key)
+        if exchange is None:
+            raise CassetteError(f"tool call {key} is not in {self.path}")
+        await self._sleep(exchange["seconds"])
+        from semantic_kernel.functions import FunctionResult
+
+        context.result = FunctionResult(function=function.metadata, value=_load_result(exchange))
+
+    def _append(self, exchange: dict):
+        line = json.dumps(exchange, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.stats.recorded += 1
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise CassetteError(f"cassette {self.path} does not exist; record it first (SK_CASSETTE_MODE=record)")
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                exchange = json.loads(line)
+                if exchange["type"] == "tools":
+                    self._tools[exchange["plugin"]] = exchange["functions"]
+                else:
+                    self._exchanges[(exchange["type"], exchange["key"])].append(exchange)
+
+    def _next(self, kind: str, key: str) -> dict | None:
+        exchanges = self._exchanges.get((kind, key))
+        if not exchanges:
+            self.stats.missing += 1
+            return None
+        with self._lock:
+            position = self._positions[(kind, key)]
+            self._positions[(kind, key)] = position + 1
+        self.stats.replayed += 1
+        return exchanges[position % len(exchanges)]
+
+    async def _sleep(self, seconds: float):
+        if self.speed > 0 and seconds > 0:
+            await asyncio.sleep(seconds / self.speed)
+
+
+class ReplayPlugin:
+    """Stand-in for an MCP plugin: the recorded tools, answered by ``Cassette.tool_filter``."""
+
+    def __init__(self, name: str, functions: list[dict]):
+        from semantic_kernel.functions import kernel_function
+
+        self.name = name
+        self.session = self  # MCPServerPool health checks ping the session
+        for spec in functions:
+            method = kernel_function(name=spec["name"], description=spec["description"])(
+                partial(self._call, spec["name"]))
+            method.__kernel_function_parameters__ = spec["parameters"]
+            setattr(self, spec["name"], method)
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send_ping(self):
+        pass
+
+    async def _call(self, tool_name: str, **kwargs):
+        raise CassetteError(f"{self.name}-{tool_name} was called without the cassette's tool filter")
+
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """Passes the response through and stores it with its timing once fully read."""
+
+    def __init__(self, cassette: Cassette, key: str, response: httpx.Response, started: float):
+        self._cassette = cassette
+        self._key = key
+        self._response = response
+        self._last = started
+        self._chunks: list[list] = []
+        self._complete = False
+
+    async def __aiter__(self):
+        async for chunk in self._response.stream:
+            now = time.monotonic()
+            self._chunks.append([round(now - self._last, 4), chunk.decode("utf-8", "surrogateescape")])
+            self._last = now
+            yield chunk
+        self._complete = True
+
+    async def aclose(self):
+        try:
+            await self._response.stream.aclose()
+        finally:
+            # A stream abandoned half way is not a usable recording
+            if self._complete:
+                self._cassette._append({
+                    "type": "llm", "key": self._key, "status": self._response.status_code,
+                    "headers": {name: self._response.headers[name] for name in _KEPT_HEADERS
+                                if name in self._response.headers},
+                    "chunks": self._chunks,
+                })
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    def __init__(self, cassette: Cassette, chunks: list[list]):
+        self._cassette = cassette
+        self._chunks = chunks
+        self._position = 0  # iterating again continues, like a socket (the OpenAI client drains streams)
+        self._due: float | None = None
+
+    async def __aiter__(self):
+        speed = self._cassette.speed
+        loop = asyncio.get_running_loop()
+        # Chunks are due at their recorded offsets; sleeping per gap would add up timer slack
+        if self._due is None:
+            self._due = loop.time()
+        while self._position < len(self._chunks):
+            delay, text = self._chunks[self._position]
+            self._position += 1
+            if speed > 0:
+                self._due += delay / speed
+                if self._due > loop.time():
+                    await asyncio.sleep(self._due - loop.time())
+            yield text.encode("utf-8", "surrogateescape")
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """Records chat completions passing through ``transport``, or replays them without network."""
+
+    def __init__(self, cassette: Cassette, transport: httpx.AsyncBaseTransport | None = None):
+        self.cassette = cassette
+        self._transport = transport or (httpx.AsyncHTTPTransport() if cassette.recording else None)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(await request.aread())
+        if self.cassette.recording:
+            started = time.monotonic()
+            response = await self._transport.handle_async_request(request)
+            return httpx.Response(
+                status_code=response.status_code,
+                headers=response.headers,
+                stream=_RecordingStream(self.cassette, key, response, started),
+                extensions=response.extensions,
+            )
+        exchange = self.cassette._next("llm", key)
+        if exchange is None:
+            return httpx.Response(404, json={"error": {
+                "code": "NotInCassette", "message": f"request {key} is not in {self.cassette.path}"}})
+        return httpx.Response(exchange["status"], headers=exchange["headers"],
+                              stream=_ReplayStream(self.cassette, exchange["chunks"]))
+
+    async def aclose(self):
+        if self._transport is not None:
+            await self._transport.aclose()
+
+
+def _dump_result(value) -> dict:
+    if isinstance(value, list) and all(hasattr(item, "text") for item in value):
+        # The model sees str() of the result, which includes MCP's own content objects
+        mcp = any(type(getattr(item, "inner_content", None)).__module__.startswith("mcp.") for item in value)
+        return {"texts": [item.text for item in value], "mcp": mcp}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return {"value": value}
+    return {"value": str(value)}
+
+
+def _load_result(exchange: dict):
+    if "texts" in exchange:
+        from semantic_kernel.contents import TextContent
+
+        if exchange.get("mcp"):
+            from mcp import types
+
+            return [TextContent(text=text, inner_content=types.TextContent(type="text", text=text))
+                    for text in exchange["texts"]]
+        return [TextContent(text=text) for text in exchange["texts"]]
+    return exchange["value"]
+
+
+_cassette: Cassette | None = None
+_cassette_loaded = False
+
+
+def get_cassette() -> Cassette | None:
+    """The cassette configured for this process (``SK_CASSETTE``), or ``None``."""
+    global _cassette, _cassette_loaded
+    if not _cassette_loaded:
+        _cassette = Cassette.from_env()
+        _cassette_loaded = True
+    return _cassette
@@ -0,0 +1,107 @@
+"""Shared configuration and bootstrap for the example scripts.
+
+Every script used to probe ``../.env`` and ``.env`` itself and import the
+Azure OpenAI connector at module load, even when the code path never reaches
+the model. ``bootstrap()`` loads the environment once per process, validates
+the Azure OpenAI settings and reports what is missing; the chat service (and
+with it ``semantic_kernel``/``openai``) is only built on first real use:
+
+    from common.config import bootstrap, create_chat_service
+
+    settings = bootstrap()          # cheap: .env + os.environ, no SDK import
+    ...
+    service = create_chat_service() # first call imports the connector
+
+The ``.env`` file is looked up in the current directory's parent, the current
+directory, then the repository root; the first one found wins and variables
+already set in the environment are never overridden.
+"""
+import os
+import sys
+from dataclasses import dataclass, fields
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class ConfigError(RuntimeError):
+    """Raised when a setting needed to reach the model is missing."""
+
+
+@dataclass(frozen=True)
+class AzureOpenAISettings:
+    api_key: str | None
+    endpoint: str | None
+    api_version: str | None
+    deployment_name: str | None
+
+    ENV = {
+        "api_key": "AZURE_OPENAI_API_KEY",
+        "endpoint": "AZURE_OPENAI_API_ENDPOINT",
+        "api_version": "AZURE_OPENAI_API_VERSION",
+        "deployment_name": "AZURE_OPENAI_API_DEPLOYMENT_NAME",
+    }
+
+    @classmethod
+    def from_env(cls) -> "AzureOpenAISettings":
+        return cls(**{f.name: os.getenv(cls.ENV[f.name]) or None for f in fields(cls)})
+
+    def missing(self) -> list[str]:
+        return [self.ENV[f.name] for f in fields(self) if getattr(self, f.name) is None]
+
+    def require(self) -> "AzureOpenAISettings":
+        missing = self.missing()
+        if missing:
+            raise ConfigError(f"Azure OpenAI is not configured, missing: {', '.join(missing)}")
+        return self
+
+
+_env_file: str | None = None
+_settings: AzureOpenAISettings | None = None
+
+
+def find_env_file() -> str | None:
+    for path in (os.path.join("..", ".env"), ".env", os.path.join(REPO_ROOT, ".env")):
+        if os.path.exists(path):
+            return os.path.abspath(path)
+    return None
+
+
+def bootstrap() -> AzureOpenAISettings:
+    """Load ``.env`` and validate the settings (once per process)."""
+    global _env_file, _settings
+    if _settings is None:
+        _env_file = find_env_file()
+        if _env_file:
+            from dotenv import load_dotenv
+
+            load_dotenv(dotenv_path=_env_file)
+        else:
+            print("Warning: .env file not found. Please ensure Azure OpenAI credentials are set.", file=sys.stderr)
+        _settings = AzureOpenAISettings.from_env()
+        missing = _settings.missing()
+        if missing:
+            print(f"Warning: missing {', '.join(missing)}; requests to the model will fail.", file=sys.stderr)
+    return _settings
+
+
+def get_settings() -> AzureOpenAISettings:
+    return _settings or bootstrap()
+
+
+def create_chat_service(settings: AzureOpenAISettings | None = None, **kwargs):
+    """Build an ``AzureChatCompletion`` from ``settings`` (default: the validated process settings).
+
+    Extra keyword arguments (e.g. ``async_client``) go to the connector.
+    """
+    settings = settings or get_settings().require()
+    from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+
+    if "async_client" in kwargs:
+        return AzureChatCompletion(deployment_name=settings.deployment_name, **kwargs)
+    return AzureChatCompletion(
+        deployment_name=settings.deployment_name,
+        api_key=settings.api_key,
+        endpoint=settings.endpoint,
+        api_version=settings.api_version,
+        **kwargs,
+    )
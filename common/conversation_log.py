@@ -0,0 +1,290 @@
+"""Durable conversation log with batched, write-behind storage.
+
+Chat history otherwise lives only in the Chainlit session: a worker restart
+loses the context of every open ticket and nothing is left to analyse later.
+``ConversationLog`` appends every turn to a SQLite file (WAL mode) without
+putting disk I/O on the request path:
+
+- ``record()`` only appends to an in-memory buffer and wakes a writer task,
+- the writer waits ``flush_interval`` to collect more turns and writes the
+  batch in one transaction on a worker thread,
+- ``turns()`` reads a session's history (optionally limited to a time range
+  or to its last turns) through the ``(session_id, ts)`` index, including
+  turns still waiting in the buffer, so a reconnecting session is rehydrated
+  with a single indexed query,
+- ``remember()`` and ``memory()`` do the same for the values a flow stores
+  (e.g. the software name), one row per session and name.
+
+The database is opened on first use, in ``.data/`` at the repository root
+unless configured otherwise. Whatever is still buffered when the process
+exits is written by an ``atexit`` hook. The buffer is bounded: when it is
+full, or a batch has failed ``max_failures`` times in a row (disk full, file
+locked), turns are dropped and counted in ``dropped`` rather than kept in
+memory indefinitely.
+
+    log = ConversationLog.from_env()
+    log.record(session_id, "user", "my wifi is down", state="INITIAL")
+    rows = await log.turns(session_id, last=40)
+    await log.aclose()
+
+Configuration (``from_env``):
+
+    SK_CONVERSATION_DB             SQLite file (default .data/conversations.db)
+    SK_CONVERSATION_FLUSH_MS       how long the writer collects a batch (default 50)
+    SK_CONVERSATION_BATCH          turns per transaction at most (default 500)
+    SK_CONVERSATION_MAX_PENDING    buffered turns at most (default 10000)
+    SK_CONVERSATION_MAX_FAILURES   failed writes of a batch before it is dropped (default 5)
+"""
+import asyncio
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".data", "conversations.db")
+
+
+@dataclass(frozen=True)
+class LoggedTurn:
+    session_id: str
+    ts: float
+    role: str
+    content: str
+    state: str | None = None
+
+
+@dataclass(frozen=True)
+class RememberedValue:
+    session_id: str
+    name: str
+    value: str
+
+
+class ConversationLog:
+    def __init__(self, path: str = DEFAULT_DB, flush_interval: float = 0.05, batch_size: int = 500,
+                 max_pending: int = 10000, max_failures: int = 5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.max_failures = max_failures
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self._failures = 0  # consecutive failed writes
+        self._dropping = False
+        self._pending: list[LoggedTurn | RememberedValue] = []
+        self._lock = threading.Lock()  # guards the buffer
+        self._db_lock = threading.Lock()  # guards the connection
+        self._wakeup: asyncio.Event | None = None
+        self._writing: asyncio.Lock | None = None
+        self._writer: asyncio.Task | None = None
+        self._conn: sqlite3.Connection | None = None
+        # Turns recorded just before the process exits are not lost
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> "ConversationLog":
+        return cls(
+            path=os.getenv("SK_CONVERSATION_DB", DEFAULT_DB),
+            flush_interval=float(os.getenv("SK_CONVERSATION_FLUSH_MS", 50)) / 1000,
+            batch_size=int(os.getenv("SK_CONVERSATION_BATCH", 500)),
+            max_pending=int(os.getenv("SK_CONVERSATION_MAX_PENDING", 10000)),
+            max_failures=int(os.getenv("SK_CONVERSATION_MAX_FAILURES", 5)),
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def record(self, session_id: str, role: str, content: str, state: str | None = None):
+        """Queue a turn for writing; never blocks on the database."""
+        self._queue(LoggedTurn(session_id, time.time(), role, content, state))
+
+    def remember(self, session_id: str, name: str, value: str):
+        """Queue a value the session's flow stored, replacing an earlier one of the same name."""
+        self._queue(RememberedValue(session_id, name, value))
+
+    async def memory(self, session_id: str) -> dict[str, str]:
+        """Values remembered for a session, including those still buffered."""
+        with self._lock:
+            buffered = [v for v in self._pending if isinstance(v, RememberedValue) and v.session_id == session_id]
+        rows = await asyncio.to_thread(self._query, "SELECT name, value FROM memory WHERE session_id = ?", [session_id])
+        memory = dict(rows)
+        memory.update((v.name, v.value) for v in buffered)
+        return memory
+
+    def _queue(self, item: LoggedTurn | RememberedValue):
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                # The database is not keeping up (or failing): keep memory bounded
+                self.dropped += 1
+                return
+            self._pending.append(item)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, tests): write through
+            self._write(self._peek(len(self._pending)))
+            return
+        if self._writer is None or self._writer.done():
+            self._wakeup = asyncio.Event()
+            self._writing = self._writing or asyncio.Lock()
+            self._writer = loop.create_task(self._write_behind())
+        self._wakeup.set()
+
+    async def turns(self, session_id: str, since: float | None = None, until: float | None = None,
+                    last: int | None = None) -> list[LoggedTurn]:
+        """Turns of a session in order, optionally within ``[since, until]`` or only the ``last`` ones."""
+        query = "SELECT session_id, ts, role, content, state FROM turns WHERE session_id = ?"
+        params: list = [session_id]
+        if since is not None:
+            query += " AND ts >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND ts <= ?"
+            params.append(until)
+        query += " ORDER BY ts DESC, id DESC"
+        if last is not None:
+            query += " LIMIT ?"
+            params.append(last)
+        # Buffer first: a batch committed while we query then shows up in the
+        # rows and is skipped here, instead of being missed by both
+        with self._lock:
+            buffered = [t for t in self._pending if isinstance(t, LoggedTurn) and t.session_id == session_id
+                        and (since is None or t.ts >= since) and (until is None or t.ts <= until)]
+        rows = [LoggedTurn(*row) for row in reversed(await asyncio.to_thread(self._query, query, params))]
+        if buffered:
+            stored = set(rows)
+            rows += [t for t in buffered if t not in stored]
+        return rows[-last:] if last is not None else rows
+
+    async def sessions(self, since: float, until: float | None = None) -> list[str]:
+        """Sessions with at least one turn in ``[since, until]``, most recent first."""
+        query = "SELECT session_id, MAX(ts) AS last_ts FROM turns WHERE ts >= ?"
+        params: list = [since]
+        if until is not None:
+            query += " AND ts <= ?"
+            params.append(until)
+        query += " GROUP BY session_id ORDER BY last_ts DESC"
+        return [row[0] for row in await asyncio.to_thread(self._query, query, params)]
+
+    async def flush(self):
+        """Write everything buffered so far."""
+        if self._writing is None:
+            self._writing = asyncio.Lock()
+        async with self._writing:
+            while self._pending:
+                await asyncio.to_thread(self._write, self._peek(self.batch_size))
+
+    async def aclose(self):
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        await self.flush()
+        self.close()
+
+    def close(self):
+        """Write what is still buffered (best effort) and close the database; also run at exit."""
+        atexit.unregister(self.close)
+        try:
+            while self._pending:
+                self._write(self._peek(self.batch_size))
+        except sqlite3.Error as e:
+            self.dropped += len(self._pending)
+            print(f"# conversation log: {len(self._pending)} turns not written: {e}", file=sys.stderr)
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def _write_behind(self):
+        while True:
+            await self._wakeup.wait()
+            # Let more turns arrive so they share one transaction
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                self._failures = 0
+                self._dropping = False
+            except sqlite3.Error as e:
+                # The turns stay buffered and go with the next batch, unless
+                # the database keeps failing
+                self._failures += 1
+                if self._failures >= self.max_failures:
+                    self._failures = 0
+                    async with self._writing:
+                        self._drop(self.batch_size, e)
+
+    def _drop(self, count: int, error: Exception):
+        with self._lock:
+            dropped = len(self._pending[:count])
+            del self._pending[:count]
+        self.dropped += dropped
+        if not self._dropping:
+            # Once per outage, not once per batch
+            self._dropping = True
+            print(f"# conversation log: dropping turns after {self.max_failures} failed writes: {error}",
+                  file=sys.stderr)
+
+    def _peek(self, count: int) -> list[LoggedTurn | RememberedValue]:
+        with self._lock:
+            return self._pending[:count]
+
+    def _connection(self) -> sqlite3.Connection:
+        # Called with _db_lock held; opened on first use, not at import time
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS turns ("
+                " id INTEGER PRIMARY KEY, session_id TEXT NOT NULL, ts REAL NOT NULL,"
+                " role TEXT NOT NULL, content TEXT NOT NULL, state TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS turns_session_ts ON turns (session_id, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS turns_ts ON turns (ts)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS memory ("
+                " session_id TEXT NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL,"
+                " PRIMARY KEY (session_id, name))"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _write(self, batch: list[LoggedTurn | RememberedValue]):
+        if not batch:
+            return
+        turns = [(t.session_id, t.ts, t.role, t.content, t.state) for t in batch if isinstance(t, LoggedTurn)]
+        values = [(v.session_id, v.name, v.value) for v in batch if isinstance(v, RememberedValue)]
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                if turns:
+                    conn.executemany(
+                        "INSERT INTO turns (session_id, ts, role, content, state) VALUES (?, ?, ?, ?, ?)", turns)
+                if values:
+                    conn.executemany("INSERT OR REPLACE INTO memory (session_id, name, value) VALUES (?, ?, ?)",
+                                     values)
+                conn.execute("COMMIT")
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        with self._lock:
+            # Only the writer removes turns, and only once they are stored
+            del self._pending[:len(batch)]
+        self.written += len(batch)
+        self.batches += 1
+
+    def _query(self, query: str, params: list) -> list[tuple]:
+        with self._db_lock:
+            return self._connection().execute(query, params).fetchall()
@@ -0,0 +1,117 @@
+"""In-process fake chat completion service for offline runs.
+
+``FakeChatCompletion`` plugs into a ``Kernel`` or ``ChatCompletionAgent``
+wherever ``AzureChatCompletion`` would, but answers locally with a fixed
+reply after a configurable latency, streaming it at a configurable token
+rate. Unlike ``common.fake_openai`` it skips HTTP entirely, so it measures
+the overhead of the code around the model call.
+
+It can also behave like a model that calls tools: ``tool_calls`` lists rounds
+of ``(plugin-function, arguments)`` calls, emitted one round per request
+until every round has its results, after which ``reply`` is returned. The
+kernel runs the functions exactly as it would for a real model.
+
+    service = FakeChatCompletion(
+        latency=0.2,
+        tool_calls=[[("MenuPlugin-get_specials", {})], [("MenuPlugin-get_item_price", {"menu_item": "Clam Chowder"})]],
+        reply='{"price": 9.99, "name": "Clam Chowder"}',
+    )
+    agent = ChatCompletionAgent(service=service, name="Bot", plugins=[MenuPlugin()])
+"""
+import asyncio
+import json
+import re
+from typing import Any, AsyncGenerator, ClassVar
+
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.function_calling_utils import update_settings_from_function_call_configuration
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import (
+    AuthorRole, ChatHistory, ChatMessageContent, FunctionCallContent, StreamingChatMessageContent,
+)
+from semantic_kernel.contents.utils.finish_reason import FinishReason
+
+_TOKENS = re.compile(r"\s*\S+")
+
+
+class FakeChatCompletion(ChatCompletionClientBase):
+    """Chat completion service that answers ``reply`` without any network call.
+
+    ``latency`` is waited before the first token, ``tokens_per_second`` paces
+    streamed tokens (0 streams as fast as possible). ``calls`` counts requests.
+    """
+
+    SUPPORTS_FUNCTION_CALLING: ClassVar[bool] = True
+
+    reply: str = "This is a canned answer from the fake chat service."
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    tool_calls: list[list[tuple[str, dict]]] = []
+    calls: int = 0
+
+    def __init__(self, service_id: str = "fake", ai_model_id: str = "fake-model", **kwargs: Any):
+        super().__init__(service_id=service_id, ai_model_id=ai_model_id, **kwargs)
+
+    def reply_for(self, chat_history: ChatHistory) -> str:
+        return self.reply
+
+    def get_prompt_execution_settings_class(self) -> type[PromptExecutionSettings]:
+        return OpenAIChatPromptExecutionSettings
+
+    def _update_function_choice_settings_callback(self):
+        return update_settings_from_function_call_configuration
+
+    def _reset_function_choice_settings(self, settings: PromptExecutionSettings) -> None:
+        if hasattr(settings, "tool_choice"):
+            settings.tool_choice = None
+        if hasattr(settings, "tools"):
+            settings.tools = None
+
+    def _next_tool_calls(self, chat_history: ChatHistory, settings: PromptExecutionSettings) -> list[FunctionCallContent]:
+        if not self.tool_calls or not getattr(settings, "tools", None):
+            return []
+        # Rounds already answered since the user's last message
+        rounds = 0
+        for message in reversed(chat_history.messages):
+            if message.role == AuthorRole.USER:
+                break
+            if any(isinstance(item, FunctionCallContent) for item in message.items):
+                rounds += 1
+        if rounds >= len(self.tool_calls):
+            return []
+        return [
+            FunctionCallContent(id=f"call_{rounds}_{i}", index=i, name=name, arguments=json.dumps(arguments))
+            for i, (name, arguments) in enumerate(self.tool_calls[rounds])
+        ]
+
+    async def _inner_get_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings
+    ) -> list[ChatMessageContent]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        tool_calls = self._next_tool_calls(chat_history, settings)
+        if tool_calls:
+            return [ChatMessageContent(role=AuthorRole.ASSISTANT, items=tool_calls,
+                                       finish_reason=FinishReason.TOOL_CALLS, ai_model_id=self.ai_model_id)]
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content=self.reply_for(chat_history),
+                                   finish_reason=FinishReason.STOP, ai_model_id=self.ai_model_id)]
+
+    async def _inner_get_streaming_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings, function_invoke_attempt: int = 0
+    ) -> AsyncGenerator[list[StreamingChatMessageContent], Any]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        tool_calls = self._next_tool_calls(chat_history, settings)
+        if tool_calls:
+            yield [StreamingChatMessageContent(role=AuthorRole.ASSISTANT, choice_index=0, items=tool_calls,
+                                               finish_reason=FinishReason.TOOL_CALLS, ai_model_id=self.ai_model_id,
+                                               function_invoke_attempt=function_invoke_attempt)]
+            return
+        delay = 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for i, token in enumerate(_TOKENS.findall(self.reply_for(chat_history))):
+            if i:
+                await asyncio.sleep(delay)
+            yield [StreamingChatMessageContent(role=AuthorRole.ASSISTANT, content=token, choice_index=0,
+                                               ai_model_id=self.ai_model_id,
+                                               function_invoke_attempt=function_invoke_attempt)]
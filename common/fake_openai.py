@@ -0,0 +1,213 @@
+"""Local stand-in for an Azure OpenAI chat completions deployment.
+
+Serves ``POST /openai/deployments/<name>/chat/completions`` with canned
+answers, both as plain JSON and as a server-sent event stream, so the examples
+and benchmarks can run without network access. The server speaks HTTP/1.1
+with keep-alive and counts accepted TCP connections, which makes connection
+reuse visible. It can also throttle like a deployment at its quota, answering
+429 with ``Retry-After`` above ``max_concurrency`` requests in flight or
+``requests_per_minute`` requests per minute. ``connect_delay`` is paid once
+per new connection, like DNS and a TLS handshake to the real endpoint, and
+``GET /openai/models`` answers the cheap call used to warm connections.
+
+    with FakeOpenAIServer(latency=0.05) as server:
+        os.environ["AZURE_OPENAI_API_ENDPOINT"] = server.url
+        ...
+        print(server.connections, server.requests)
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        if self.server.owner.connect_delay:
+            time.sleep(self.server.owner.connect_delay)
+
+    def do_GET(self):
+        self.server.owner._count_request()
+        if self.path.split("?", 1)[0].endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"code": "NotFound", "message": self.path}})
+
+    def do_POST(self):
+        server: FakeOpenAIServer = self.server.owner
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        server._count_request()
+
+        if not self.path.split("?", 1)[0].endswith("/chat/completions"):
+            self._send_json(404, {"error": {"code": "NotFound", "message": self.path}})
+            return
+
+        if not server._admit():
+            self._send_json(429, {"error": {"code": "429", "message": "Rate limit is exceeded."}},
+                            {"Retry-After": f"{server.retry_after:g}"})
+            return
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+
+            tokens = server.reply_tokens(body)
+            if body.get("stream"):
+                self._send_stream(tokens, server.token_delay)
+            else:
+                self._send_json(200, _completion(body, "".join(tokens)))
+        finally:
+            server._finish()
+
+    def _send_json(self, status: int, payload: dict, headers: dict | None = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, tokens: list[str], token_delay: float):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, token in enumerate(tokens):
+            if i and token_delay:
+                time.sleep(token_delay)
+            self._write_chunk(_event(_chunk({"content": token}, None)))
+        self._write_chunk(_event(_chunk({}, "stop")))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+def _completion(body: dict, content: str) -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _chunk(delta: dict, finish_reason: str | None) -> dict:
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+def _event(payload: dict) -> bytes:
+    return b"data: " + json.dumps(payload).encode() + b"\n\n"
+
+
+class FakeOpenAIServer:
+    """Threaded fake chat completions endpoint bound to localhost.
+
+    ``latency`` is slept before the first byte of every answer and
+    ``token_delay`` between streamed tokens. ``reply`` is the answer text; it
+    is split on spaces into stream tokens.
+
+    Throttling is off by default: ``max_concurrency`` and
+    ``requests_per_minute`` (counted per fixed minute window) answer 429 with
+    ``Retry-After: retry_after`` past the limit; ``throttled`` counts them.
+    ``connect_delay`` is slept once per accepted connection.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 token_delay: float = 0.0, reply: str = "This is a canned answer from the fake endpoint.",
+                 max_concurrency: int = 0, requests_per_minute: int = 0, retry_after: float = 1.0,
+                 connect_delay: float = 0.0):
+        self.latency = latency
+        self.connect_delay = connect_delay
+        self.token_delay = token_delay
+        self.reply = reply
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.retry_after = retry_after
+        self.connections = 0
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self._window = (0, 0)  # (minute, requests admitted in it)
+        self._counter_lock = threading.Lock()
+        self._httpd = _CountingHTTPServer((host, port), _Handler)
+        self._httpd.owner = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reply_tokens(self, body: dict) -> list[str]:
+        words = self.reply.split(" ")
+        return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+    def _count_request(self):
+        with self._counter_lock:
+            self.requests += 1
+
+    def _admit(self) -> bool:
+        with self._counter_lock:
+            minute, count = self._window
+            now = int(time.monotonic() // 60)
+            if now != minute:
+                minute, count = now, 0
+            if (self.max_concurrency and self.in_flight >= self.max_concurrency) or (
+                    self.requests_per_minute and count >= self.requests_per_minute):
+                self.throttled += 1
+                return False
+            self._window = (minute, count + 1)
+            self.in_flight += 1
+            return True
+
+    def _finish(self):
+        with self._counter_lock:
+            self.in_flight -= 1
+
+    def _count_connection(self):
+        with self._counter_lock:
+            self.connections += 1
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _CountingHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+    def get_request(self):
+        request = super().get_request()
+        self.owner._count_connection()
+        return request
@@ -0,0 +1,195 @@
+"""Declarative engine for scripted, button-driven conversations.
+
+A flow is described once with plain data (states, the steps buttons and typed
+input lead to, and named action sets) and compiled at import time into
+read-only lookup tables. Handling an event is then a couple of dict lookups:
+
+    flow = Flow(FlowSpec(...))
+    transition = flow.dispatch(state, action="internet_issue")
+    transition = flow.dispatch(state, text="my wifi is down", memory=session_memory)
+
+Button clicks and typed input go through the same ``dispatch`` call, so a new
+branch only needs new entries in the spec. The engine knows nothing about
+Chainlit; callers turn ``Transition.actions`` into UI buttons.
+"""
+from dataclasses import dataclass, field
+from string import Formatter
+from types import MappingProxyType
+from typing import Mapping
+
+
+@dataclass(frozen=True)
+class ActionSpec:
+    """A button offered to the user."""
+    name: str
+    label: str
+    value: str
+
+
+@dataclass(frozen=True)
+class Step:
+    """The bot's answer to an event and the state the conversation moves to.
+
+    ``response`` may reference ``{input}`` (the text the user typed) and any
+    value remembered with ``store``. ``actions`` names the action set shown
+    with the answer. ``llm`` hands the turn to the language model instead of
+    answering with ``response``.
+    """
+    response: str
+    next_state: str
+    actions: str | None = None
+    store: str | None = None
+    llm: bool = False
+
+
+@dataclass(frozen=True)
+class StateSpec:
+    """How a state reacts to typed input.
+
+    ``commands`` maps typed phrases (compared case-insensitively) to action
+    names, so typing "start over" behaves like clicking the button.
+    ``classify`` marks states where typed text may be matched to one of the
+    buttons shown by ``on_text`` (see ``Flow.intent_labels``).
+    """
+    on_text: Step
+    commands: Mapping[str, str] = field(default_factory=dict)
+    classify: bool = False
+
+
+@dataclass(frozen=True)
+class FlowSpec:
+    start: Step
+    states: Mapping[str, StateSpec]
+    actions: Mapping[str, Step]
+    action_sets: Mapping[str, tuple[ActionSpec, ...]]
+    defaults: Mapping[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Result of dispatching one event."""
+    response: str
+    actions: tuple[ActionSpec, ...]
+    next_state: str
+    store: str | None = None
+    llm: bool = False
+    action: ActionSpec | None = None
+
+
+class _Template:
+    __slots__ = ("text", "constant", "fields")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.fields = tuple(dict.fromkeys(name for _, name, _, _ in Formatter().parse(text) if name is not None))
+        self.constant = not self.fields
+
+    def render(self, values: Mapping[str, str]) -> str:
+        return self.text if self.constant else self.text.format_map(values)
+
+
+class _CompiledStep:
+    __slots__ = ("template", "next_state", "actions", "store", "llm")
+
+    def __init__(self, step: Step, action_sets: Mapping[str, tuple[ActionSpec, ...]]):
+        self.template = _Template(step.response)
+        self.next_state = step.next_state
+        self.actions = action_sets[step.actions] if step.actions else ()
+        self.store = step.store
+        self.llm = step.llm
+
+
+class Flow:
+    """A compiled ``FlowSpec``.
+
+    Compilation validates every reference (states, action sets, actions) so a
+    typo fails at startup instead of in the middle of a conversation.
+    """
+
+    def __init__(self, spec: FlowSpec):
+        self._validate(spec)
+        self.defaults = MappingProxyType(dict(spec.defaults))
+        self.action_sets = MappingProxyType({name: tuple(specs) for name, specs in spec.action_sets.items()})
+        self._action_specs = MappingProxyType(
+            {a.name: a for specs in self.action_sets.values() for a in specs}
+        )
+        self._on_action = MappingProxyType(
+            {name: _CompiledStep(step, self.action_sets) for name, step in spec.actions.items()}
+        )
+        self._on_text = MappingProxyType(
+            {name: _CompiledStep(state.on_text, self.action_sets) for name, state in spec.states.items()}
+        )
+        self._commands = MappingProxyType({
+            name: MappingProxyType({phrase.strip().lower(): action for phrase, action in state.commands.items()})
+            for name, state in spec.states.items()
+        })
+        self._intent_labels = MappingProxyType({
+            name: tuple(a.name for a in self._on_text[name].actions) if state.classify else ()
+            for name, state in spec.states.items()
+        })
+        self._memory_fields = MappingProxyType({
+            name: tuple(f for f in step.template.fields if f != "input") for name, step in self._on_text.items()
+        })
+        self._start = _CompiledStep(spec.start, self.action_sets)
+        self.initial_state = spec.start.next_state
+        self.states = frozenset(spec.states)
+
+    @property
+    def action_names(self) -> frozenset[str]:
+        return frozenset(self._on_action)
+
+    def intent_labels(self, state: str) -> tuple[str, ...]:
+        """Actions typed text may be classified into in ``state`` (empty if none)."""
+        return self._intent_labels[state]
+
+    def memory_fields(self, state: str | None) -> tuple[str, ...]:
+        """Remembered values the answer to typed text in ``state`` is built from."""
+        return self._memory_fields.get(state, ())
+
+    def hands_off(self, state: str) -> bool:
+        """Whether typed text in ``state`` goes to the language model."""
+        return self._on_text[state].llm
+
+    def start(self) -> Transition:
+        return self._transition(self._start, None, "")
+
+    def dispatch(self, state: str, *, action: str | None = None, text: str = "",
+                 memory: Mapping[str, str] | None = None) -> Transition:
+        """Resolve a button click (``action``) or typed ``text`` in ``state``."""
+        if action is None:
+            action = self._commands[state].get(text.strip().lower())
+        if action is not None:
+            return self._transition(self._on_action[action], memory, text, self._action_specs.get(action))
+        return self._transition(self._on_text[state], memory, text)
+
+    def _transition(self, step: _CompiledStep, memory, text: str, action: ActionSpec | None = None) -> Transition:
+        if step.template.constant:
+            response = step.template.text
+        else:
+            values = dict(self.defaults)
+            if memory:
+                values.update(memory)
+            values["input"] = text
+            response = step.template.render(values)
+        return Transition(response, step.actions, step.next_state, step.store, step.llm, action)
+
+    @staticmethod
+    def _validate(spec: FlowSpec):
+        steps = [("start", spec.start)]
+        steps += [(f"action {name!r}", step) for name, step in spec.actions.items()]
+        steps += [(f"state {name!r}", state.on_text) for name, state in spec.states.items()]
+        for where, step in steps:
+            if step.next_state not in spec.states:
+                raise ValueError(f"{where} moves to unknown state {step.next_state!r}")
+            if step.actions and step.actions not in spec.action_sets:
+                raise ValueError(f"{where} shows unknown action set {step.actions!r}")
+        for set_name, specs in spec.action_sets.items():
+            for a in specs:
+                if a.name not in spec.actions:
+                    raise ValueError(f"action set {set_name!r} offers {a.name!r} which has no step")
+        for name, state in spec.states.items():
+            if state.classify and not state.on_text.actions:
+                raise ValueError(f"state {name!r} classifies text but shows no action set")
+            for phrase, action in state.commands.items():
+                if action not in spec.actions:
+                    raise ValueError(f"state {name!r} maps {phrase!r} to unknown action {action!r}")
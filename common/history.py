@@ -0,0 +1,190 @@
+"""Token-budgeted conversation history with a running summary.
+
+``BoundedHistory`` keeps the most recent turns in a window whose total
+size stays under a token budget. Turns that fall out of the window are folded
+into a running summary in the background, so the prompt sent to the model and
+the memory held per session stay flat however long a chat runs.
+
+Token counts are computed once per message, with ``tiktoken`` when it is
+installed and a characters-per-token estimate otherwise.
+
+Defaults can be tuned with environment variables:
+
+    SK_HISTORY_TOKEN_BUDGET      tokens kept in the window (default 1500)
+    SK_HISTORY_MAX_TURNS         turns kept in the window (default 40)
+    SK_HISTORY_SUMMARY_TOKENS    size of the running summary (default 300)
+"""
+import asyncio
+import os
+from typing import Awaitable, Callable
+
+from common import rate_limiter
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in ``text`` for the GPT-4o family of models."""
+    global _encoding
+    if tiktoken is None:
+        return max(1, (len(text) + 3) // 4)
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("o200k_base")
+    return max(1, len(_encoding.encode(text, disallowed_special=())))
+
+
+class Turn:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: str, content: str, tokens: int):
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+
+    def as_dict(self) -> dict:
+        return {"role": self.role, "content": self.content}
+
+
+# summarizer(previous_summary, evicted_turns) -> new summary
+Summarizer = Callable[[str, list[Turn]], Awaitable[str]]
+
+
+class BoundedHistory:
+    """Recent turns under a token budget plus a summary of everything older."""
+
+    # One per open chat: no instance dict
+    __slots__ = ("token_budget", "max_turns", "summary_tokens", "summarizer", "summary", "total_turns",
+                 "_window", "_window_tokens", "_pending", "_task")
+
+    def __init__(self, token_budget: int | None = None, max_turns: int | None = None,
+                 summary_tokens: int | None = None, summarizer: Summarizer | None = None):
+        self.token_budget = token_budget or int(os.getenv("SK_HISTORY_TOKEN_BUDGET", 1500))
+        self.max_turns = max_turns or int(os.getenv("SK_HISTORY_MAX_TURNS", 40))
+        self.summary_tokens = summary_tokens or int(os.getenv("SK_HISTORY_SUMMARY_TOKENS", 300))
+        self.summarizer = summarizer
+        self.summary = ""
+        self.total_turns = 0
+        # A list, not a deque: the window holds at most max_turns turns, so
+        # evicting from the front is cheap, and an idle session's empty list
+        # is a tenth of an empty deque's size
+        self._window: list[Turn] = []
+        self._window_tokens = 0
+        self._pending: list[Turn] = []
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def __iter__(self):
+        return (turn.as_dict() for turn in self._window)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Tokens the summary and the window add to a prompt."""
+        return self._window_tokens + (count_tokens(self.summary) if self.summary else 0)
+
+    def append(self, message: dict):
+        """Add a ``{"role": ..., "content": ...}`` message, evicting old turns if needed."""
+        turn = Turn(message["role"], message["content"], count_tokens(message["content"]))
+        self._window.append(turn)
+        self._window_tokens += turn.tokens
+        self.total_turns += 1
+        # Always keep the newest turn, even when it alone exceeds the budget
+        while len(self._window) > 1 and (
+            len(self._window) > self.max_turns or self._window_tokens > self.token_budget
+        ):
+            evicted = self._window.pop(0)
+            self._window_tokens -= evicted.tokens
+            self._pending.append(evicted)
+        if self._pending:
+            self._schedule_summary()
+
+    def messages(self) -> list[dict]:
+        """The prompt view: the running summary (if any) followed by the window."""
+        messages = [turn.as_dict() for turn in self._window]
+        if self.summary:
+            messages.insert(0, {"role": "system", "content": f"Summary of the earlier conversation: {self.summary}"})
+        return messages
+
+    def to_chat_messages(self) -> list:
+        """``messages()`` as Semantic Kernel ``ChatMessageContent`` objects."""
+        from semantic_kernel.contents import AuthorRole, ChatMessageContent
+
+        return [ChatMessageContent(role=AuthorRole(m["role"]), content=m["content"]) for m in self.messages()]
+
+    async def flush(self):
+        """Wait until every evicted turn has been folded into the summary."""
+        while self._task is not None:
+            await self._task
+
+    def _schedule_summary(self):
+        if self.summarizer is None:
+            self._fold(self._take_pending())
+            return
+        if self._task is not None:
+            # A summary is already being written; it picks up new turns when done.
+            # Compact the backlog so pending turns never outgrow the window.
+            if len(self._pending) > self.max_turns:
+                text = self._trim(self._extract(self._take_pending()))
+                self._pending = [Turn("system", text, count_tokens(text))]
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._summarize())
+        except RuntimeError:
+            self._fold(self._take_pending())
+
+    async def _summarize(self):
+        try:
+            while self._pending:
+                turns = self._take_pending()
+                try:
+                    summary = await self.summarizer(self.summary, turns)
+                except Exception:
+                    self._fold(turns)
+                else:
+                    self.summary = self._trim(summary.strip())
+        finally:
+            self._task = None
+
+    def _take_pending(self) -> list[Turn]:
+        turns, self._pending = self._pending, []
+        return turns
+
+    def _fold(self, turns: list[Turn]):
+        self.summary = self._trim(" | ".join(filter(None, [self.summary, self._extract(turns)])))
+
+    @staticmethod
+    def _extract(turns: list[Turn]) -> str:
+        # Extractive fallback: keep a clipped line per turn, newest last
+        return " | ".join(f"{t.role}: {t.content[:120]}" for t in turns)
+
+    def _trim(self, summary: str) -> str:
+        # Keep the end of the summary, which describes the most recent context
+        max_chars = self.summary_tokens * 4
+        if len(summary) > max_chars and count_tokens(summary) > self.summary_tokens:
+            summary = "…" + summary[-max_chars:]
+        return summary
+
+
+def agent_summarizer(agent, max_words: int = 150) -> Summarizer:
+    """Summarizer that asks ``agent`` to merge evicted turns into the summary."""
+
+    async def summarize(summary: str, turns: list[Turn]) -> str:
+        transcript = "\n".join(f"{t.role}: {t.content}" for t in turns)
+        prompt = (
+            f"Current summary of a support conversation:\n{summary or '(empty)'}\n\n"
+            f"New turns:\n{transcript}\n\n"
+            f"Rewrite the summary so it covers both, in at most {max_words} words. "
+            "Keep names, products, symptoms and anything already tried."
+        )
+        # Summaries run in the background; live turns go first
+        with rate_limiter.priority(rate_limiter.BATCH):
+            response = await agent.get_response(messages=prompt)
+        return str(response.message.content)
+
+    return summarize
@@ -0,0 +1,141 @@
+"""Small in-process intent classifier for typed input in scripted states.
+
+Trained once from a few example phrases per label, it maps free text such as
+"my wifi keeps dropping" to an action name in tens of microseconds, so typing
+instead of clicking does not need a model call.
+
+The model is TF-IDF over words, word bigrams and character trigrams (the
+trigrams absorb typos like "interent"). Each label gets the normalized
+centroid of its examples, stored as an inverted index from feature to
+``(label, weight)``; classifying is one pass over the query's features.
+
+Answer words (yes, no, not, nope, ...) in the query only count when one of
+the candidate labels is about them, i.e. at least half its examples contain
+one (e.g. "internet_restarted_no"). Among topic labels they are dropped like
+stop words, so "no idea" does not look like "no internet connection".
+
+A prediction is returned only if its cosine score reaches ``min_score``, it
+beats the runner-up by ``min_ratio`` and the candidate labels know at least
+``min_coverage`` of the query's weight (so "it is not working" is not read as
+"no" just because of "not"); otherwise callers fall back (e.g. to the LLM).
+
+    classifier = IntentClassifier.from_file("data/tech_support_intents.json")
+    intent = classifier.predict("the internet is down", labels=("internet_issue", "software_problem"))
+    if intent:
+        ...  # intent.label, intent.score, intent.runner_up
+
+Thresholds default to ``SK_INTENT_MIN_SCORE`` (0.1), ``SK_INTENT_MIN_RATIO`` (1.5)
+and ``SK_INTENT_MIN_COVERAGE`` (0.7).
+"""
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+_WORDS = re.compile(r"[a-z0-9]+")
+# "haven't" -> "have not", so negations share one strong feature
+_NEGATION = re.compile(r"n['’]t\b")
+STOP_WORDS = frozenset(
+    "a an the my i im me is it its to of and or for on in at with this that please can you"
+    " but still just so do does am are was be been".split())
+ANSWER_WORDS = frozenset("yes yeah yep yup no not nope nah never".split())
+CHAR_WEIGHT = 0.5
+
+
+def _words(text: str) -> list[str]:
+    text = _NEGATION.sub(" not", text.lower()).replace("'", "").replace("’", "")
+    return [w for w in _WORDS.findall(text) if w not in STOP_WORDS]
+
+
+def features(text: str, answers: bool = True) -> Counter:
+    words = _words(text)
+    if not answers:
+        words = [w for w in words if w not in ANSWER_WORDS]
+    counts = Counter(words)
+    counts.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += CHAR_WEIGHT
+    return counts
+
+
+@dataclass(frozen=True)
+class Intent:
+    label: str
+    score: float
+    runner_up: float
+    coverage: float
+
+
+class IntentClassifier:
+    def __init__(self, examples: Mapping[str, Iterable[str]], min_score: float | None = None,
+                 min_ratio: float | None = None, min_coverage: float | None = None):
+        self.min_score = min_score if min_score is not None else float(os.getenv("SK_INTENT_MIN_SCORE", 0.1))
+        self.min_ratio = min_ratio if min_ratio is not None else float(os.getenv("SK_INTENT_MIN_RATIO", 1.5))
+        self.min_coverage = (min_coverage if min_coverage is not None
+                             else float(os.getenv("SK_INTENT_MIN_COVERAGE", 0.7)))
+        examples = {label: list(texts) for label, texts in examples.items()}
+        self.labels = tuple(examples)
+        self.answer_labels = frozenset(
+            label for label, texts in examples.items()
+            if 2 * sum(not ANSWER_WORDS.isdisjoint(_words(text)) for text in texts) >= len(texts)
+        )
+
+        documents = [(label, features(text)) for label, texts in examples.items() for text in texts]
+        document_frequency = Counter(feature for _, counts in documents for feature in counts)
+        total = len(documents)
+        self._idf = {f: math.log((1 + total) / (1 + df)) + 1 for f, df in document_frequency.items()}
+
+        centroids: dict[str, Counter] = defaultdict(Counter)
+        for label, counts in documents:
+            for feature, weight in self._normalized(counts).items():
+                centroids[label][feature] += weight
+        self._index: dict[str, list[tuple[str, float]]] = defaultdict(list)
+        for label, centroid in centroids.items():
+            norm = math.sqrt(sum(w * w for w in centroid.values()))
+            for feature, weight in centroid.items():
+                self._index[feature].append((label, weight / norm))
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "IntentClassifier":
+        """Load ``{"label": ["example", ...], ...}`` from a JSON file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def _normalized(self, counts: Counter) -> dict[str, float]:
+        weighted = {f: (1 + math.log(c)) * self._idf[f] for f, c in counts.items() if f in self._idf and c > 0}
+        norm = math.sqrt(sum(w * w for w in weighted.values()))
+        return {f: w / norm for f, w in weighted.items()} if norm else {}
+
+    def _score(self, text: str, labels: Iterable[str] | None) -> tuple[dict[str, float], float]:
+        scores = dict.fromkeys(labels if labels is not None else self.labels, 0.0)
+        answers = not self.answer_labels.isdisjoint(scores)
+        covered = 0.0
+        for feature, weight in self._normalized(features(text, answers)).items():
+            known = False
+            for label, label_weight in self._index.get(feature, ()):
+                if label in scores:
+                    scores[label] += weight * label_weight
+                    known = True
+            if known:
+                covered += weight * weight
+        return scores, covered
+
+    def scores(self, text: str, labels: Iterable[str] | None = None) -> dict[str, float]:
+        return self._score(text, labels)[0]
+
+    def predict(self, text: str, labels: Iterable[str] | None = None) -> Intent | None:
+        """Most likely label among ``labels`` (default: all), or ``None`` if unsure."""
+        scores, coverage = self._score(text, labels)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return None
+        label, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if score < self.min_score or score < runner_up * self.min_ratio or coverage < self.min_coverage:
+            return None
+        return Intent(label, score, runner_up, coverage)
@@ -0,0 +1,277 @@
+"""Incremental JSON parsing of structured model output.
+
+With ``response_format`` set to a pydantic model the answer is JSON, but
+``get_response`` makes callers wait for the whole of it. ``JSONStreamParser``
+consumes the streamed chunks as they arrive and reports every value the
+moment its closing character is seen; ``StructuredStream`` builds on it to
+fire callbacks per completed field and per completed list item, expose a
+typed partial object, and validate the final document against the model once:
+
+    stream = StructuredStream(MenuItem, on_field=lambda name, value: print(name, value))
+    async for chunk in chunks:
+        stream.feed(chunk)
+    item = stream.close()           # MenuItem, validated once
+
+    stream = StructuredStream(list[MenuItem], on_item=lambda index, item: ...)
+"""
+import inspect
+import re
+from typing import Any, AsyncIterable, Callable, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+
+_WHITESPACE = " \t\r\n"
+_LITERALS = {"true": True, "false": False, "null": None}
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+# JSON's number grammar; int()/float() alone also accept "1_000", "+1", "01", "nan"
+_NUMBER = re.compile(r"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+_HEX = frozenset("0123456789abcdefABCDEF")
+
+Path = tuple[str | int, ...]
+
+
+class _Frame:
+    __slots__ = ("value", "key", "expect")
+
+    def __init__(self, value):
+        self.value = value
+        self.key = None
+        # object: "key" | "colon" | "value" | "comma"; array: "value" | "comma"
+        self.expect = "key" if isinstance(value, dict) else "value"
+
+
+class JSONStreamParser:
+    """Push parser: ``feed`` returns the ``(path, value)`` pairs completed by the chunk.
+
+    Values are reported innermost first, so an object's fields come before
+    the object itself. ``root`` holds the partially built document.
+    """
+
+    def __init__(self):
+        self.root = None
+        self.done = False
+        self._stack: list[_Frame] = []
+        self._token: list[str] | None = None   # number or literal being read
+        self._string: list[str] | None = None  # string being read
+        self._escape: str | None = None        # "" after a backslash, hex digits after \\u
+        self._started = False
+
+    def feed(self, chunk: str) -> list[tuple[Path, Any]]:
+        completed: list[tuple[Path, Any]] = []
+        for char in chunk:
+            if self._string is not None:
+                self._read_string(char, completed)
+                continue
+            if self._token is not None:
+                if char in _WHITESPACE or char in ",:]}":
+                    self._end_token(completed)
+                else:
+                    self._token.append(char)
+                    continue
+            if char in _WHITESPACE:
+                continue
+            if self.done:
+                raise ValueError(f"unexpected {char!r} after the end of the document")
+            frame = self._stack[-1] if self._stack else None
+            if char == '"':
+                if frame is not None and frame.expect not in ("key", "value"):
+                    raise ValueError(f"unexpected string, expected {frame.expect}")
+                self._string = []
+            elif char in "{[":
+                self._expect_value(frame)
+                container = {} if char == "{" else []
+                if frame is not None:
+                    # Attached right away, so ``partial`` shows containers still open
+                    self._attach(frame, container)
+                self._stack.append(_Frame(container))
+                self._started = True
+            elif char in "}]":
+                if frame is None or (char == "}") != isinstance(frame.value, dict):
+                    raise ValueError(f"unexpected {char!r}")
+                # Closes after a value, or right after opening (empty container)
+                opened = not frame.value and frame.key is None and frame.expect in ("key", "value")
+                if frame.expect != "comma" and not opened:
+                    raise ValueError(f"unexpected {char!r}")
+                self._stack.pop()
+                self._complete(frame.value, completed, attached=True)
+            elif char == ":":
+                if frame is None or frame.expect != "colon":
+                    raise ValueError("unexpected ':'")
+                frame.expect = "value"
+            elif char == ",":
+                if frame is None or frame.expect != "comma":
+                    raise ValueError("unexpected ','")
+                frame.expect = "key" if isinstance(frame.value, dict) else "value"
+            else:
+                self._expect_value(frame)
+                self._token = [char]
+                self._started = True
+        return completed
+
+    def close(self) -> list[tuple[Path, Any]]:
+        """Finish a document whose last value is a bare number or literal."""
+        completed: list[tuple[Path, Any]] = []
+        if self._token is not None:
+            self._end_token(completed)
+        if not self.done:
+            raise ValueError("incomplete JSON document")
+        return completed
+
+    def _expect_value(self, frame: _Frame | None):
+        if frame is None:
+            if self._started:
+                raise ValueError("unexpected value after the end of the document")
+        elif frame.expect != "value":
+            raise ValueError(f"unexpected value, expected {frame.expect}")
+
+    def _read_string(self, char: str, completed: list):
+        if self._escape is not None:
+            if self._escape == "":
+                if char == "u":
+                    self._escape = "u"
+                elif char in _ESCAPES:
+                    self._string.append(_ESCAPES[char])
+                    self._escape = None
+                else:
+                    raise ValueError(f"invalid escape '\\{char}'")
+            else:
+                if char not in _HEX:
+                    raise ValueError(f"invalid escape '\\{self._escape}{char}'")
+                self._escape += char
+                if len(self._escape) == 5:
+                    code = int(self._escape[1:], 16)
+                    high = ord(self._string[-1]) if self._string else 0
+                    if 0xDC00 <= code <= 0xDFFF and 0xD800 <= high <= 0xDBFF:
+                        # Low half of a surrogate pair (e.g. \ud83d\ude00): one character, as json.loads does
+                        self._string[-1] = chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+                    else:
+                        self._string.append(chr(code))
+                    self._escape = None
+        elif char == "\\":
+            self._escape = ""
+        elif char == '"':
+            text, self._string = "".join(self._string), None
+            frame = self._stack[-1] if self._stack else None
+            if frame is not None and frame.expect == "key":
+                frame.key = text
+                frame.expect = "colon"
+            else:
+                self._started = True
+                self._complete(text, completed)
+        else:
+            self._string.append(char)
+
+    def _end_token(self, completed: list):
+        text, self._token = "".join(self._token), None
+        if text in _LITERALS:
+            value = _LITERALS[text]
+        else:
+            number = _NUMBER.fullmatch(text)
+            if number is None:
+                raise ValueError(f"invalid JSON value {text!r}")
+            value = float(text) if number.group(1) or number.group(2) else int(text)
+        self._complete(value, completed)
+
+    def _complete(self, value, completed: list, attached: bool = False):
+        """Attach a finished value to its parent (containers already are) and report it with its path."""
+        if not self._stack:
+            self.root = value
+            self.done = True
+            completed.append(((), value))
+            return
+        frame = self._stack[-1]
+        if not attached:
+            self._attach(frame, value)
+        frame.expect = "comma"
+        # Every open container holds the one being read as its latest value
+        path = tuple(f.key if isinstance(f.value, dict) else len(f.value) - 1 for f in self._stack)
+        completed.append((path, value))
+
+    @staticmethod
+    def _attach(frame: _Frame, value):
+        if isinstance(frame.value, dict):
+            frame.value[frame.key] = value
+        else:
+            frame.value.append(value)
+
+    @property
+    def partial(self):
+        """The document built so far (containers still open are included)."""
+        return self._stack[0].value if self._stack else self.root
+
+
+class StructuredStream:
+    """Streams a JSON answer into ``target`` (a pydantic model or e.g. ``list[Model]``).
+
+    ``on_field(name, value)`` fires when a top-level field of a model is
+    complete; ``on_item(index, item)`` fires with each validated element of a
+    top-level list, or of a list-typed field of the model.
+    """
+
+    def __init__(self, target, on_field: Callable[[str, Any], Any] | None = None,
+                 on_item: Callable[[int, Any], Any] | None = None):
+        self.target = target
+        self.on_field = on_field
+        self.on_item = on_item
+        self.parser = JSONStreamParser()
+        self._chunks: list[str] = []
+        self._adapter = None if _is_model(target) else TypeAdapter(target)
+        # Where list elements complete, and the adapter validating them
+        self._item_adapters: dict[str | None, TypeAdapter] = {}
+        if _is_model(target):
+            for name, field in target.model_fields.items():
+                if get_origin(field.annotation) is list and get_args(field.annotation):
+                    self._item_adapters[name] = TypeAdapter(get_args(field.annotation)[0])
+        elif get_origin(target) is list and get_args(target):
+            self._item_adapters[None] = TypeAdapter(get_args(target)[0])
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    @property
+    def partial(self):
+        """What is known so far, as a model built without validation (or the raw partial value)."""
+        value = self.parser.partial
+        if _is_model(self.target) and isinstance(value, dict):
+            return self.target.model_construct(**value)
+        return value
+
+    def feed(self, chunk: str) -> list:
+        """Parse ``chunk``; returns the callbacks' results (which may be awaitables)."""
+        self._chunks.append(chunk)
+        return self._dispatch(self.parser.feed(chunk))
+
+    def close(self):
+        """Validate the whole answer against ``target`` and return it."""
+        self._dispatch(self.parser.close())
+        if _is_model(self.target):
+            return self.target.model_validate(self.parser.root)
+        return self._adapter.validate_python(self.parser.root)
+
+    def _dispatch(self, completed: list[tuple[Path, Any]]) -> list:
+        results = []
+        for path, value in completed:
+            if len(path) == 1 and isinstance(path[0], str) and self.on_field:
+                results.append(self.on_field(path[0], value))
+            if self.on_item is None:
+                continue
+            if len(path) == 1 and isinstance(path[0], int) and None in self._item_adapters:
+                results.append(self.on_item(path[0], self._item_adapters[None].validate_python(value)))
+            elif len(path) == 2 and path[0] in self._item_adapters and isinstance(path[1], int):
+                results.append(self.on_item(path[1], self._item_adapters[path[0]].validate_python(value)))
+        return results
+
+
+async def parse_stream(chunks: AsyncIterable[str], target, on_field=None, on_item=None):
+    """Feed an async stream of chunks through a ``StructuredStream``; callbacks may be async."""
+    stream = StructuredStream(target, on_field=on_field, on_item=on_item)
+    async for chunk in chunks:
+        for result in stream.feed(chunk):
+            if inspect.isawaitable(result):
+                await result
+    return stream.close()
+
+
+def _is_model(target) -> bool:
+    return isinstance(target, type) and issubclass(target, BaseModel)
@@ -0,0 +1,205 @@
+"""Pool of warm MCP stdio servers shared by agents.
+
+``MCPStdioPlugin`` owns its server process: every script run (and every agent
+that creates its own plugin) spawns a new Node process through ``npx``, and
+all tool calls of that agent go through that one pipe. ``MCPServerPool``
+keeps a few servers running for the life of the process and lends them out:
+
+    pool = MCPServerPool(github_plugin_factory, size=2)
+    async with pool:
+        async with pool.lease() as github:
+            agent = ChatCompletionAgent(service=service, name="IssueAgent", plugins=[github])
+            ...
+
+MCP sessions multiplex requests (JSON-RPC ids), so one server serves several
+leases at once; a lease goes to the least busy healthy server. A background
+task pings every server and restarts the ones that stopped answering, and a
+lease that fails triggers an immediate check of its server. A lease that
+finds every server down starts their restart at once and, if none comes
+back within ``lease_timeout`` seconds, raises ``MCPPoolUnavailable``.
+"""
+import asyncio
+import os
+import shlex
+import shutil
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+
+def github_server_command() -> tuple[str, list[str]]:
+    """Command that starts the GitHub MCP server.
+
+    ``GITHUB_MCP_COMMAND`` (e.g. a globally installed ``mcp-server-github``)
+    skips npx entirely. Otherwise npx is resolved once and told to prefer its
+    local cache over a registry lookup.
+    """
+    configured = os.getenv("GITHUB_MCP_COMMAND")
+    if configured:
+        command, *args = shlex.split(configured)
+        return shutil.which(command) or command, args
+    return shutil.which("npx") or "npx", ["-y", "--prefer-offline", "@modelcontextprotocol/server-github"]
+
+
+def github_plugin_factory():
+    """Create (but do not connect) a GitHub MCP plugin."""
+    from semantic_kernel.connectors.mcp import MCPStdioPlugin
+
+    command, args = github_server_command()
+    return MCPStdioPlugin(name="Github", description="Github Plugin", command=command, args=args)
+
+
+class MCPPoolUnavailable(RuntimeError):
+    """Raised when no healthy MCP server could be leased in time."""
+
+
+@dataclass
+class PoolStats:
+    starts: int = 0
+    restarts: int = 0
+    failed_checks: int = 0
+    leases: int = 0
+    lease_timeouts: int = 0
+    lease_wait_seconds: float = 0.0
+    startup_seconds: float = 0.0
+
+
+class _Server:
+    __slots__ = ("index", "plugin", "inflight", "healthy", "lock", "revival")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.plugin = None
+        self.inflight = 0
+        self.healthy = False
+        self.lock = asyncio.Lock()
+        self.revival: asyncio.Task | None = None
+
+
+class MCPServerPool:
+    """Warm MCP stdio servers with health checks, restart and request multiplexing.
+
+    ``factory`` returns a new, unconnected plugin. ``max_inflight`` caps the
+    leases served by one server at the same time; further leases wait, at
+    most ``lease_timeout`` seconds.
+    """
+
+    def __init__(self, factory: Callable = github_plugin_factory, size: int = 2, max_inflight: int = 16,
+                 health_interval: float = 30.0, health_timeout: float = 5.0, lease_timeout: float = 30.0):
+        self.factory = factory
+        self.size = size
+        self.max_inflight = max_inflight
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.lease_timeout = lease_timeout
+        self.stats = PoolStats()
+        self._servers = [_Server(i) for i in range(size)]
+        self._available = asyncio.Condition()
+        self._health_task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "MCPServerPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        start = time.perf_counter()
+        await asyncio.gather(*(self._restart(server, initial=True) for server in self._servers))
+        self.stats.startup_seconds = time.perf_counter() - start
+        if not any(server.healthy for server in self._servers):
+            raise RuntimeError("no MCP server could be started")
+        if self.health_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for server in self._servers:
+            await self._stop(server)
+
+    @asynccontextmanager
+    async def lease(self):
+        """Borrow the plugin of the least busy healthy server."""
+        wait_start = time.perf_counter()
+        async with self._available:
+            server = self._pick()
+            if server is None:
+                # Every server busy or down: bring back the ones that are down
+                # instead of waiting for the next health check
+                self._revive()
+                try:
+                    server = await asyncio.wait_for(self._available.wait_for(self._pick), self.lease_timeout)
+                except asyncio.TimeoutError:
+                    self.stats.lease_timeouts += 1
+                    healthy = sum(s.healthy for s in self._servers)
+                    raise MCPPoolUnavailable(
+                        f"no MCP server available after {self.lease_timeout:g}s "
+                        f"({healthy} of {self.size} healthy)") from None
+            server.inflight += 1
+        self.stats.leases += 1
+        self.stats.lease_wait_seconds += time.perf_counter() - wait_start
+        try:
+            yield server.plugin
+        except Exception:
+            # The server may have died under us: check it now rather than at the next interval
+            asyncio.create_task(self._check(server))
+            raise
+        finally:
+            async with self._available:
+                server.inflight -= 1
+                self._available.notify()
+
+    def _pick(self) -> _Server | None:
+        candidates = [s for s in self._servers if s.healthy and s.inflight < self.max_inflight]
+        return min(candidates, key=lambda s: s.inflight) if candidates else None
+
+    def _revive(self):
+        for server in self._servers:
+            if server.healthy or server.lock.locked() or (server.revival and not server.revival.done()):
+                continue
+            server.revival = asyncio.create_task(self._restart(server))
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(*(self._check(server) for server in self._servers))
+
+    async def _check(self, server: _Server):
+        if server.lock.locked():
+            return  # already being restarted
+        try:
+            await asyncio.wait_for(server.plugin.session.send_ping(), self.health_timeout)
+        except Exception:
+            self.stats.failed_checks += 1
+            await self._restart(server)
+
+    async def _restart(self, server: _Server, initial: bool = False):
+        async with server.lock:
+            server.healthy = False
+            await self._stop(server)
+            plugin = self.factory()
+            try:
+                await plugin.connect()
+            except Exception:
+                return
+            server.plugin = plugin
+            server.healthy = True
+            self.stats.starts += 1
+            if not initial:
+                self.stats.restarts += 1
+        async with self._available:
+            self._available.notify_all()
+
+    @staticmethod
+    async def _stop(server: _Server):
+        plugin, server.plugin = server.plugin, None
+        if plugin is not None:
+            try:
+                await plugin.close()
+            except Exception:
+                pass
@@ -0,0 +1,190 @@
+"""Concurrent plugin execution: thread offloading, timeouts and a concurrency cap.
+
+When the model asks for several tools in one turn, Semantic Kernel starts
+them together (``asyncio.gather``), but a synchronous ``@kernel_function``
+such as ``MenuPlugin.get_item_price`` runs on the event loop: the calls take
+turns, and while a slow backing store (database, HTTP price service)
+answers, every other Chainlit session in the process waits too.
+``PluginExecutor`` fixes both:
+
+- ``offload(plugin)`` turns the plugin's synchronous kernel functions into
+  coroutines that run on a bounded thread pool shared by every agent of the
+  process; async functions are left as they are and run concurrently on the
+  loop,
+- as a function-invocation filter it caps the number of tool calls in flight
+  and gives each one a timeout (per function, or a default); a call that
+  times out is reported to the model as a failed tool call.
+
+Tool calls of one model turn then run in parallel and the turn takes as long
+as its slowest call instead of the sum:
+
+    executor = get_plugin_executor()
+    agent = ChatCompletionAgent(service=service, plugins=[executor.offload(MenuPlugin())])
+    agent.kernel.add_filter("function_invocation", executor)
+
+Python cannot stop a thread: an offloaded function that times out keeps its
+worker until it returns, so pick a pool large enough to absorb a stuck
+backend. Waits for a free slot are recorded as the ``tool.queue`` histogram
+of ``common.telemetry``.
+
+Configuration (``from_env``):
+
+    SK_PLUGIN_WORKERS       threads for synchronous functions (default 8)
+    SK_PLUGIN_CONCURRENCY   tool calls in flight per process (default 32)
+    SK_PLUGIN_TIMEOUT       seconds per tool call, 0 for none (default 30)
+    SK_PLUGIN_TIMEOUTS      per-function overrides, e.g. "get_item_price=2,Github-search_issues=20"
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from common.telemetry import registry
+
+
+class PluginTimeoutError(TimeoutError):
+    """Raised when a tool call runs past its timeout."""
+
+
+@dataclass
+class PluginStats:
+    calls: int = 0
+    offloaded: int = 0   # calls run on the thread pool
+    queued: int = 0      # calls that waited for a free slot
+    timeouts: int = 0
+    errors: int = 0
+    peak: int = 0        # most calls in flight at once
+
+
+def timeouts_from_env() -> dict[str, float]:
+    timeouts = {}
+    for item in filter(None, os.getenv("SK_PLUGIN_TIMEOUTS", "").split(",")):
+        name, _, seconds = item.partition("=")
+        timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+class PluginExecutor:
+    """Function-invocation filter running tool calls concurrently, with timeouts and a cap."""
+
+    def __init__(self, max_workers: int = 8, max_concurrency: int = 32, timeout: float = 30.0,
+                 timeouts: dict[str, float] | None = None):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.timeouts = timeouts or {}
+        self.stats = PluginStats()
+        self.in_flight = 0
+        self._pool: ThreadPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        # One semaphore per event loop: benchmarks and scripts may run several
+        self._slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls) -> "PluginExecutor":
+        return cls(
+            max_workers=int(os.getenv("SK_PLUGIN_WORKERS", 8)),
+            max_concurrency=int(os.getenv("SK_PLUGIN_CONCURRENCY", 32)),
+            timeout=float(os.getenv("SK_PLUGIN_TIMEOUT", 30)),
+            timeouts=timeouts_from_env(),
+        )
+
+    def offload(self, plugin):
+        """Make the synchronous kernel functions of ``plugin`` run on the thread pool.
+
+        The functions are replaced on the instance by coroutines carrying the
+        same kernel metadata, so the plugin keeps its name and tool schema.
+        Returns ``plugin``.
+        """
+        for attribute in dir(plugin):
+            method = getattr(plugin, attribute, None)
+            if not getattr(method, "__kernel_function__", False):
+                continue
+            if inspect.iscoroutinefunction(method) or getattr(method, "__kernel_function_streaming__", False):
+                continue
+            setattr(plugin, attribute, self._offloaded(method))
+        return plugin
+
+    def timeout_for(self, function) -> float:
+        timeout = self.timeouts.get(f"{function.plugin_name}-{function.name}", self.timeouts.get(function.name))
+        return self.timeout if timeout is None else timeout
+
+    async def run_sync(self, func, /, *args, **kwargs):
+        """Run ``func`` on the thread pool, in the caller's context (telemetry turn, priority)."""
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        self.stats.offloaded += 1
+        return await loop.run_in_executor(self._executor(), functools.partial(context.run, func, *args, **kwargs))
+
+    async def __call__(self, context, next):
+        function = context.function
+        slots = self._slots_of_loop()
+        if slots.locked():
+            self.stats.queued += 1
+            start = time.monotonic()
+            await slots.acquire()
+            registry.record("tool.queue", time.monotonic() - start, {"function": function.name})
+        else:
+            await slots.acquire()
+        self.stats.calls += 1
+        self.in_flight += 1
+        self.stats.peak = max(self.stats.peak, self.in_flight)
+        timeout = self.timeout_for(function)
+        try:
+            await asyncio.wait_for(next(context), timeout or None)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise PluginTimeoutError(
+                f"{function.plugin_name}-{function.name} did not answer within {timeout:g}s") from None
+        except Exception:
+            self.stats.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    def shutdown(self, wait: bool = True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def _offloaded(self, method):
+        @functools.wraps(method)
+        async def offloaded(*args, **kwargs):
+            return await self.run_sync(method, *args, **kwargs)
+
+        return offloaded
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sk-plugin")
+        return self._pool
+
+    def _slots_of_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return slots
+
+
+_executor: PluginExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_plugin_executor() -> PluginExecutor:
+    """The plugin executor shared by every agent of this process (``SK_PLUGIN_*``)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = PluginExecutor.from_env()
+    return _executor
@@ -0,0 +1,150 @@
+"""Connection pre-warming and speculative prompt-prefix prefetch.
+
+In the scripted flows nothing touches the chat service until the first turn
+that needs the model, so that turn's time to first token also pays for DNS,
+the TCP and TLS handshakes and, for long prompts, the service reading a
+prefix it could have cached. ``Prewarmer`` moves that work off the turn:
+
+- ``start()`` (from ``on_chat_start``) makes a cheap authenticated call
+  (the models list) on the shared connection pool in the background, and
+  repeats it every ``interval`` seconds while sessions keep starting, so
+  the pooled connection does not expire between users,
+- ``speculate(agent, messages)`` is called when a scripted step is about to
+  hand the conversation to the model. It sends the prompt the next turn will
+  start with (the agent's instructions plus ``messages``) with a one-token
+  completion at batch priority, so Azure OpenAI's prompt cache holds the
+  prefix when the real turn arrives. Prompt caching only applies from 1024
+  tokens on; shorter prefixes just warm the connection.
+
+Both are opt-in, never block the caller and only count failures. Nothing is
+sent while a cassette records or replays (``SK_CASSETTE``).
+
+    prewarmer = Prewarmer.from_env()
+    prewarmer.start()                                          # on_chat_start
+    prewarmer.speculate(agent, history.to_chat_messages(), history.prompt_tokens)
+
+Configuration (``from_env``):
+
+    SK_PREWARM                      1 to warm the connection at chat start (default 0)
+    SK_PREWARM_INTERVAL             seconds between keep-alive calls (default 20)
+    SK_PREWARM_IDLE                 seconds without a new session before keep-alive stops (default 300)
+    SK_PREWARM_SPECULATE            1 to prefetch the prompt prefix before LLM turns (default 0)
+    SK_PREWARM_MIN_PREFIX_TOKENS    smallest prefix worth prefetching (default 1024)
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from common import rate_limiter
+
+
+@dataclass
+class PrewarmStats:
+    warmups: int = 0
+    speculations: int = 0
+    skipped: int = 0     # speculations answered by a warm-up: prefix too short or already in flight
+    failures: int = 0
+
+
+async def warm_registry_connection():
+    """Open (or keep open) the shared registry's connection to the Azure endpoint."""
+    from common.service_registry import get_registry
+
+    await get_registry().warm_up()
+
+
+class Prewarmer:
+    def __init__(self, warm: Callable[[], Awaitable] = warm_registry_connection, enabled: bool = True,
+                 speculate: bool = False, interval: float = 20.0, idle: float = 300.0,
+                 min_prefix_tokens: int = 1024):
+        self.warm = warm
+        self.enabled = enabled
+        self.speculative = speculate
+        self.interval = interval
+        self.idle = idle
+        self.min_prefix_tokens = min_prefix_tokens
+        self.stats = PrewarmStats()
+        self._touched = 0.0
+        self._keep_alive: asyncio.Task | None = None
+        self._speculating: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls) -> "Prewarmer":
+        from common.cassette import get_cassette
+
+        # Warm-up calls would land in (or be missing from) the cassette
+        active = get_cassette() is None
+        return cls(
+            enabled=active and os.getenv("SK_PREWARM", "0") == "1",
+            speculate=active and os.getenv("SK_PREWARM_SPECULATE", "0") == "1",
+            interval=float(os.getenv("SK_PREWARM_INTERVAL", 20)),
+            idle=float(os.getenv("SK_PREWARM_IDLE", 300)),
+            min_prefix_tokens=int(os.getenv("SK_PREWARM_MIN_PREFIX_TOKENS", 1024)),
+        )
+
+    def start(self):
+        """Warm the connection in the background and keep it warm while sessions arrive."""
+        if not self.enabled:
+            return
+        self._touched = time.monotonic()
+        if self._keep_alive is None or self._keep_alive.done():
+            self._keep_alive = asyncio.create_task(self._keep_warm())
+
+    def speculate(self, agent, messages: list, prefix_tokens: int = 0):
+        """Prefetch the prompt prefix of ``agent``'s next turn over ``messages`` in the background."""
+        if not self.speculative:
+            return
+        key = f"{agent.name}:{len(messages)}:{hash(tuple(str(m.content) for m in messages))}"
+        if prefix_tokens < self.min_prefix_tokens or key in self._speculating:
+            self.stats.skipped += 1
+            self._spawn(self._warm_once())
+            return
+        self._speculating.add(key)
+        self._spawn(self._prefetch(key, agent, messages))
+
+    async def aclose(self):
+        """Cancel the keep-alive loop and any prefetch still running."""
+        tasks = [*self._tasks, *([self._keep_alive] if self._keep_alive else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._keep_alive = None
+
+    async def _keep_warm(self):
+        while time.monotonic() - self._touched < self.idle:
+            await self._warm_once()
+            await asyncio.sleep(self.interval)
+
+    async def _warm_once(self):
+        try:
+            await self.warm()
+            self.stats.warmups += 1
+        except Exception:
+            # The real turn reports connection problems; a warm-up only tries
+            self.stats.failures += 1
+
+    async def _prefetch(self, key: str, agent, messages: list):
+        from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+        from semantic_kernel.functions import KernelArguments
+
+        # The agent merges per-call arguments into its own settings in place:
+        # the one-token limit goes to a shallow copy so it never sticks
+        probe = agent.model_copy(update={"arguments": None}) if agent.arguments else agent
+        try:
+            # Behind interactive turns: a prefetch must never delay a user
+            with rate_limiter.priority(rate_limiter.BATCH):
+                await probe.get_response(messages=messages,
+                                         arguments=KernelArguments(OpenAIChatPromptExecutionSettings(max_tokens=1)))
+            self.stats.speculations += 1
+        except Exception:
+            self.stats.failures += 1
+        finally:
+            self._speculating.discard(key)
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
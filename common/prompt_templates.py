@@ -0,0 +1,155 @@
+"""Cached Semantic Kernel prompt functions loaded from skill directories.
+
+A skill directory holds one sub-directory per function with ``skprompt.txt``
+(the template, using ``{{$variable}}`` placeholders) and ``config.json``
+(description, ``execution_settings``, ``input_variables``):
+
+    skills/WelcomeSkill/generate_welcome_message/skprompt.txt
+    skills/WelcomeSkill/generate_welcome_message/config.json
+
+Each function is a regular ``KernelFunctionFromPrompt``, so rendering goes
+through Semantic Kernel's template engine and ``prompt_rendering`` filters
+(``common.telemetry``) see it. Building one reads both files and parses the
+template, so functions are kept in a process-wide cache keyed by directory
+and file mtimes: a request costs a dict lookup, with no file I/O or parsing.
+The cache re-checks the mtimes at most every ``SK_PROMPT_RELOAD_INTERVAL``
+seconds (default 2, 0 disables hot reload) and rebuilds a function whose
+files changed.
+
+Register skills on a kernel of their own, not on the registry's shared one:
+every agent on a kernel is offered its plugins as tools. ``KernelSkill``
+adds a skill once and re-adds it only when one of its functions was rebuilt,
+so calling ``refresh()`` per request costs a cache lookup per function:
+
+    welcome = KernelSkill(kernel, SKILLS_DIR, "WelcomeSkill")
+    ...
+    result = await welcome.refresh().invoke(plugin_name="WelcomeSkill", function_name="generate_welcome_message",
+                                            name="Ada", company="Contoso")
+"""
+import os
+import threading
+import time
+
+TEMPLATE_FILE = "skprompt.txt"
+CONFIG_FILE = "config.json"
+
+
+def _mtimes(function_dir: str) -> tuple[int, int]:
+    """Modification times of a function's template and config."""
+    return (os.stat(os.path.join(function_dir, TEMPLATE_FILE)).st_mtime_ns,
+            os.stat(os.path.join(function_dir, CONFIG_FILE)).st_mtime_ns)
+
+
+def build_function(function_dir: str, plugin_name: str):
+    """Read ``function_dir`` into a ``KernelFunctionFromPrompt`` (uncached)."""
+    from semantic_kernel.functions import KernelFunctionFromPrompt
+
+    return KernelFunctionFromPrompt.from_directory(function_dir, plugin_name=plugin_name)
+
+
+class _Entry:
+    __slots__ = ("value", "mtimes", "checked")
+
+    def __init__(self, value, mtimes: tuple[int, int], checked: float):
+        self.value = value
+        self.mtimes = mtimes
+        self.checked = checked
+
+
+class PromptTemplateCache:
+    """Process-wide cache of prompt functions, keyed by directory and mtimes."""
+
+    def __init__(self, reload_interval: float = 2.0):
+        self.reload_interval = reload_interval
+        self.compiles = 0
+        self.reloads = 0
+        self._entries: dict[tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "PromptTemplateCache":
+        return cls(reload_interval=float(os.getenv("SK_PROMPT_RELOAD_INTERVAL", 2.0)))
+
+    def get(self, function_dir: str, plugin_name: str):
+        key = (function_dir, plugin_name)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self.reload_interval <= 0:
+                return entry.value
+            now = time.monotonic()
+            if now - entry.checked < self.reload_interval:
+                return entry.value
+        with self._lock:
+            entry = self._entries.get(key)
+            mtimes = _mtimes(function_dir)
+            if entry is not None and entry.mtimes == mtimes:
+                entry.checked = time.monotonic()
+                return entry.value
+            value = build_function(function_dir, plugin_name)
+            self.compiles += 1
+            if entry is not None:
+                self.reloads += 1
+            self._entries[key] = _Entry(value, mtimes, time.monotonic())
+            return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+prompt_cache = PromptTemplateCache.from_env()
+
+
+def prompt_function(function_dir: str, plugin_name: str, cache: PromptTemplateCache = prompt_cache):
+    """The cached ``KernelFunctionFromPrompt`` of ``function_dir``."""
+    return cache.get(function_dir, plugin_name)
+
+
+def function_dirs(skills_dir: str, skill_name: str) -> list[str]:
+    """Directories of the prompt functions of ``skills_dir/skill_name``."""
+    skill_dir = os.path.join(skills_dir, skill_name)
+    dirs = [
+        os.path.join(skill_dir, name) for name in sorted(os.listdir(skill_dir))
+        if os.path.isfile(os.path.join(skill_dir, name, TEMPLATE_FILE))
+    ]
+    if not dirs:
+        raise FileNotFoundError(f"no {TEMPLATE_FILE} found under {skill_dir}")
+    return dirs
+
+
+def load_skill(skills_dir: str, skill_name: str, cache: PromptTemplateCache = prompt_cache):
+    """Load every prompt function of ``skills_dir/skill_name`` into a ``KernelPlugin``."""
+    from semantic_kernel.functions import KernelPlugin
+
+    functions = [prompt_function(d, skill_name, cache) for d in function_dirs(skills_dir, skill_name)]
+    return KernelPlugin(name=skill_name, functions=functions)
+
+
+class KernelSkill:
+    """A skill kept registered on ``kernel``, re-added only when one of its functions changed.
+
+    The skill directory is listed once; functions added to it later are
+    picked up on restart, edits to existing ones on the next ``refresh()``.
+    """
+
+    def __init__(self, kernel, skills_dir: str, skill_name: str, cache: PromptTemplateCache = prompt_cache):
+        self.kernel = kernel
+        self.skill_name = skill_name
+        self.cache = cache
+        self.registrations = 0
+        self._dirs = function_dirs(skills_dir, skill_name)
+        self._functions: tuple = ()
+
+    def refresh(self):
+        """Make sure the kernel has the current functions; returns the kernel."""
+        functions = tuple(self.cache.get(d, self.skill_name) for d in self._dirs)
+        if len(functions) != len(self._functions) or any(a is not b for a, b in zip(functions, self._functions)):
+            from semantic_kernel.functions import KernelPlugin
+
+            self.kernel.add_plugin(KernelPlugin(name=self.skill_name, functions=list(functions)))
+            self._functions = functions
+            self.registrations += 1
+        return self.kernel
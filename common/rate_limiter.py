@@ -0,0 +1,341 @@
+"""Adaptive rate limiting and priority scheduling of chat completion calls.
+
+Every request to a deployment counts against its requests-per-minute and
+tokens-per-minute quota; past that Azure answers 429 and interactive chats
+stall behind whatever else the process is doing (background summaries, the
+MCP issue triage batch). ``ChatScheduler`` admits calls in front of the
+service:
+
+- a token bucket per quota (requests, and estimated prompt + completion
+  tokens) so bursts are smoothed instead of rejected,
+- priority classes: waiting ``INTERACTIVE`` calls are always admitted before
+  ``BATCH`` ones, FIFO within a class,
+- AIMD concurrency: the number of calls in flight grows by one per window of
+  successful calls and is cut by ``backoff`` on a 429 (or an answer slower
+  than ``latency_target``); a 429's ``Retry-After`` also pauses admissions.
+
+``ScheduledTransport`` applies it to an ``httpx`` client, one scheduler per
+deployment, so the OpenAI client and everything built on it is covered:
+
+    client = httpx.AsyncClient(transport=ScheduledTransport())
+    with rate_limiter.priority(rate_limiter.BATCH):
+        await agent.get_response(messages=question)   # admitted after interactive calls
+
+Waits are recorded as the ``llm.queue`` histogram of ``common.telemetry``
+(labelled by priority); ``stats()`` reports queue depth, calls in flight, the
+current concurrency limit and 429 counts. Budgets are per process: give each
+worker its share of the deployment quota.
+
+Configuration (``from_env``):
+
+    SK_RATE_RPM                 requests per minute (default 0, unlimited)
+    SK_RATE_TPM                 estimated tokens per minute (default 0, unlimited)
+    SK_RATE_MAX_CONCURRENCY     upper bound of calls in flight (default 100)
+    SK_RATE_MIN_CONCURRENCY     lower bound of calls in flight (default 1)
+    SK_RATE_LATENCY_TARGET      seconds to first byte above which concurrency backs off (default 0, off)
+    SK_RATE_BACKOFF             factor applied to concurrency on throttling (default 0.5)
+    SK_RATE_COMPLETION_TOKENS   completion estimate when a request sets no max_tokens (default 256)
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx
+
+from common.telemetry import registry
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Seconds paused after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("sk_llm_priority", default=INTERACTIVE)
+_DEPLOYMENT = re.compile(r"/deployments/([^/]+)/")
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: int):
+    """Schedule the calls made inside the block (and tasks started there) at ``level``."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """``per_minute`` units refilled continuously; holds up to ``burst`` seconds' worth."""
+
+    __slots__ = ("rate", "capacity", "level", "updated")
+
+    def __init__(self, per_minute: float, burst: float = 10.0):
+        self.rate = per_minute / 60
+        self.capacity = self.rate * burst
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if it can be now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(now)
+        # A request larger than the bucket waits for a full bucket instead of forever
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float):
+        if self.rate > 0:
+            self.level -= min(amount, self.capacity)
+
+
+class Permit:
+    """One admitted call; ``observe`` its first response, then ``release`` it."""
+
+    __slots__ = ("scheduler", "started", "status", "latency", "retry_after", "released")
+
+    def __init__(self, scheduler: "ChatScheduler"):
+        self.scheduler = scheduler
+        self.started = time.monotonic()
+        self.status: int | None = None
+        self.latency = 0.0
+        self.retry_after: float | None = None
+        self.released = False
+
+    def observe(self, status: int, retry_after: float | None = None):
+        self.status = status
+        self.latency = time.monotonic() - self.started
+        self.retry_after = retry_after
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.scheduler._release(self)
+
+
+class ChatScheduler:
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0, max_concurrency: int = 100,
+                 min_concurrency: int = 1, latency_target: float = 0.0, backoff: float = 0.5):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.admitted = 0
+        self.throttled = 0
+        self._waiters: list[tuple[int, int, asyncio.Future, float]] = []
+        self._order = itertools.count()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._timer: asyncio.TimerHandle | None = None
+
+    @classmethod
+    def from_env(cls) -> "ChatScheduler":
+        return cls(
+            requests_per_minute=float(os.getenv("SK_RATE_RPM", 0)),
+            tokens_per_minute=float(os.getenv("SK_RATE_TPM", 0)),
+            max_concurrency=int(os.getenv("SK_RATE_MAX_CONCURRENCY", 100)),
+            min_concurrency=int(os.getenv("SK_RATE_MIN_CONCURRENCY", 1)),
+            latency_target=float(os.getenv("SK_RATE_LATENCY_TARGET", 0)),
+            backoff=float(os.getenv("SK_RATE_BACKOFF", 0.5)),
+        )
+
+    async def acquire(self, tokens: float = 0, level: int | None = None) -> Permit:
+        """Wait until a call of about ``tokens`` tokens may start at ``level`` (default: the context's)."""
+        level = current_priority() if level is None else level
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, next(self._order), future, tokens))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the caller gave up: hand the slot back
+                self.in_flight -= 1
+                self._dispatch()
+            raise
+        registry.record("llm.queue", time.monotonic() - start, {"priority": PRIORITY_NAMES.get(level, str(level))})
+        return Permit(self)
+
+    @asynccontextmanager
+    async def slot(self, tokens: float = 0, level: int | None = None):
+        permit = await self.acquire(tokens, level)
+        try:
+            yield permit
+        finally:
+            permit.release()
+
+    def stats(self) -> dict:
+        queued = dict.fromkeys(PRIORITY_NAMES.values(), 0)
+        for level, _, future, _ in self._waiters:
+            if not future.done():
+                name = PRIORITY_NAMES.get(level, str(level))
+                queued[name] = queued.get(name, 0) + 1
+        return {"limit": round(self.limit, 2), "in_flight": self.in_flight, "queued": queued,
+                "admitted": self.admitted, "throttled": self.throttled}
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self._waiters:
+            level, _, future, tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= int(self.limit):
+                return  # a release dispatches again
+            # Strict priority: the head waits for the budget rather than being overtaken
+            delay = max(self._paused_until - now, self.requests.delay(1, now), self.tokens.delay(tokens, now))
+            if delay > 0:
+                self._wake_in(delay)
+                return
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            self.admitted += 1
+            future.set_result(None)
+
+    def _wake_in(self, delay: float):
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._timer is not None:
+            if self._timer.when() <= when:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(when, self._wake)
+
+    def _wake(self):
+        self._timer = None
+        self._dispatch()
+
+    def _release(self, permit: Permit):
+        self.in_flight -= 1
+        if permit.status == 429:
+            self.throttled += 1
+            self._decrease(permit)
+            pause = permit.retry_after if permit.retry_after is not None else DEFAULT_RETRY_AFTER
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        elif permit.status is not None and permit.status < 500:
+            if self.latency_target and permit.latency > self.latency_target:
+                self._decrease(permit)
+            else:
+                # Additive increase: about one more slot per window of successful calls
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        try:
+            self._dispatch()
+        except RuntimeError:
+            pass  # released outside the event loop (interpreter shutdown)
+
+    def _decrease(self, permit: Permit):
+        # Calls started before the last cut saw the old limit; one cut per window
+        if permit.started < self._last_decrease:
+            return
+        self.limit = max(self.min_concurrency, self.limit * self.backoff)
+        self._last_decrease = time.monotonic()
+
+
+def estimate_tokens(body: bytes, completion_tokens: int) -> int:
+    """Prompt tokens (about four characters each) plus the completion budget of a chat request."""
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        return (len(body) + 3) // 4 + completion_tokens
+    chars = sum(len(m["content"]) if isinstance(m.get("content"), str) else len(json.dumps(m.get("content")))
+                for m in request.get("messages", ()))
+    if request.get("tools"):
+        chars += len(json.dumps(request["tools"]))
+    budget = request.get("max_completion_tokens") or request.get("max_tokens") or completion_tokens
+    return (chars + 3) // 4 + budget
+
+
+def _retry_after(headers) -> float | None:
+    for name in ("retry-after-ms", "retry-after"):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        return seconds / 1000 if name == "retry-after-ms" else seconds
+    return None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Keeps the permit until a streamed answer has been read to the end."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, permit: Permit):
+        self._stream = stream
+        self._permit = permit
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._permit.release()
+
+
+class ScheduledTransport(httpx.AsyncBaseTransport):
+    """``httpx`` transport admitting chat completion requests through a ``ChatScheduler`` per deployment."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None, scheduler_factory=None,
+                 completion_tokens: int | None = None):
+        self._transport = transport or httpx.AsyncHTTPTransport()
+        self._factory = scheduler_factory or ChatScheduler.from_env
+        self.completion_tokens = completion_tokens if completion_tokens is not None else int(
+            os.getenv("SK_RATE_COMPLETION_TOKENS", 256))
+        self.schedulers: dict[str, ChatScheduler] = {}
+
+    def scheduler(self, deployment: str) -> ChatScheduler:
+        scheduler = self.schedulers.get(deployment)
+        if scheduler is None:
+            scheduler = self.schedulers[deployment] = self._factory()
+        return scheduler
+
+    def stats(self) -> dict:
+        return {deployment: scheduler.stats() for deployment, scheduler in self.schedulers.items()}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        match = _DEPLOYMENT.search(request.url.path)
+        if match is None or not request.url.path.endswith("/chat/completions"):
+            return await self._transport.handle_async_request(request)
+        body = await request.aread()
+        permit = await self.scheduler(match.group(1)).acquire(estimate_tokens(body, self.completion_tokens))
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            permit.release()
+            raise
+        permit.observe(response.status_code, _retry_after(response.headers))
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, permit),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self):
+        await self._transport.aclose()
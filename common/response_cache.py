@@ -0,0 +1,145 @@
+"""Cache of LLM answers to short, common follow-ups.
+
+Most free-text follow-ups in a support chat are near-identical ("thanks",
+"no that's all", "how long will it take?"). ``ResponseCache`` keys answers on
+the normalized user input plus the context the answer was built from (agent,
+topic and the remembered values the topic's prompt mentions, see
+``memory_context``), evicts by LRU and TTL, and replays cached answers as a
+token stream so the UI behaves as if the model answered. Sessions on the
+same topic share answers to the same follow-up, but one about Excel is never
+shown an answer written about Outlook.
+
+    context = memory_context(session.memory, FLOW.memory_fields(topic))
+    key = response_cache.key(user_input, agent.name, topic, context)
+    async for token in response_cache.stream(key, stream_from_model):
+        ...
+
+Configuration (``from_env``):
+
+    SK_RESPONSE_CACHE_SIZE        answers kept (default 1024)
+    SK_RESPONSE_CACHE_TTL         seconds an answer stays valid (default 3600)
+    SK_RESPONSE_CACHE_MAX_INPUT   longest input (in characters) worth caching (default 120)
+"""
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable, Mapping
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+_TOKENS = re.compile(r"\s*\S+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+def memory_context(memory: Mapping[str, str] | None, names: Iterable[str]) -> str:
+    """The remembered values of ``names`` as one key component (missing ones empty)."""
+    memory = memory or {}
+    return "\x1e".join(f"{name}={normalize(memory.get(name, ''))}" for name in names)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """LRU + TTL cache of full answer texts."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, max_input_chars: int = 120):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_input_chars = max_input_chars
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        return cls(
+            max_entries=int(os.getenv("SK_RESPONSE_CACHE_SIZE", 1024)),
+            ttl=float(os.getenv("SK_RESPONSE_CACHE_TTL", 3600)),
+            max_input_chars=int(os.getenv("SK_RESPONSE_CACHE_MAX_INPUT", 120)),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, user_input: str, *context: str | None) -> str | None:
+        """Cache key for ``user_input`` in ``context``; ``None`` when not worth caching."""
+        normalized = normalize(user_input)
+        if not normalized or len(normalized) > self.max_input_chars:
+            return None
+        raw = "\x1f".join([*(c or "" for c in context), normalized])
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires, answer = entry
+            if expires < now:
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return answer
+
+    def put(self, key: str, answer: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    async def replay(answer: str, token_delay: float = 0.0) -> AsyncIterator[str]:
+        """Yield a cached answer word by word, like a streamed model response."""
+        for token in _TOKENS.findall(answer):
+            yield token
+            # Yield control between tokens so other sessions keep being served
+            await asyncio.sleep(token_delay)
+
+    async def stream(self, key: str | None, produce: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """Replay the answer cached under ``key``, or stream ``produce()`` and cache it.
+
+        Answers are only stored once the stream has been fully consumed, so a
+        cancelled or failed generation never ends up in the cache.
+        """
+        answer = self.get(key) if key else None
+        if answer is not None:
+            async for token in self.replay(answer):
+                yield token
+            return
+        parts = []
+        async for token in produce():
+            parts.append(token)
+            yield token
+        if key and parts:
+            self.put(key, "".join(parts))
@@ -0,0 +1,158 @@
+"""Process-wide registry for the kernel and the Azure OpenAI chat service.
+
+Chainlit calls ``on_chat_start`` once per browser session. Building a new
+``Kernel`` and ``AzureChatCompletion`` there costs a config parse, a new HTTP
+client and a TLS handshake for every user. The registry builds both once per
+worker process on top of a single keep-alive connection pool, and sessions
+get agents that share it. Chat completion requests on that pool go through
+``common.rate_limiter`` (priority classes, rate budget, adaptive concurrency).
+
+Pool limits can be tuned with environment variables:
+
+    SK_POOL_MAX_CONNECTIONS      upper bound of open sockets (default 100)
+    SK_POOL_MAX_KEEPALIVE        idle sockets kept for reuse (default 20)
+    SK_POOL_KEEPALIVE_EXPIRY     seconds an idle socket is kept (default 30)
+    SK_POOL_TIMEOUT              request timeout in seconds (default 60)
+    SK_POOL_MAX_RETRIES          retries done by the OpenAI client (default 2)
+"""
+import os
+import threading
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    max_retries: int = 2
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        return cls(
+            max_connections=int(os.getenv("SK_POOL_MAX_CONNECTIONS", cls.max_connections)),
+            max_keepalive_connections=int(os.getenv("SK_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("SK_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry)),
+            timeout=float(os.getenv("SK_POOL_TIMEOUT", cls.timeout)),
+            max_retries=int(os.getenv("SK_POOL_MAX_RETRIES", cls.max_retries)),
+        )
+
+
+class ServiceRegistry:
+    """Owns the shared kernel, chat service and agents of one worker process.
+
+    Everything is built lazily on first access and reused afterwards. Agents
+    are cached per ``(name, instructions)``: a ``ChatCompletionAgent`` keeps
+    no per-conversation state (that lives in its thread), so every session can
+    safely use the same instance.
+    """
+
+    def __init__(self, pool_settings: PoolSettings | None = None):
+        self.pool_settings = pool_settings or PoolSettings.from_env()
+        self._lock = threading.Lock()
+        self._http_client = None
+        self.transport = None
+        self._service = None
+        self._kernel = None
+        self._agents = {}
+
+    @property
+    def service(self):
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    self._service = self._build_service()
+        return self._service
+
+    @property
+    def kernel(self):
+        if self._kernel is None:
+            service = self.service
+            with self._lock:
+                if self._kernel is None:
+                    from semantic_kernel import Kernel
+                    from common.telemetry import instrument_kernel
+
+                    kernel = Kernel()
+                    kernel.add_service(service)
+                    instrument_kernel(kernel)
+                    self._kernel = kernel
+        return self._kernel
+
+    def agent(self, name: str, instructions: str):
+        """Return the shared agent for ``name``/``instructions``, creating it once."""
+        key = (name, instructions)
+        agent = self._agents.get(key)
+        if agent is None:
+            kernel = self.kernel
+            with self._lock:
+                agent = self._agents.get(key)
+                if agent is None:
+                    from semantic_kernel.agents import ChatCompletionAgent
+
+                    agent = ChatCompletionAgent(kernel=kernel, name=name, instructions=instructions)
+                    self._agents[key] = agent
+        return agent
+
+    async def warm_up(self):
+        """Open a pooled connection to the endpoint with a cheap authenticated call (see ``common.prewarm``)."""
+        await self.service.client.models.list()
+
+    def _build_service(self):
+        import httpx
+        from openai import AsyncAzureOpenAI
+        from common.cassette import get_cassette
+        from common.config import create_chat_service, get_settings
+        from common.rate_limiter import ScheduledTransport
+
+        # With SK_CASSETTE set, chat completions are recorded or replayed from the file
+        cassette = get_cassette()
+        settings = cassette.settings(get_settings()) if cassette else get_settings().require()
+        pool = self.pool_settings
+        limits = httpx.Limits(
+            max_connections=pool.max_connections,
+            max_keepalive_connections=pool.max_keepalive_connections,
+            keepalive_expiry=pool.keepalive_expiry,
+        )
+        # Chat completions are admitted by priority within the deployment's
+        # rate budget (SK_RATE_* settings)
+        transport = httpx.AsyncHTTPTransport(limits=limits)
+        if cassette:
+            transport = cassette.transport(transport)
+        self.transport = ScheduledTransport(transport)
+        self._http_client = httpx.AsyncClient(transport=self.transport, timeout=httpx.Timeout(pool.timeout))
+        client = AsyncAzureOpenAI(
+            api_key=settings.api_key,
+            azure_endpoint=settings.endpoint,
+            api_version=settings.api_version,
+            http_client=self._http_client,
+            max_retries=pool.max_retries,
+        )
+        return create_chat_service(settings, async_client=client)
+
+    async def aclose(self):
+        """Close the pooled HTTP client and forget everything built so far."""
+        http_client = self._http_client
+        with self._lock:
+            self._http_client = None
+            self.transport = None
+            self._service = None
+            self._kernel = None
+            self._agents = {}
+        if http_client is not None:
+            await http_client.aclose()
+
+
+_registry: ServiceRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ServiceRegistry:
+    """Return the registry of the current process."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ServiceRegistry()
+    return _registry
@@ -0,0 +1,231 @@
+"""Per-conversation state keyed by the Chainlit thread id.
+
+Module-level dicts are shared by every user connected to a worker and never
+shrink. ``SessionStore`` keeps one small ``__slots__`` record per session,
+drops sessions that have been idle longer than a TTL and caps the number of
+sessions kept (least recently used go first). Records live in a pluggable
+backend:
+
+- ``InMemoryBackend``: an LRU dict inside the worker process,
+- ``SqliteBackend``: a SQLite file, so state survives worker restarts and can
+  be shared by several workers on one host.
+
+Key records on ``cl.context.session.thread_id``: the Chainlit session id
+changes on every reconnect, so state stored under it is never read back.
+In handlers use ``aget``/``asave``, which run a blocking backend (SQLite)
+in a worker thread instead of on the event loop.
+
+Define a record by listing its fields in ``__slots__``:
+
+    class OnboardingState(SessionRecord):
+        __slots__ = ("next_step", "name", "company")
+
+    sessions = SessionStore.from_env(OnboardingState)
+    state = await sessions.aget(cl.context.session.thread_id)
+    state.name = "Ada"
+    await sessions.asave(state)
+
+Configuration (``from_env``):
+
+    SK_SESSION_TTL       idle seconds before a session is dropped (default 1800)
+    SK_SESSION_MAX       sessions kept per backend (default 10000)
+    SK_SESSION_DB        path of a SQLite file; in-process storage when unset
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionRecord:
+    """Base class of session records; subclasses add fields via ``__slots__``."""
+    __slots__ = ("session_id", "touched")
+
+    def __init__(self, session_id: str, **values):
+        self.session_id = session_id
+        self.touched = 0.0
+        for name in self.fields():
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def fields(cls) -> tuple[str, ...]:
+        fields = cls.__dict__.get("_fields")
+        if fields is None:
+            fields = tuple(
+                name for klass in reversed(cls.__mro__)
+                for name in klass.__dict__.get("__slots__", ())
+                if name not in SessionRecord.__slots__
+            )
+            # Stored on the class itself; slots only restrict instance attributes
+            cls._fields = fields
+        return fields
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.fields()}
+
+    @classmethod
+    def from_dict(cls, session_id: str, data: dict, touched: float = 0.0) -> "SessionRecord":
+        record = cls(session_id, **data)
+        record.touched = touched
+        return record
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.session_id!r}, {self.to_dict()!r})"
+
+
+class InMemoryBackend:
+    """LRU of live records inside the worker process."""
+
+    blocking = False
+
+    def __init__(self, max_sessions: int = 10000):
+        self.max_sessions = max_sessions
+        self._records: OrderedDict[str, SessionRecord] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def load(self, session_id: str, record_type: type[SessionRecord]) -> SessionRecord | None:
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is not None:
+                self._records.move_to_end(session_id)
+            return record
+
+    def save(self, record: SessionRecord):
+        with self._lock:
+            self._records[record.session_id] = record
+            self._records.move_to_end(record.session_id)
+            while len(self._records) > self.max_sessions:
+                self._records.popitem(last=False)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._records.pop(session_id, None)
+
+    def purge(self, older_than: float) -> int:
+        # Records are ordered by last use, so expired ones are at the front
+        removed = 0
+        with self._lock:
+            while self._records:
+                session_id, record = next(iter(self._records.items()))
+                if record.touched >= older_than:
+                    break
+                del self._records[session_id]
+                removed += 1
+        return removed
+
+
+class SqliteBackend:
+    """Records stored as JSON rows in a SQLite file (WAL mode)."""
+
+    # Every call does file I/O: SessionStore.aget/asave run it off the event loop
+    blocking = True
+
+    def __init__(self, path: str, max_sessions: int = 10000):
+        self.path = path
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._saves = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY, data TEXT NOT NULL, touched REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_touched ON sessions (touched)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def load(self, session_id: str, record_type: type[SessionRecord]) -> SessionRecord | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, touched FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return record_type.from_dict(session_id, json.loads(row[0]), row[1])
+
+    def save(self, record: SessionRecord):
+        data = json.dumps(record.to_dict(), separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, touched) VALUES (?, ?, ?)",
+                (record.session_id, data, record.touched),
+            )
+            self._saves += 1
+            # Enforcing the cap needs a scan of the index, so do it every few hundred writes
+            if self._saves % 256 == 0:
+                self._conn.execute(
+                    "DELETE FROM sessions WHERE session_id IN ("
+                    " SELECT session_id FROM sessions ORDER BY touched DESC LIMIT -1 OFFSET ?)",
+                    (self.max_sessions,),
+                )
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE touched < ?", (older_than,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SessionStore:
+    """Hands out the record of a session, creating a fresh one when missing or expired."""
+
+    def __init__(self, record_type: type[SessionRecord], backend=None, ttl: float = 1800.0,
+                 purge_interval: float = 60.0):
+        self.record_type = record_type
+        self.backend = backend if backend is not None else InMemoryBackend()
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._next_purge = time.time() + purge_interval
+
+    @classmethod
+    def from_env(cls, record_type: type[SessionRecord]) -> "SessionStore":
+        max_sessions = int(os.getenv("SK_SESSION_MAX", 10000))
+        db_path = os.getenv("SK_SESSION_DB")
+        backend = SqliteBackend(db_path, max_sessions) if db_path else InMemoryBackend(max_sessions)
+        return cls(record_type, backend, ttl=float(os.getenv("SK_SESSION_TTL", 1800)))
+
+    def get(self, session_id: str) -> SessionRecord:
+        now = time.time()
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.backend.purge(now - self.ttl)
+        record = self.backend.load(session_id, self.record_type)
+        if record is None or now - record.touched > self.ttl:
+            record = self.record_type(session_id)
+        record.touched = now
+        return record
+
+    def save(self, record: SessionRecord):
+        record.touched = time.time()
+        self.backend.save(record)
+
+    def discard(self, session_id: str):
+        self.backend.delete(session_id)
+
+    async def aget(self, session_id: str) -> SessionRecord:
+        """``get`` for async handlers: a blocking backend runs in a worker thread."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.get, session_id)
+        return self.get(session_id)
+
+    async def asave(self, record: SessionRecord):
+        if self.backend.blocking:
+            await asyncio.to_thread(self.save, record)
+        else:
+            self.save(record)
@@ -0,0 +1,185 @@
+"""Single-flight deduplication of identical concurrent model calls.
+
+When many users ask the same thing at the same moment (an outage, a batch
+with duplicate questions), every request would otherwise be its own
+generation. ``SingleFlight`` runs one upstream call per key and lets every
+identical request that arrives while it is in flight share it:
+
+- ``stream()`` fans a token stream out to all subscribers. Chunks are kept
+  once per flight and every subscriber reads them at its own pace, so a
+  slow client neither holds up the others nor the model; a subscriber that
+  joins late first catches up on what was already generated,
+- ``call()`` shares the result of a non-streamed call,
+- cancellation is reference counted: a subscriber leaving only detaches it;
+  the upstream call is cancelled when the last one leaves,
+- errors reach every subscriber, and nothing outlives the flight (caching
+  finished answers is ``ResponseCache``'s job).
+
+Keys cover the agent, its instructions and execution settings and the
+messages: the last user message normalized like ``ResponseCache`` input, the
+rest of the history verbatim (so a history about "C++" never shares an
+answer with one about "C#"):
+
+    key = single_flight.key(agent, history.messages())
+    async for token in single_flight.stream(key, lambda: stream_from_agent(agent, messages)):
+        ...
+"""
+import asyncio
+import hashlib
+import json
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+from common.response_cache import normalize
+
+T = TypeVar("T")
+
+
+@dataclass
+class FlightStats:
+    flights: int = 0      # upstream calls started
+    shared: int = 0       # requests served by a call already in flight
+    abandoned: int = 0    # upstream calls cancelled because every subscriber left
+
+
+class _Flight:
+    __slots__ = ("task", "chunks", "subscribers", "changed")
+
+    def __init__(self):
+        self.task: asyncio.Task | None = None
+        self.chunks: list = []
+        self.subscribers = 0
+        self.changed = asyncio.Event()
+
+    def notify(self):
+        # Waiters hold the old event; each wake-up gets a fresh one
+        event, self.changed = self.changed, asyncio.Event()
+        event.set()
+
+
+class SingleFlight:
+    def __init__(self):
+        self.stats = FlightStats()
+        self._streams: dict[str, _Flight] = {}
+        self._calls: dict[str, _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._streams) + len(self._calls)
+
+    @staticmethod
+    def key(agent, messages: str | Iterable[Any], settings=None, *context: str | None) -> str:
+        """Key of a request of ``agent`` (name, instructions, settings) for ``messages``.
+
+        ``messages`` may be a string, chat history dicts or ``ChatMessageContent``
+        objects. Only the last user message is normalized; earlier messages
+        must match exactly. Settings default to the agent's own execution settings.
+        """
+        if isinstance(messages, str):
+            messages = [messages]
+        turns = []
+        for message in messages:
+            if isinstance(message, str):
+                role, content = "user", message
+            elif isinstance(message, dict):
+                role, content = message.get("role", ""), message.get("content", "")
+            else:
+                role, content = getattr(message, "role", ""), getattr(message, "content", message)
+            turns.append((role, str(content)))
+        last_user = max((i for i, (role, _) in enumerate(turns) if role == "user"), default=None)
+        parts = [getattr(agent, "name", None) or "", getattr(agent, "instructions", None) or ""]
+        for i, (role, content) in enumerate(turns):
+            # Verbatim content is escaped so it cannot forge a separator
+            parts.append(f"{role}:{normalize(content) if i == last_user else json.dumps(content)}")
+        if settings is None and getattr(agent, "arguments", None) is not None:
+            settings = agent.arguments.execution_settings
+        parts.append(_settings_text(settings))
+        parts.extend(c or "" for c in context)
+        return hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+
+    async def stream(self, key: str | None, produce: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """Yield the chunks of the flight for ``key``, starting ``produce()`` if there is none."""
+        if key is None:
+            async for chunk in produce():
+                yield chunk
+            return
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = self._streams[key] = _Flight()
+            flight.task = asyncio.create_task(self._pump(key, flight, produce))
+            self.stats.flights += 1
+        else:
+            self.stats.shared += 1
+        flight.subscribers += 1
+        position = 0
+        try:
+            while True:
+                changed = flight.changed
+                if position < len(flight.chunks):
+                    chunk = flight.chunks[position]
+                    position += 1
+                    yield chunk
+                elif flight.task.done():
+                    flight.task.result()  # re-raises the upstream error
+                    return
+                else:
+                    await changed.wait()
+        finally:
+            self._leave(self._streams, key, flight)
+
+    async def call(self, key: str | None, produce: Callable[[], Awaitable[T]]) -> T:
+        """Result of the flight for ``key``, starting ``produce()`` if there is none."""
+        if key is None:
+            return await produce()
+        flight = self._calls.get(key)
+        if flight is None:
+            flight = self._calls[key] = _Flight()
+            flight.task = asyncio.create_task(self._run(key, flight, produce))
+            self.stats.flights += 1
+        else:
+            self.stats.shared += 1
+        flight.subscribers += 1
+        try:
+            # Cancelling one caller must not cancel the call the others wait for
+            return await asyncio.shield(flight.task)
+        finally:
+            self._leave(self._calls, key, flight)
+
+    async def _pump(self, key: str, flight: _Flight, produce: Callable[[], AsyncIterator[T]]):
+        try:
+            # Closed explicitly, so a cancelled generation releases its connection at once
+            async with aclosing(produce()) as chunks:
+                async for chunk in chunks:
+                    flight.chunks.append(chunk)
+                    flight.notify()
+        finally:
+            # Requests arriving from now on start a new generation
+            if self._streams.get(key) is flight:
+                del self._streams[key]
+            flight.notify()
+
+    async def _run(self, key: str, flight: _Flight, produce: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await produce()
+        finally:
+            if self._calls.get(key) is flight:
+                del self._calls[key]
+
+    def _leave(self, flights: dict[str, _Flight], key: str, flight: _Flight):
+        flight.subscribers -= 1
+        if flight.subscribers == 0 and not flight.task.done():
+            flight.task.cancel()
+            if flights.get(key) is flight:
+                del flights[key]
+            self.stats.abandoned += 1
+
+
+def _settings_text(settings) -> str:
+    if settings is None:
+        return ""
+    if isinstance(settings, dict):
+        return json.dumps({k: _settings_text(v) for k, v in settings.items()}, sort_keys=True)
+    if hasattr(settings, "model_dump"):
+        return json.dumps(settings.model_dump(exclude_none=True), sort_keys=True, default=str)
+    return str(settings)
@@ -0,0 +1,91 @@
+"""Coalescing of streamed model tokens before they are sent to the UI.
+
+Fast models emit many tiny chunks; forwarding each one costs a websocket send
+and ``text += chunk`` rebuilds the whole answer every time. ``TokenCoalescer``
+sends the first token right away (time to first token stays low), then
+buffers and flushes when the buffer is old enough or large enough, and keeps
+the full text in a list that is joined once.
+
+    stream = TokenCoalescer(msg.stream_token)
+    try:
+        async for token in tokens:
+            await stream.push(token)
+    finally:
+        await stream.aclose()
+    full_text = stream.text
+
+Thresholds default to ``SK_STREAM_FLUSH_MS`` (30) and ``SK_STREAM_FLUSH_CHARS`` (64).
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable
+
+
+class TokenCoalescer:
+    def __init__(self, send: Callable[[str], Awaitable[None]], interval: float | None = None,
+                 max_chars: int | None = None):
+        self.send = send
+        self.interval = interval if interval is not None else float(os.getenv("SK_STREAM_FLUSH_MS", 30)) / 1000
+        self.max_chars = max_chars if max_chars is not None else int(os.getenv("SK_STREAM_FLUSH_CHARS", 64))
+        self.tokens = 0
+        self.sends = 0
+        self._parts: list[str] = []
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._last_flush = 0.0
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._text: str | None = None
+
+    @property
+    def text(self) -> str:
+        """Everything pushed so far."""
+        if self._text is None:
+            self._text = "".join(self._parts)
+        return self._text
+
+    async def push(self, token: str):
+        if not token:
+            return
+        self.tokens += 1
+        self._parts.append(token)
+        self._text = None
+        self._pending.append(token)
+        self._pending_chars += len(token)
+        if self.sends == 0 or self._pending_chars >= self.max_chars \
+                or time.monotonic() - self._last_flush >= self.interval:
+            await self.flush()
+        elif self._timer is None:
+            # Make sure a quiet model does not leave text sitting in the buffer
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            chunk = "".join(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+            self._last_flush = time.monotonic()
+            self.sends += 1
+            await self.send(chunk)
+
+    async def aclose(self):
+        """Stop the timer, wait for a flush it has started and flush what is left."""
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            # Only interrupts the timer's wait; a flush it started runs to the end
+            timer.cancel()
+            await asyncio.gather(timer, return_exceptions=True)
+        await self.flush()
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - self._last_flush)))
+        except asyncio.CancelledError:
+            return
+        self._timer = None
+        # The chunk is taken out of the buffer before it is sent: cancelling
+        # the send would lose it
+        await asyncio.shield(self.flush())
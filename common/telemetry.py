@@ -0,0 +1,312 @@
+"""Per-turn latency instrumentation for the chat agents.
+
+A slow turn can spend its time in the model, in a plugin or MCP tool, or in
+Chainlit sends. Handlers open a turn and time its parts; kernel filters time
+prompt rendering and every function/tool call of the turn they run in:
+
+    with telemetry.turn("message", state=state) as turn:
+        with turn.span("transition"):
+            transition = FLOW.dispatch(state, text=user_input)
+        await telemetry.timed("ui.send", msg.send())
+
+Recorded histograms (seconds):
+
+    turn               whole handler, labelled by kind and state
+    transition         flow dispatch / session state update
+    intent             local intent classification of typed text
+    session.load       session store lookup
+    llm.ttft           from the start of the turn to the first streamed token
+    llm.generation     whole streamed answer
+    prompt.render      kernel prompt rendering
+    tool               each kernel function call, labelled by function
+    ui.send            Chainlit message sends and streamed chunks
+
+Sampling is off unless ``SK_TELEMETRY_SAMPLE`` is set (0..1, fraction of
+turns). Unsampled turns get a shared no-op object, so the cost is one
+comparison per turn and one context variable lookup per span. Histograms live
+in the in-process ``registry``; with ``SK_TELEMETRY_OTEL=1`` and the
+``opentelemetry-api`` package installed they are also recorded as
+OpenTelemetry histograms (exported by whatever SDK the process configures).
+"""
+import atexit
+import bisect
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+# 1 ms .. ~65 s, four buckets per doubling
+BUCKETS = tuple(0.001 * 2 ** (i / 4) for i in range(65))
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS[i] if i < len(BUCKETS) else self.max, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and labels, plus optional exporters."""
+
+    def __init__(self):
+        self._histograms: dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+        self.exporters: list[Callable[[str, float, dict], None]] = []
+
+    def record(self, name: str, seconds: float, labels: dict | None = None):
+        key = (name, tuple(sorted(labels.items())) if labels else ())
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.record(seconds)
+        for export in self.exporters:
+            export(name, seconds, labels or {})
+
+    def snapshot(self) -> list[dict]:
+        return [
+            {"name": name, "labels": dict(labels), "count": h.count, "mean": h.mean,
+             "p50": h.percentile(0.5), "p95": h.percentile(0.95), "p99": h.percentile(0.99), "max": h.max}
+            for (name, labels), h in sorted(self._histograms.items())
+        ]
+
+    def report(self) -> str:
+        lines = []
+        for row in self.snapshot():
+            labels = ",".join(f"{k}={v}" for k, v in row["labels"].items())
+            name = f"{row['name']}{{{labels}}}" if labels else row["name"]
+            lines.append(f"{name:48s} n={row['count']:6d}  mean {row['mean'] * 1000:8.1f} ms  "
+                         f"p50 {row['p50'] * 1000:8.1f}  p95 {row['p95'] * 1000:8.1f}  p99 {row['p99'] * 1000:8.1f}")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class OTelExporter:
+    """Mirrors every recorded value into an OpenTelemetry histogram."""
+
+    def __init__(self, meter_name: str = "semantic-kernel-examples"):
+        # Only imported when enabled: loading the API costs more than a sampled turn
+        from opentelemetry import metrics
+
+        self.meter = metrics.get_meter(meter_name)
+        self._instruments = {}
+
+    def __call__(self, name: str, seconds: float, labels: dict):
+        instrument = self._instruments.get(name)
+        if instrument is None:
+            instrument = self._instruments[name] = self.meter.create_histogram(name, unit="s")
+        instrument.record(seconds, attributes=labels)
+
+
+registry = MetricsRegistry()
+if os.getenv("SK_TELEMETRY_OTEL") == "1":
+    try:
+        registry.exporters.append(OTelExporter())
+    except ImportError:
+        print("# SK_TELEMETRY_OTEL=1 but opentelemetry-api is not installed; metrics stay in-process",
+              file=sys.stderr)
+
+_sample_rate = float(os.getenv("SK_TELEMETRY_SAMPLE", 0))
+_current: contextvars.ContextVar["Turn | None"] = contextvars.ContextVar("sk_telemetry_turn", default=None)
+
+
+def set_sample_rate(rate: float):
+    global _sample_rate
+    _sample_rate = rate
+
+
+class _Span:
+    __slots__ = ("turn", "name", "labels", "start")
+
+    def __init__(self, turn: "Turn", name: str, labels: dict | None):
+        self.turn = turn
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.turn.record(self.name, time.perf_counter() - self.start, self.labels)
+
+
+class Turn:
+    """One sampled handler invocation."""
+
+    def __init__(self, kind: str, labels: dict):
+        self.kind = kind
+        self.labels = labels
+        self.start = time.perf_counter()
+        self._token = None
+        self._first_token = False
+
+    def record(self, name: str, seconds: float, labels: dict | None = None):
+        registry.record(name, seconds, labels)
+
+    def span(self, name: str, **labels) -> _Span:
+        return _Span(self, name, labels or None)
+
+    def first_token(self):
+        """Mark the first streamed token of the answer (recorded once)."""
+        if not self._first_token:
+            self._first_token = True
+            self.record("llm.ttft", time.perf_counter() - self.start)
+
+    def wrap(self, name: str, send: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        """``send`` timed as ``name`` on every call."""
+        async def timed_send(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await send(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return timed_send
+
+    def __enter__(self) -> "Turn":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        self.record("turn", time.perf_counter() - self.start, {"kind": self.kind, **self.labels})
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _NoopTurn:
+    """Stands in for unsampled turns; every method does nothing."""
+
+    __slots__ = ()
+    _span = _NoopSpan()
+
+    def span(self, name: str, **labels):
+        return self._span
+
+    def first_token(self):
+        pass
+
+    def wrap(self, name: str, send):
+        return send
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NOOP_TURN = _NoopTurn()
+
+
+def turn(kind: str, **labels) -> "Turn | _NoopTurn":
+    """Start timing a handler invocation if this turn is sampled."""
+    if _sample_rate <= 0 or (_sample_rate < 1 and random.random() >= _sample_rate):
+        return NOOP_TURN
+    return Turn(kind, labels)
+
+
+def current_turn() -> "Turn | _NoopTurn":
+    return _current.get() or NOOP_TURN
+
+
+async def timed(name: str, awaitable: Awaitable[T]) -> T:
+    """Await ``awaitable``, timing it as ``name`` when the current turn is sampled."""
+    active = _current.get()
+    if active is None:
+        return await awaitable
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        active.record(name, time.perf_counter() - start)
+
+
+async def prompt_render_filter(context, next):
+    active = _current.get()
+    if active is None:
+        await next(context)
+        return
+    start = time.perf_counter()
+    try:
+        await next(context)
+    finally:
+        active.record("prompt.render", time.perf_counter() - start)
+
+
+async def function_invocation_filter(context, next):
+    active = _current.get()
+    if active is None:
+        await next(context)
+        return
+    start = time.perf_counter()
+    try:
+        await next(context)
+    finally:
+        function = context.function
+        active.record("tool", time.perf_counter() - start, {"function": f"{function.plugin_name}-{function.name}"})
+
+
+def instrument_kernel(kernel):
+    """Add the prompt-render and function-invocation filters to ``kernel`` (once).
+
+    Call it before adding other filters (e.g. caches): the first filter added
+    is the outermost, so tool timings then include cache hits.
+    """
+    if any(f is function_invocation_filter for _, f in kernel.function_invocation_filters):
+        return kernel
+    kernel.add_filter("prompt_rendering", prompt_render_filter)
+    kernel.add_filter("function_invocation", function_invocation_filter)
+    return kernel
+
+
+@atexit.register
+def _report_at_exit():
+    if _sample_rate > 0 and registry.snapshot():
+        print(f"# Latency by turn part:\n{registry.report()}", file=sys.stderr)
@@ -0,0 +1,163 @@
+"""TTL cache with request coalescing for plugin (e.g. MCP) tool calls.
+
+The GitHub tools used by the IssueAgent return data that is stable over
+minutes (issue lists, issue status, labels), yet every agent turn that calls
+them goes back to the MCP server. ``ToolResultCache`` is a Semantic Kernel
+function-invocation filter that:
+
+- keys results on tool name plus canonicalized arguments,
+- keeps them for a per-tool TTL (tools without a TTL, such as writes, are
+  never cached) in a size-bounded LRU,
+- coalesces identical in-flight calls, so concurrent agents asking about the
+  same issue cause a single tool invocation,
+- counts hits, misses and coalesced calls per tool.
+
+    cache = ToolResultCache(plugin_names={"Github"})
+    agent.kernel.add_filter("function_invocation", cache)
+
+TTLs (seconds) can be overridden with ``SK_MCP_CACHE_TTLS``, e.g.
+``"list_issues=120,get_issue=30,search_issues=0"``.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+
+# Read-only tools of @modelcontextprotocol/server-github
+GITHUB_READ_TTLS = {
+    "list_issues": 120.0,
+    "get_issue": 60.0,
+    "get_issue_comments": 60.0,
+    "search_issues": 120.0,
+    "list_pull_requests": 120.0,
+    "get_pull_request": 60.0,
+    "list_commits": 300.0,
+    "get_file_contents": 300.0,
+    "search_repositories": 600.0,
+    "search_code": 300.0,
+}
+
+
+def ttls_from_env(defaults: dict[str, float] = GITHUB_READ_TTLS) -> dict[str, float]:
+    ttls = dict(defaults)
+    for item in filter(None, os.getenv("SK_MCP_CACHE_TTLS", "").split(",")):
+        name, _, seconds = item.partition("=")
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def canonical_arguments(arguments) -> str:
+    """Arguments as a stable string: sorted keys, ``None`` values dropped."""
+    values = {k: v for k, v in dict(arguments or {}).items() if v is not None}
+    return json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+
+
+@dataclass
+class ToolStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+
+class ToolResultCache:
+    """Function-invocation filter caching tool results per tool and arguments."""
+
+    def __init__(self, plugin_names: set[str] | None = None, ttls: dict[str, float] | None = None,
+                 max_entries: int = 2048):
+        self.plugin_names = plugin_names
+        self.ttls = ttls if ttls is not None else ttls_from_env()
+        self.max_entries = max_entries
+        self.evictions = 0
+        self.stats: dict[str, ToolStats] = defaultdict(ToolStats)
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def __call__(self, context, next):
+        function = context.function
+        ttl = self.ttls.get(function.name, 0.0)
+        if ttl <= 0 or (self.plugin_names is not None and function.plugin_name not in self.plugin_names):
+            await next(context)
+            return
+
+        stats = self.stats[function.name]
+        key = f"{function.plugin_name}-{function.name}:{canonical_arguments(context.arguments)}"
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, value = entry
+            if expires >= time.monotonic():
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                context.result = self._result(context, value)
+                return
+            del self._entries[key]
+            stats.expirations += 1
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            stats.coalesced += 1
+            try:
+                # shield: a cancelled waiter must not cancel the shared call
+                value = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The caller that owned the call went away; make our own
+                await next(context)
+                return
+            context.result = self._result(context, value)
+            return
+
+        stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            await next(context)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # Waiters re-raise it; mark it retrieved in case there are none
+            future.exception()
+            raise
+        else:
+            value = context.result.value if context.result is not None else None
+            future.set_result(value)
+            self._store(key, ttl, value)
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: str, ttl: float, value):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @staticmethod
+    def _result(context, value):
+        from semantic_kernel.functions import FunctionResult
+
+        return FunctionResult(function=context.function.metadata, value=value)
+
+    def clear(self):
+        self._entries.clear()
+
+    def report(self) -> str:
+        """One line per tool, for tuning TTLs."""
+        lines = [f"{len(self._entries)} cached results, {self.evictions} evictions"]
+        for name, s in sorted(self.stats.items()):
+            lines.append(f"  {name:22s} hits {s.hits:5d}  coalesced {s.coalesced:5d}  misses {s.misses:5d}  "
+                         f"expired {s.expirations:5d}  hit rate {s.hit_rate:.0%}")
+        return "\n".join(lines)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Same layout the scripts and benchmarks rely on: ``common`` from the repo
+# root, the flow and menu modules from their example directories
+for path in (ROOT, os.path.join(ROOT, "00_sequential_chatflow"), os.path.join(ROOT, "02_agents_with_plugins")):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from common.batch import CheckpointError, bounded_as_completed, run_jsonl_batch
+
+
+def write_lines(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def answered_lines(path) -> list[int]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["line"] for line in f]
+
+
+async def echo(record: dict) -> str:
+    await asyncio.sleep(0)
+    return record["prompt"].upper()
+
+
+def test_bounded_as_completed_limits_concurrency_and_reports_errors():
+    running = peak = 0
+
+    async def worker(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001 * (item % 3))
+        running -= 1
+        if item == 5:
+            raise RuntimeError("boom")
+        return item * 2
+
+    async def collect():
+        return [entry async for entry in bounded_as_completed(range(20), worker, concurrency=4)]
+
+    results = asyncio.run(collect())
+    assert peak == 4
+    assert sorted(item for item, _, _ in results) == list(range(20))
+    errors = {item: error for item, _, error in results if error is not None}
+    assert list(errors) == [5] and isinstance(errors[5], RuntimeError)
+    assert all(result == item * 2 for item, result, error in results if error is None)
+
+
+def test_answers_every_line_with_ids_and_errors(tmp_path):
+    prompts, output = tmp_path / "prompts.jsonl", tmp_path / "answers.jsonl"
+    write_lines(prompts, ['{"id": "a", "prompt": "one"}', "", "two", '{"prompt": "fail"}'])
+
+    async def worker(record):
+        if record["prompt"] == "fail":
+            raise ValueError("no")
+        return await echo(record)
+
+    stats = asyncio.run(run_jsonl_batch(str(prompts), str(output), worker))
+    records = {r["line"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert (stats.answered, stats.failed) == (2, 1)
+    assert records[1] == {"line": 1, "id": "a", "response": "ONE", "seconds": records[1]["seconds"]}
+    assert records[3]["response"] == "TWO"
+    assert "ValueError" in records[4]["error"]
+    assert 2 not in records
+
+
+def test_malformed_line_fails_alone_and_a_resumed_run_gets_past_it(tmp_path):
+    prompts, output = tmp_path / "prompts.jsonl", tmp_path / "answers.jsonl"
+    checkpoint = str(output) + ".ckpt"
+    with open(prompts, "wb") as f:
+        f.write(b'{"prompt": "one"}\n{"prompt": "two"}\n{"prompt": "three",\n\xff\xfe\n{"prompt": "five"}\n')
+
+    async def interrupted():
+        # Stuck on line 2, so the bad lines are only read after the resume
+        async def worker(record):
+            if record["prompt"] == "two":
+                await asyncio.Event().wait()
+            return await echo(record)
+
+        task = asyncio.create_task(run_jsonl_batch(str(prompts), str(output), worker, concurrency=1,
+                                                   checkpoint_path=checkpoint, checkpoint_every=0))
+        while not output.exists() or not output.read_text():
+            await asyncio.sleep(0.001)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(interrupted())
+    assert answered_lines(output) == [1]
+
+    seen = []
+
+    async def worker(record):
+        seen.append(record["prompt"])
+        return await echo(record)
+
+    stats = asyncio.run(run_jsonl_batch(str(prompts), str(output), worker, checkpoint_path=checkpoint))
+    records = {r["line"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert (stats.resumed_at, stats.answered, stats.failed) == (2, 2, 2)
+    assert sorted(seen) == ["five", "two"]
+    assert sorted(records) == [1, 2, 3, 4, 5]
+    assert records[3] == {"line": 3, "error": records[3]["error"]} and "invalid input line" in records[3]["error"]
+    assert "invalid input line" in records[4]["error"]
+    assert records[5]["response"] == "FIVE"
+
+
+def test_resume_after_interruption_answers_each_line_once(tmp_path):
+    prompts, output = tmp_path / "prompts.jsonl", tmp_path / "answers.jsonl"
+    checkpoint = str(output) + ".ckpt"
+    write_lines(prompts, [f"prompt {i}" for i in range(200)])
+
+    async def interrupted():
+        answered = 0
+
+        async def worker(record):
+            nonlocal answered
+            answered += 1
+            if answered > 120:
+                await asyncio.Event().wait()  # hangs like a stuck request until cancelled
+            return await echo(record)
+
+        task = asyncio.create_task(run_jsonl_batch(str(prompts), str(output), worker, concurrency=8,
+                                                   checkpoint_path=checkpoint, checkpoint_every=0))
+        while answered <= 120:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(interrupted())
+    assert 0 < len(answered_lines(output)) < 200
+    stats = asyncio.run(run_jsonl_batch(str(prompts), str(output), echo, concurrency=8, checkpoint_path=checkpoint))
+    lines = answered_lines(output)
+    assert stats.resumed_at > 1
+    assert sorted(lines) == list(range(1, 201))
+
+
+def test_checkpoint_of_another_input_is_refused(tmp_path):
+    first, second, output = tmp_path / "a.jsonl", tmp_path / "b.jsonl", tmp_path / "answers.jsonl"
+    checkpoint = str(output) + ".ckpt"
+    write_lines(first, ["a1", "a2", "a3"])
+    write_lines(second, ["b1", "b2", "b3", "b4", "b5"])
+    asyncio.run(run_jsonl_batch(str(first), str(output), echo, checkpoint_path=checkpoint))
+
+    with pytest.raises(CheckpointError):
+        asyncio.run(run_jsonl_batch(str(second), str(output), echo, checkpoint_path=checkpoint))
+    assert sorted(answered_lines(output)) == [1, 2, 3]
+
+
+def test_output_without_checkpoint_is_not_truncated(tmp_path):
+    prompts, output = tmp_path / "prompts.jsonl", tmp_path / "answers.jsonl"
+    write_lines(prompts, ["one"])
+    output.write_text('{"line": 1, "response": "kept"}\n')
+
+    with pytest.raises(FileExistsError):
+        asyncio.run(run_jsonl_batch(str(prompts), str(output), echo, checkpoint_path=str(output) + ".ckpt"))
+    assert output.read_text() == '{"line": 1, "response": "kept"}\n'
+    assert not os.path.exists(str(output) + ".ckpt")
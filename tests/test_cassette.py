@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from semantic_kernel import Kernel
+from semantic_kernel.functions import kernel_function
+
+from common.cassette import Cassette, CassetteError, ReplayPlugin, request_key
+
+URL = "https://example.openai.azure.com/openai/deployments/gpt-4o/chat/completions"
+
+
+def upstream(replies: list[bytes]):
+    """Fake server answering each request with the next reply, in two chunks."""
+    def handle(request: httpx.Request) -> httpx.Response:
+        body = replies.pop(0)
+        return httpx.Response(200, headers={"content-type": "text/event-stream", "x-request-id": "1"},
+                              stream=httpx.ByteStream(body))
+    return httpx.MockTransport(handle)
+
+
+async def post(transport: httpx.AsyncBaseTransport, payload: dict, read: bool = True) -> httpx.Response:
+    async with httpx.AsyncClient(transport=transport) as client:
+        if read:
+            return await client.post(URL, json=payload)
+        async with client.stream("POST", URL, json=payload) as response:
+            return response
+
+
+def test_request_key_ignores_the_model_and_key_order():
+    key = request_key(b'{"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}], "stream": true}')
+    assert key == request_key(b'{"stream": true, "messages": [{"role": "user", "content": "hi"}], "model": "x"}')
+    assert key != request_key(b'{"messages": [{"role": "user", "content": "hello"}], "stream": true}')
+    assert request_key(b"not json") == request_key(b"not json")
+
+
+def test_recorded_completions_replay_without_network(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    question = {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}]}
+    other = {"model": "gpt-4o", "messages": [{"role": "user", "content": "bye"}]}
+
+    recorder = Cassette(path, mode="record")
+    transport = recorder.transport(upstream([b"data: first\n\n", b"data: second\n\n", b"data: other\n\n"]))
+    recorded = [asyncio.run(post(transport, q)).content for q in (question, question, other)]
+    assert recorded == [b"data: first\n\n", b"data: second\n\n", b"data: other\n\n"]
+    assert recorder.stats.recorded == 3
+    lines = [json.loads(line) for line in open(path, encoding="utf-8")]
+    assert {line["type"] for line in lines} == {"llm"}
+    # Only the headers needed to decode the body are kept
+    assert lines[0]["headers"] == {"content-type": "text/event-stream"}
+
+    replay = Cassette(path, speed=0)
+    transport = replay.transport()
+    # Identical requests come back in recorded order, then from the start again
+    replayed = [asyncio.run(post(transport, question)).content for _ in range(3)]
+    assert replayed == [b"data: first\n\n", b"data: second\n\n", b"data: first\n\n"]
+    assert asyncio.run(post(transport, {**other, "model": "another-deployment"})).content == b"data: other\n\n"
+
+    missing = asyncio.run(post(transport, {"messages": [{"role": "user", "content": "new"}]}))
+    assert missing.status_code == 404
+    assert missing.json()["error"]["code"] == "NotInCassette"
+    assert (replay.stats.replayed, replay.stats.missing) == (4, 1)
+
+
+def test_abandoned_streams_are_not_recorded(tmp_path):
+    path = tmp_path / "run.jsonl"
+    recorder = Cassette(str(path), mode="record")
+    transport = recorder.transport(upstream([b"data: partial\n\n"]))
+    asyncio.run(post(transport, {"messages": []}, read=False))
+    assert recorder.stats.recorded == 0
+    assert not path.exists()
+
+
+def test_replay_needs_a_recorded_cassette(tmp_path):
+    with pytest.raises(CassetteError, match="record it first"):
+        Cassette(str(tmp_path / "missing.jsonl"))
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "run.jsonl"), mode="rewind")
+
+
+class IssuePlugin:
+    name = "Github"
+
+    def __init__(self):
+        self.calls = 0
+
+    @kernel_function(description="Lists the open issues of a repository.")
+    def list_issues(self, repo: str) -> str:
+        self.calls += 1
+        return f"3 open issues in {repo}"
+
+
+def test_tool_calls_replay_through_a_stand_in_plugin(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+
+    async def call(plugin, cassette: Cassette) -> str:
+        kernel = Kernel()
+        kernel.add_plugin(plugin, plugin_name="Github")
+        kernel.add_filter("function_invocation", cassette.tool_filter)
+        result = await kernel.invoke(plugin_name="Github", function_name="list_issues", repo="octo/hello")
+        return str(result)
+
+    live = IssuePlugin()
+    recorder = Cassette(path, mode="record")
+    recorder.record_tools(live)
+    assert asyncio.run(call(live, recorder)) == "3 open issues in octo/hello"
+    assert live.calls == 1
+
+    replay = Cassette(path, speed=0)
+    stand_in = replay.plugin_factory("Github")()
+    assert isinstance(stand_in, ReplayPlugin)
+    assert asyncio.run(call(stand_in, replay)) == "3 open issues in octo/hello"
+    assert replay.stats.replayed == 1
+    with pytest.raises(CassetteError):
+        replay.plugin_factory("Weather")
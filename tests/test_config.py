@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from common import config
+from common.config import AzureOpenAISettings, ConfigError
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ENV = {
+    "AZURE_OPENAI_API_KEY": "key",
+    "AZURE_OPENAI_API_ENDPOINT": "https://example.openai.azure.com",
+    "AZURE_OPENAI_API_VERSION": "2024-10-21",
+    "AZURE_OPENAI_API_DEPLOYMENT_NAME": "gpt-4o",
+}
+
+
+def test_settings_from_env(monkeypatch):
+    for name, value in ENV.items():
+        monkeypatch.setenv(name, value)
+    settings = AzureOpenAISettings.from_env()
+    assert settings.deployment_name == "gpt-4o" and settings.missing() == []
+    assert settings.require() is settings
+
+
+def test_missing_settings_are_named(monkeypatch):
+    for name, value in ENV.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "")
+    monkeypatch.delenv("AZURE_OPENAI_API_VERSION")
+    settings = AzureOpenAISettings.from_env()
+    assert settings.missing() == ["AZURE_OPENAI_API_KEY", "AZURE_OPENAI_API_VERSION"]
+    with pytest.raises(ConfigError, match="AZURE_OPENAI_API_KEY, AZURE_OPENAI_API_VERSION"):
+        settings.require()
+
+
+def test_bootstrap_loads_the_env_file_once_without_overriding(tmp_path, monkeypatch, capsys):
+    (tmp_path / ".env").write_text("AZURE_OPENAI_API_KEY=from-file\nAZURE_OPENAI_API_DEPLOYMENT_NAME=from-file\n")
+    work = tmp_path / "work"
+    work.mkdir()
+    monkeypatch.chdir(work)  # ../.env is found first
+    monkeypatch.setenv("AZURE_OPENAI_API_DEPLOYMENT_NAME", "from-environment")
+    monkeypatch.delenv("AZURE_OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(config, "_settings", None)
+    try:
+        settings = config.bootstrap()
+        assert settings.api_key == "from-file"
+        assert settings.deployment_name == "from-environment"
+        assert config.bootstrap() is settings and config.get_settings() is settings
+        assert "missing AZURE_OPENAI_API_ENDPOINT" in capsys.readouterr().err
+    finally:
+        os.environ.pop("AZURE_OPENAI_API_KEY", None)
+
+
+def modules_after_import(code: str) -> set[str]:
+    """Top-level packages loaded by ``code`` in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "SK_TELEMETRY_OTEL": "", "SK_CASSETTE": ""},
+    ).stdout
+    return set(out.split())
+
+
+def test_bootstrap_and_telemetry_import_no_sdk():
+    loaded = modules_after_import("from common.config import bootstrap\nfrom common import telemetry\nbootstrap()")
+    assert not loaded & {"semantic_kernel", "openai", "opentelemetry"}
+
+
+def test_initial_agent_defers_semantic_kernel():
+    loaded = modules_after_import(
+        "import importlib.util\n"
+        "spec = importlib.util.spec_from_file_location('agent', '00_sequential_chatflow/00_initial_agent.py')\n"
+        "spec.loader.exec_module(importlib.util.module_from_spec(spec))"
+    )
+    assert "semantic_kernel" not in loaded
+
+
+def test_create_chat_service_uses_the_given_settings():
+    settings = AzureOpenAISettings(**{f: ENV[env] for f, env in AzureOpenAISettings.ENV.items()})
+    service = config.create_chat_service(settings)
+    assert service.ai_model_id == "gpt-4o"
+    assert str(service.client.base_url).startswith("https://example.openai.azure.com")
@@ -0,0 +1,102 @@
+import asyncio
+import sqlite3
+
+from common.conversation_log import ConversationLog
+
+
+def test_turns_are_written_in_one_batch_and_read_back(tmp_path):
+    async def scenario():
+        log = ConversationLog(str(tmp_path / "log.db"), flush_interval=0.01)
+        log.record("t1", "user", "my wifi is down", "INITIAL")
+        log.record("t1", "assistant", "Have you restarted the router?", "INTERNET_ASK_RESTART")
+        log.record("t2", "user", "excel crashes", "INITIAL")
+        # Still buffered, but already visible to readers
+        assert log.pending == 3
+        assert [t.content for t in await log.turns("t1")] == ["my wifi is down", "Have you restarted the router?"]
+        await asyncio.sleep(0.05)
+        assert (log.pending, log.written, log.batches) == (0, 3, 1)
+        turns = await log.turns("t1")
+        await log.aclose()
+        return turns
+
+    turns = asyncio.run(scenario())
+    assert [(t.role, t.state) for t in turns] == [("user", "INITIAL"), ("assistant", "INTERNET_ASK_RESTART")]
+
+
+def test_last_and_time_range(tmp_path):
+    log = ConversationLog(str(tmp_path / "log.db"))
+    # Without an event loop every record is written through
+    for i in range(5):
+        log.record("t1", "user", f"m{i}")
+    assert log.pending == 0 and log.written == 5
+    turns = asyncio.run(log.turns("t1"))
+    assert [t.content for t in asyncio.run(log.turns("t1", last=2))] == ["m3", "m4"]
+    middle = asyncio.run(log.turns("t1", since=turns[1].ts, until=turns[3].ts))
+    assert [t.content for t in middle] == ["m1", "m2", "m3"]
+    assert asyncio.run(log.sessions(since=0)) == ["t1"]
+    log.close()
+
+
+def test_memory_keeps_the_latest_value_per_name(tmp_path):
+    async def scenario():
+        log = ConversationLog(str(tmp_path / "log.db"), flush_interval=0.01)
+        log.remember("t1", "software_name", "Excel")
+        await log.flush()
+        log.remember("t1", "software_name", "Outlook")
+        log.remember("t2", "software_name", "Teams")
+        # One value stored, the newer one buffered
+        assert await log.memory("t1") == {"software_name": "Outlook"}
+        await log.aclose()
+
+    asyncio.run(scenario())
+    reopened = ConversationLog(str(tmp_path / "log.db"))
+    assert asyncio.run(reopened.memory("t1")) == {"software_name": "Outlook"}
+    assert asyncio.run(reopened.memory("t3")) == {}
+    reopened.close()
+
+
+def test_close_writes_what_is_buffered(tmp_path):
+    async def scenario():
+        log = ConversationLog(str(tmp_path / "log.db"), flush_interval=60)
+        log.record("t1", "user", "hello")
+        return log
+
+    log = asyncio.run(scenario())
+    assert log.pending == 1
+    log.close()
+    assert log.pending == 0
+    rows = sqlite3.connect(tmp_path / "log.db").execute("SELECT content FROM turns").fetchall()
+    assert rows == [("hello",)]
+
+
+def test_full_buffer_drops_turns(tmp_path):
+    async def scenario():
+        log = ConversationLog(str(tmp_path / "log.db"), flush_interval=60, max_pending=2)
+        for i in range(5):
+            log.record("t1", "user", f"m{i}")
+        assert (log.pending, log.dropped) == (2, 3)
+        await log.aclose()
+        return await log.turns("t1")
+
+    assert [t.content for t in asyncio.run(scenario())] == ["m0", "m1"]
+
+
+def test_failing_batches_are_dropped_after_max_failures(tmp_path, capsys):
+    # A directory where the database file should be: every write fails
+    path = tmp_path / "log.db"
+    path.mkdir()
+
+    async def scenario():
+        log = ConversationLog(str(path), flush_interval=0.001, max_failures=2)
+        # A failed batch stays buffered and is retried with the next one
+        log.record("t1", "user", "first")
+        await asyncio.sleep(0.05)
+        assert (log.pending, log.dropped) == (1, 0)
+        log.record("t1", "user", "second")
+        await asyncio.sleep(0.05)
+        return log
+
+    log = asyncio.run(scenario())
+    assert (log.pending, log.dropped, log.written) == (0, 2, 0)
+    log.close()
+    assert "dropping turns after 2 failed writes" in capsys.readouterr().err
@@ -0,0 +1,57 @@
+import asyncio
+import importlib.util
+import os
+
+from common.fake_chat_service import FakeChatCompletion
+from menu_catalog import MenuItem, MenuItems
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def load_script(relative_path: str):
+    spec = importlib.util.spec_from_file_location("custom_plugin_agent", os.path.join(ROOT, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+agent_script = load_script("02_agents_with_plugins/00_simple_agent_custom_plugin.py")
+
+
+class RecordingService(FakeChatCompletion):
+    formats: list = []
+
+    async def _inner_get_streaming_chat_message_contents(self, chat_history, settings, function_invoke_attempt=0):
+        self.formats.append(settings.response_format)
+        async for chunk in super()._inner_get_streaming_chat_message_contents(
+                chat_history, settings, function_invoke_attempt):
+            yield chunk
+
+
+def test_list_answers_are_requested_wrapped_in_an_object():
+    service = RecordingService(
+        reply='{"items": [{"price": 9.99, "name": "Clam Chowder"}, {"price": 8.5, "name": "Cobb Salad"}]}',
+        formats=[])
+    agent = agent_script.create_agent(service)
+    items = []
+
+    result = asyncio.run(agent_script.stream_structured(
+        agent, "What are the specials?", target=MenuItems, on_item=lambda index, item: items.append(item)))
+
+    assert service.formats == [MenuItems]
+    assert items == result.items == [MenuItem(price=9.99, name="Clam Chowder"), MenuItem(price=8.5, name="Cobb Salad")]
+    # The per-call format does not stick to the agent
+    assert [s.response_format for s in agent.arguments.execution_settings.values()] == [MenuItem]
+
+
+def test_default_answer_is_one_menu_item():
+    service = RecordingService(reply='{"price": 9.99, "name": "Clam Chowder"}', formats=[])
+    agent = agent_script.create_agent(service)
+    fields = []
+
+    item = asyncio.run(agent_script.stream_structured(
+        agent, "What is the price of the soup special?", on_field=lambda name, value: fields.append(name)))
+
+    assert service.formats == [MenuItem]
+    assert fields == ["price", "name"]
+    assert item == MenuItem(price=9.99, name="Clam Chowder")
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from typing import Annotated
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.functions import kernel_function
+
+from common.fake_chat_service import FakeChatCompletion
+
+
+class MenuPlugin:
+    def __init__(self):
+        self.asked: list[str] = []
+
+    @kernel_function(name="get_item_price")
+    def get_item_price(self, menu_item: Annotated[str, "Item"]) -> str:
+        self.asked.append(menu_item)
+        return "$9.99"
+
+
+def test_streams_the_reply_token_by_token_at_the_set_pace():
+    service = FakeChatCompletion(reply="one two three four", latency=0.02, tokens_per_second=100)
+    agent = ChatCompletionAgent(service=service, name="Bot", instructions="Answer.")
+
+    async def main():
+        start = time.perf_counter()
+        tokens = [str(r.message.content) async for r in agent.invoke_stream(messages="hi")]
+        return tokens, time.perf_counter() - start
+
+    tokens, elapsed = asyncio.run(main())
+    assert "".join(tokens) == "one two three four" and len(tokens) == 4
+    # latency before the first token, then three gaps of 10 ms
+    assert elapsed >= 0.045
+    assert service.calls == 1
+
+
+def test_tool_call_rounds_run_the_plugin_before_the_reply():
+    plugin = MenuPlugin()
+    service = FakeChatCompletion(reply="It costs $9.99.",
+                                 tool_calls=[[("MenuPlugin-get_item_price", {"menu_item": "Clam Chowder"})]])
+    agent = ChatCompletionAgent(service=service, name="Bot", plugins=[plugin])
+
+    async def main():
+        response = await agent.get_response(messages="How much is the chowder?")
+        return str(response.message.content)
+
+    assert asyncio.run(main()) == "It costs $9.99."
+    assert plugin.asked == ["Clam Chowder"]
+    # one request for the tool call, one for the answer
+    assert service.calls == 2
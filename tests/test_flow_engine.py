@@ -0,0 +1,77 @@
+import pytest
+
+from common.flow_engine import ActionSpec, Flow, FlowSpec, StateSpec, Step
+from tech_support_flow import (STATE_FINAL, STATE_INITIAL, STATE_INTERNET_ASK_RESTART, STATE_SOFTWARE_ASK_NAME,
+                               STATE_SOFTWARE_ASK_PROBLEM, TECH_SUPPORT_FLOW as FLOW)
+
+
+def test_start_offers_the_main_menu():
+    start = FLOW.start()
+    assert start.next_state == STATE_INITIAL
+    assert [a.name for a in start.actions] == ["internet_issue", "software_problem", "hardware_failure"]
+
+
+def test_button_dispatch():
+    transition = FLOW.dispatch(STATE_INITIAL, action="internet_issue")
+    assert transition.next_state == STATE_INTERNET_ASK_RESTART
+    assert transition.action.label == "Internet Issue"
+    assert [a.name for a in transition.actions] == ["internet_restarted_yes", "internet_restarted_no"]
+
+
+def test_typed_input_is_stored_and_used_in_later_answers():
+    asked = FLOW.dispatch(STATE_SOFTWARE_ASK_NAME, text="Excel")
+    assert asked.next_state == STATE_SOFTWARE_ASK_PROBLEM
+    assert asked.store == "software_name"
+    assert "Excel" in asked.response
+
+    answered = FLOW.dispatch(STATE_SOFTWARE_ASK_PROBLEM, text="it crashes", memory={"software_name": "Excel"})
+    assert answered.next_state == STATE_FINAL
+    assert "Excel" in answered.response and "'it crashes'" in answered.response
+    # Defaults fill in values that were never remembered
+    assert "the software" in FLOW.dispatch(STATE_SOFTWARE_ASK_PROBLEM, text="it crashes").response
+
+
+def test_typed_command_works_like_its_button():
+    typed = FLOW.dispatch(STATE_FINAL, text="  Start Over ")
+    assert typed == FLOW.dispatch(STATE_FINAL, action="start_over")
+    assert typed.next_state == STATE_INITIAL
+
+
+def test_final_state_hands_free_text_to_the_model():
+    transition = FLOW.dispatch(STATE_FINAL, text="how long will it take?")
+    assert transition.llm and transition.next_state == STATE_FINAL
+    assert FLOW.hands_off(STATE_FINAL) and not FLOW.hands_off(STATE_INITIAL)
+
+
+def test_intent_labels_only_in_classify_states():
+    assert FLOW.intent_labels(STATE_INITIAL) == ("internet_issue", "software_problem", "hardware_failure")
+    assert FLOW.intent_labels(STATE_SOFTWARE_ASK_NAME) == ()
+
+
+def test_memory_fields_are_the_values_a_state_answers_with():
+    assert FLOW.memory_fields(STATE_SOFTWARE_ASK_PROBLEM) == ("software_name",)
+    assert FLOW.memory_fields(STATE_SOFTWARE_ASK_NAME) == ()
+    assert FLOW.memory_fields(None) == ()
+
+
+def spec(**changes) -> FlowSpec:
+    fields = dict(
+        start=Step("hi", "A", actions="menu"),
+        states={"A": StateSpec(Step("again", "A"))},
+        actions={"go": Step("went", "A")},
+        action_sets={"menu": (ActionSpec("go", "Go", "Go"),)},
+    )
+    fields.update(changes)
+    return FlowSpec(**fields)
+
+
+@pytest.mark.parametrize("changes", [
+    {"actions": {"go": Step("went", "MISSING")}},
+    {"start": Step("hi", "A", actions="missing_set")},
+    {"action_sets": {"menu": (ActionSpec("unknown", "?", "?"),)}},
+    {"states": {"A": StateSpec(Step("again", "A"), commands={"go now": "unknown"})}},
+    {"states": {"A": StateSpec(Step("again", "A"), classify=True)}},
+])
+def test_broken_references_fail_at_compile_time(changes):
+    with pytest.raises(ValueError):
+        Flow(spec(**changes))
@@ -0,0 +1,106 @@
+import asyncio
+
+from common.history import BoundedHistory, count_tokens
+
+
+def message(role: str, text: str) -> dict:
+    return {"role": role, "content": text}
+
+
+def test_window_stays_under_the_token_budget():
+    history = BoundedHistory(token_budget=50, max_turns=100, summary_tokens=50)
+    for i in range(40):
+        history.append(message("user", f"turn {i} " + "word " * 5))
+    assert history.prompt_tokens <= 50 + 50
+    assert history.total_turns == 40
+    assert 0 < len(history) < 40
+    assert list(history)[-1]["content"].startswith("turn 39")
+
+
+def test_max_turns_and_the_newest_turn_is_always_kept():
+    history = BoundedHistory(token_budget=10, max_turns=3, summary_tokens=50)
+    for i in range(5):
+        history.append(message("user", f"short {i}"))
+    assert len(history) <= 3
+    history.append(message("user", "far too long " * 50))
+    assert len(history) == 1 and list(history)[0]["content"].startswith("far too long")
+
+
+def test_evicted_turns_are_folded_into_a_summary_without_a_loop():
+    history = BoundedHistory(token_budget=20, max_turns=2, summary_tokens=100)
+    for text in ["I use Excel", "It crashes on save", "Which version?", "Office 365"]:
+        history.append(message("user", text))
+    messages = history.messages()
+    assert messages[0]["role"] == "system"
+    assert "I use Excel" in messages[0]["content"]
+    assert [m["content"] for m in messages[1:]] == ["Which version?", "Office 365"]
+
+
+def test_summarizer_runs_in_the_background_and_merges_every_evicted_turn():
+    calls = []
+
+    async def summarizer(summary, turns):
+        calls.append([t.content for t in turns])
+        await asyncio.sleep(0.01)
+        return " ".join(filter(None, [summary] + [t.content for t in turns]))
+
+    async def main():
+        history = BoundedHistory(token_budget=1000, max_turns=2, summary_tokens=100, summarizer=summarizer)
+        for i in range(5):
+            history.append(message("user", f"m{i}"))
+            await asyncio.sleep(0)
+        await history.flush()
+        return history
+
+    history = asyncio.run(main())
+    assert history.summary == "m0 m1 m2"
+    assert [m["content"] for m in history.messages()[1:]] == ["m3", "m4"]
+    # The first eviction started a summary; the next two waited for it and went together
+    assert calls == [["m0"], ["m1", "m2"]]
+
+
+def test_backlog_behind_a_slow_summary_is_compacted():
+    calls = []
+
+    async def summarizer(summary, turns):
+        calls.append(len(turns))
+        return " ".join(filter(None, [summary] + [t.content for t in turns]))
+
+    async def main():
+        history = BoundedHistory(token_budget=1000, max_turns=2, summary_tokens=100, summarizer=summarizer)
+        for i in range(8):
+            history.append(message("user", f"m{i}"))
+        await history.flush()
+        return history
+
+    summary = asyncio.run(main()).summary
+    # Eviction outpaced the summarizer: the backlog never grew past the window
+    assert calls and max(calls) <= 2
+    assert "user: m0" in summary and summary.endswith("m5")
+
+
+def test_failing_summarizer_falls_back_to_an_extract():
+    async def summarizer(summary, turns):
+        raise TimeoutError
+
+    async def main():
+        history = BoundedHistory(token_budget=1000, max_turns=1, summary_tokens=100, summarizer=summarizer)
+        history.append(message("user", "first"))
+        history.append(message("assistant", "second"))
+        await history.flush()
+        return history
+
+    assert asyncio.run(main()).summary == "user: first"
+
+
+def test_summary_keeps_its_most_recent_end():
+    history = BoundedHistory(token_budget=5, max_turns=1, summary_tokens=10)
+    for i in range(30):
+        history.append(message("user", f"message number {i}"))
+    assert history.summary.startswith("…") and history.summary.endswith("message number 28")
+    assert len(history.summary) <= 41
+
+
+def test_count_tokens_is_positive():
+    assert count_tokens("") == 1
+    assert count_tokens("hello world") >= 2
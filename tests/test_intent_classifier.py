@@ -0,0 +1,93 @@
+import pytest
+
+from common.intent_classifier import IntentClassifier, features
+from tech_support_flow import INTENT_EXAMPLES, STATE_INITIAL, STATE_INTERNET_ASK_RESTART, TECH_SUPPORT_FLOW as FLOW
+
+MENU = FLOW.intent_labels(STATE_INITIAL)
+RESTART = FLOW.intent_labels(STATE_INTERNET_ASK_RESTART)
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return IntentClassifier.from_file(INTENT_EXAMPLES, min_score=0.1, min_ratio=1.5, min_coverage=0.7)
+
+
+def label(classifier, text, labels):
+    intent = classifier.predict(text, labels)
+    return intent.label if intent else None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("my wifi is down", "internet_issue"),
+    ("my interent is super slow", "internet_issue"),
+    ("excel keeps crashing", "software_problem"),
+    ("outlook won't open", "software_problem"),
+    ("the screen is cracked", "hardware_failure"),
+    ("my laptop will not turn on", "hardware_failure"),
+])
+def test_main_menu_topics(classifier, text, expected):
+    assert label(classifier, text, MENU) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "no",
+    "no idea",
+    "nope",
+    "yes",
+    "yes I restarted but it still does not work",
+    "I need help",
+    "hello",
+])
+def test_main_menu_answers_and_chatter_are_not_topics(classifier, text):
+    assert label(classifier, text, MENU) is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("yes", "internet_restarted_yes"),
+    ("yes I restarted it", "internet_restarted_yes"),
+    ("yeah already did that", "internet_restarted_yes"),
+    ("no", "internet_restarted_no"),
+    ("not yet", "internet_restarted_no"),
+    ("I haven't", "internet_restarted_no"),
+    ("no I have not tried that", "internet_restarted_no"),
+])
+def test_restart_question_answers(classifier, text, expected):
+    assert label(classifier, text, RESTART) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "it is not working",
+    "the internet is not working",
+    "I restarted but it does not help",
+    "I did",
+    "maybe",
+])
+def test_restart_question_leaves_unclear_replies_to_the_fallback(classifier, text):
+    assert label(classifier, text, RESTART) is None
+
+
+def test_answer_words_count_only_for_answer_labels(classifier):
+    assert classifier.answer_labels == {"internet_restarted_no"}
+    assert "no" in features("no idea")
+    assert "no" not in features("no idea", answers=False)
+    assert classifier.scores("no", MENU) == dict.fromkeys(MENU, 0.0)
+
+
+def test_stop_words_and_negation_spelling():
+    assert set(features("It does not work", answers=False)) == set(features("work"))
+    assert features("I haven't") == features("I have not")
+
+
+def test_prediction_reports_margin_and_coverage(classifier):
+    intent = classifier.predict("the internet is down", MENU)
+    assert intent.label == "internet_issue"
+    assert intent.score >= 1.5 * intent.runner_up
+    assert intent.coverage == pytest.approx(1.0)
+
+
+def test_thresholds_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SK_INTENT_MIN_SCORE", "0.9")
+    monkeypatch.setenv("SK_INTENT_MIN_COVERAGE", "0.5")
+    strict = IntentClassifier({"a": ["alpha beta"], "b": ["gamma delta"]})
+    assert (strict.min_score, strict.min_ratio, strict.min_coverage) == (0.9, 1.5, 0.5)
+    assert strict.predict("alpha gamma zeta") is None
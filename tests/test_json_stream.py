@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from common.json_stream import JSONStreamParser, StructuredStream
+
+DOCUMENTS = [
+    '{"name": "Clam Chowder", "price": 9.99, "tags": ["soup", "special"], "vegan": false, "note": null}',
+    '[1, -2.5, 3e2, "a\\"b\\\\c\\n", {}, [], {"nested": {"deep": [true]}}]',
+    '"plain string"',
+    '{"emoji": "x\\ud83d\\ude00y", "upper": "\\uD83D\\uDE00", "lone": "\\ud83d", "e": "\\u00e9"}',
+    '[0, -0, 10, -0.5, 1E+3, 12e-1, "\\/\\b\\f\\r\\t"]',
+]
+
+
+def feed_in_chunks(text: str, size: int) -> JSONStreamParser:
+    parser = JSONStreamParser()
+    for start in range(0, len(text), size):
+        parser.feed(text[start:start + size])
+    parser.close()
+    return parser
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_matches_json_loads_whatever_the_chunking(document, size):
+    parser = feed_in_chunks(document, size)
+    assert parser.done
+    assert parser.root == json.loads(document)
+
+
+def test_surrogate_pair_is_one_character():
+    parser = feed_in_chunks('"\\ud83d\\ude00"', 1)
+    assert parser.root == "\U0001F600"
+    assert len(parser.root) == 1
+
+
+def test_values_are_reported_innermost_first_with_their_path():
+    parser = JSONStreamParser()
+    completed = parser.feed('{"items": [{"name": "Tea"}')
+    assert completed == [(("items", 0, "name"), "Tea"), (("items", 0), {"name": "Tea"})]
+    assert parser.partial == {"items": [{"name": "Tea"}]}
+
+
+def test_bare_number_completes_on_close():
+    parser = JSONStreamParser()
+    assert parser.feed("42") == []
+    assert parser.close() == [((), 42)]
+
+
+@pytest.mark.parametrize("document", [
+    '{"a" 1}', "[1,,2]", '{"a": 1}}', "[1] 2", "tru", '{"a": 1',
+    # Numbers Python accepts but JSON does not
+    "[1_000]", "[01]", "[+1]", "[1.]", "[.5]", "[1e]", "[nan]", "[Infinity]",
+    # Escapes JSON does not define
+    '["\\x41"]', '["\\a"]', '["\\u12G4"]', '["\\u00"]',
+])
+def test_invalid_documents_raise(document):
+    with pytest.raises(ValueError):
+        feed_in_chunks(document, 1)
+
+
+class MenuItem(BaseModel):
+    name: str
+    price: float
+
+
+class Order(BaseModel):
+    table: int
+    items: list[MenuItem]
+
+
+def test_structured_stream_fires_fields_and_items_as_they_complete():
+    fields, items = [], []
+    stream = StructuredStream(Order, on_field=lambda name, value: fields.append(name),
+                              on_item=lambda index, item: items.append((index, item)))
+    stream.feed('{"table": 4, "items": [{"name": "Tea", "price": 3')
+    assert fields == ["table"] and items == []
+    stream.feed('.5}, {"name": "Pie", "price": 6}]}')
+    order = stream.close()
+    assert fields == ["table", "items"]
+    assert items == [(0, MenuItem(name="Tea", price=3.5)), (1, MenuItem(name="Pie", price=6))]
+    assert order == Order(table=4, items=[MenuItem(name="Tea", price=3.5), MenuItem(name="Pie", price=6)])
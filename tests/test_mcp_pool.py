@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from common.mcp_pool import MCPPoolUnavailable, MCPServerPool
+
+
+class FakeSession:
+    def __init__(self, plugin: "FakePlugin"):
+        self.plugin = plugin
+
+    async def send_ping(self):
+        if not self.plugin.alive:
+            raise ConnectionError("server exited")
+
+
+class FakePlugin:
+    """Stands in for ``MCPStdioPlugin``: connect, ping and close."""
+
+    def __init__(self, factory: "Factory"):
+        self.factory = factory
+        self.alive = True
+        self.closed = False
+        self.session = FakeSession(self)
+
+    async def connect(self):
+        self.factory.connects += 1
+        if self.factory.down:
+            raise OSError("npx not found")
+
+    async def close(self):
+        self.closed = True
+
+
+class Factory:
+    def __init__(self):
+        self.down = False
+        self.connects = 0
+        self.plugins: list[FakePlugin] = []
+
+    def __call__(self) -> FakePlugin:
+        plugin = FakePlugin(self)
+        self.plugins.append(plugin)
+        return plugin
+
+
+def pool(factory, **kwargs) -> MCPServerPool:
+    kwargs.setdefault("health_interval", 0)
+    return MCPServerPool(factory, **kwargs)
+
+
+def test_leases_go_to_the_least_busy_server():
+    async def main():
+        async with pool(Factory(), size=2) as servers:
+            async with servers.lease() as first, servers.lease() as second, servers.lease() as third:
+                assert first is not second and third in (first, second)
+            assert servers.stats.leases == 3 and servers.stats.starts == 2
+
+    asyncio.run(main())
+
+
+def test_busy_servers_make_leases_wait():
+    async def main():
+        async with pool(Factory(), size=1, max_inflight=1) as servers:
+            order = []
+
+            async def use(name: str):
+                async with servers.lease():
+                    order.append(f"{name} in")
+                    await asyncio.sleep(0.01)
+                    order.append(f"{name} out")
+
+            await asyncio.gather(use("a"), use("b"))
+            assert order == ["a in", "a out", "b in", "b out"]
+
+    asyncio.run(main())
+
+
+def test_start_fails_when_no_server_starts():
+    factory = Factory()
+    factory.down = True
+    with pytest.raises(RuntimeError, match="no MCP server"):
+        asyncio.run(pool(factory).start())
+
+
+def test_lease_raises_instead_of_hanging_when_every_server_is_down():
+    async def main():
+        factory = Factory()
+        async with pool(factory, size=2, lease_timeout=0.05) as servers:
+            factory.down = True
+            for plugin in factory.plugins:
+                plugin.alive = False
+            await asyncio.gather(*(servers._check(server) for server in servers._servers))
+            with pytest.raises(MCPPoolUnavailable, match="0 of 2 healthy"):
+                async with servers.lease():
+                    pass
+            assert servers.stats.lease_timeouts == 1
+            # The lease tried to bring the servers back
+            assert factory.connects == 2 + 2 + 2
+
+    asyncio.run(asyncio.wait_for(main(), 5))
+
+
+def test_lease_restarts_down_servers_without_waiting_for_the_health_check():
+    async def main():
+        factory = Factory()
+        async with pool(factory, size=1, health_interval=60) as servers:
+            factory.down = True
+            factory.plugins[0].alive = False
+            await servers._check(servers._servers[0])
+            factory.down = False
+            async with servers.lease() as plugin:
+                assert plugin is factory.plugins[-1] and plugin.alive
+            assert servers.stats.restarts == 1
+
+    asyncio.run(asyncio.wait_for(main(), 5))
+
+
+def test_failed_lease_checks_its_server():
+    async def main():
+        factory = Factory()
+        async with pool(factory, size=1) as servers:
+            first = factory.plugins[0]
+            with pytest.raises(ConnectionError):
+                async with servers.lease() as plugin:
+                    plugin.alive = False
+                    raise ConnectionError("broken pipe")
+            await asyncio.sleep(0.01)
+            assert first.closed and servers.stats.failed_checks == 1 and servers.stats.restarts == 1
+            async with servers.lease() as plugin:
+                assert plugin is not first
+
+    asyncio.run(main())
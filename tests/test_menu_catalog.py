@@ -0,0 +1,52 @@
+import pytest
+
+from menu_catalog import load_catalog
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return load_catalog()
+
+
+@pytest.mark.parametrize("query, name", [
+    ("Clam Chowder", "Clam Chowder"),
+    ("how much is the clam chowder?", "Clam Chowder"),
+    ("margarita piza", "Margherita Pizza"),
+    ("cheesburger", "Cheeseburger"),
+])
+def test_lookup_finds_the_item(catalog, query, name):
+    assert catalog.lookup(query).name == name
+
+
+@pytest.mark.parametrize("query", ["grilled cheese", "apple juice", "", "please"])
+def test_items_not_on_the_menu_are_not_guessed(catalog, query):
+    assert catalog.lookup(query) is None
+
+
+def test_suggestions_rank_related_items(catalog):
+    assert catalog.suggestions("soup")[:2] == ["Tomato Basil Soup", "French Onion Soup"]
+
+
+@pytest.mark.parametrize("query, names", [
+    # A category means all of its items; the special comes first
+    ("soup", ["Clam Chowder", "Tomato Basil Soup", "French Onion Soup"]),
+    ("salads", ["Cobb Salad", "Caesar Salad", "Greek Salad"]),
+    # Several items fit equally well
+    ("tea", ["Chai Tea", "Iced Tea"]),
+    # Only part of the query matches
+    ("specialty pizza", ["Margherita Pizza"]),
+])
+def test_ambiguous_queries_list_candidates_instead_of_picking_one(catalog, query, names):
+    assert catalog.lookup(query) is None
+    assert [entry.name for entry in catalog.candidates(query)] == names
+
+
+def test_a_word_inside_a_longer_name_is_not_a_misspelling(catalog):
+    assert catalog.lookup("cheese") is None
+    assert catalog.candidates("cheese") == ()
+
+
+def test_specials_and_exact_names_have_no_candidates(catalog):
+    assert catalog.lookup("today's soup special").name == "Clam Chowder"
+    assert catalog.lookup("salad special").name == "Cobb Salad"
+    assert catalog.candidates("Caesar Salad") == ()
@@ -0,0 +1,115 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+from semantic_kernel import Kernel
+from semantic_kernel.functions import kernel_function
+
+from common.plugin_executor import PluginExecutor, PluginTimeoutError, timeouts_from_env
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class SlowPlugin:
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.threads = []
+
+    @kernel_function(description="Looks up a price slowly.")
+    def get_price(self, item: str) -> str:
+        self.threads.append(threading.current_thread().name)
+        time.sleep(self.delay)
+        return f"{item}: $1 ({request_id.get()})"
+
+    @kernel_function(description="Already asynchronous.")
+    async def ping(self) -> str:
+        return "pong"
+
+    def helper(self) -> str:
+        return "not a kernel function"
+
+
+def make_kernel(executor: PluginExecutor, plugin: SlowPlugin) -> Kernel:
+    kernel = Kernel()
+    kernel.add_plugin(executor.offload(plugin), plugin_name="Menu")
+    kernel.add_filter("function_invocation", executor)
+    return kernel
+
+
+def test_offload_keeps_the_tool_schema_and_only_wraps_sync_functions():
+    plugin = SlowPlugin()
+    ping = plugin.ping
+    PluginExecutor().offload(plugin)
+    assert asyncio.iscoroutinefunction(plugin.get_price)
+    assert plugin.get_price.__kernel_function_name__ == "get_price"
+    assert [p["name"] for p in plugin.get_price.__kernel_function_parameters__] == ["item"]
+    assert plugin.ping == ping
+    assert plugin.helper() == "not a kernel function"
+
+
+def test_sync_tool_calls_run_in_parallel_on_the_pool_in_the_callers_context():
+    executor = PluginExecutor(max_workers=4)
+    plugin = SlowPlugin(delay=0.2)
+    kernel = make_kernel(executor, plugin)
+
+    async def run():
+        request_id.set("turn-7")
+        start = time.perf_counter()
+        results = await asyncio.gather(*(kernel.invoke(plugin_name="Menu", function_name="get_price", item=item)
+                                         for item in ("tea", "pie", "soup")))
+        return [str(r) for r in results], time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run())
+    executor.shutdown()
+    assert results == ["tea: $1 (turn-7)", "pie: $1 (turn-7)", "soup: $1 (turn-7)"]
+    # As long as the slowest call, not the sum
+    assert elapsed < 0.5
+    assert all(name.startswith("sk-plugin") for name in plugin.threads)
+    assert (executor.stats.calls, executor.stats.offloaded, executor.stats.peak) == (3, 3, 3)
+
+
+def test_concurrency_cap_queues_calls():
+    executor = PluginExecutor(max_concurrency=1)
+    kernel = make_kernel(executor, SlowPlugin(delay=0.05))
+
+    async def run():
+        await asyncio.gather(*(kernel.invoke(plugin_name="Menu", function_name="get_price", item=str(i))
+                               for i in range(3)))
+
+    asyncio.run(run())
+    executor.shutdown()
+    assert (executor.stats.calls, executor.stats.queued, executor.stats.peak) == (3, 2, 1)
+    assert executor.in_flight == 0
+
+
+def test_slow_call_times_out_with_a_per_function_override():
+    executor = PluginExecutor(timeout=30, timeouts={"Menu-get_price": 0.05})
+    kernel = make_kernel(executor, SlowPlugin(delay=0.3))
+
+    async def run():
+        return await kernel.invoke(plugin_name="Menu", function_name="get_price", item="tea")
+
+    with pytest.raises(Exception) as raised:
+        asyncio.run(run())
+    error = raised.value
+    while error is not None and not isinstance(error, PluginTimeoutError):
+        error = error.__cause__ or error.__context__
+    assert error is not None and "Menu-get_price did not answer within 0.05s" in str(error)
+    assert (executor.stats.timeouts, executor.stats.errors) == (1, 0)
+    executor.shutdown()
+
+
+def test_timeouts_by_function_name_or_plugin_and_name(monkeypatch):
+    monkeypatch.setenv("SK_PLUGIN_TIMEOUTS", "get_item_price=2, Github-search_issues=20")
+    assert timeouts_from_env() == {"get_item_price": 2.0, "Github-search_issues": 20.0}
+    executor = PluginExecutor(timeout=30, timeouts=timeouts_from_env())
+
+    class Function:
+        def __init__(self, plugin_name, name):
+            self.plugin_name, self.name = plugin_name, name
+
+    assert executor.timeout_for(Function("Menu", "get_item_price")) == 2
+    assert executor.timeout_for(Function("Github", "search_issues")) == 20
+    assert executor.timeout_for(Function("Github", "list_issues")) == 30
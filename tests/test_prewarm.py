@@ -0,0 +1,111 @@
+import asyncio
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+from semantic_kernel.functions import KernelArguments
+
+from common import rate_limiter
+from common.fake_chat_service import FakeChatCompletion
+from common.prewarm import Prewarmer
+
+
+class Warm:
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("endpoint unreachable")
+
+
+class RecordingService(FakeChatCompletion):
+    requests: list = []
+
+    async def _inner_get_chat_message_contents(self, chat_history, settings):
+        self.requests.append((settings.max_tokens, rate_limiter.current_priority(), len(chat_history.messages)))
+        await asyncio.sleep(0.01)
+        return await super()._inner_get_chat_message_contents(chat_history, settings)
+
+
+def messages(count: int = 2) -> list[ChatMessageContent]:
+    return [ChatMessageContent(role=AuthorRole.USER, content=f"message {i}") for i in range(count)]
+
+
+def test_start_warms_at_once_and_keeps_warm_until_idle():
+    warm = Warm()
+
+    async def run():
+        prewarmer = Prewarmer(warm, interval=0.01, idle=0.05)
+        prewarmer.start()
+        prewarmer.start()  # a second session does not start a second loop
+        await asyncio.sleep(0.005)
+        assert warm.calls == 1
+        await asyncio.sleep(0.15)
+        return prewarmer
+
+    prewarmer = asyncio.run(run())
+    # Stops once no session has started for ``idle`` seconds
+    assert 3 <= warm.calls <= 7
+    assert prewarmer._keep_alive.done()
+    assert prewarmer.stats.warmups == warm.calls
+
+
+def test_disabled_prewarmer_sends_nothing_and_failures_are_only_counted():
+    warm = Warm(fail=True)
+
+    async def run():
+        disabled = Prewarmer(warm, enabled=False)
+        disabled.start()
+        disabled.speculate(None, messages())
+        await asyncio.sleep(0.01)
+        assert warm.calls == 0
+        failing = Prewarmer(warm, interval=60)
+        failing.start()
+        await asyncio.sleep(0.01)
+        await failing.aclose()
+        return failing
+
+    prewarmer = asyncio.run(run())
+    assert (warm.calls, prewarmer.stats.warmups, prewarmer.stats.failures) == (1, 0, 1)
+
+
+def test_speculation_sends_a_one_token_prompt_at_batch_priority():
+    service = RecordingService(requests=[])
+    settings = OpenAIChatPromptExecutionSettings(max_tokens=500)
+    agent = ChatCompletionAgent(service=service, name="TechSupportBot", instructions="Help.",
+                                arguments=KernelArguments(settings))
+    warm = Warm()
+
+    async def run():
+        prewarmer = Prewarmer(warm, speculate=True, min_prefix_tokens=1024)
+        history = messages(3)
+        prewarmer.speculate(agent, history, prefix_tokens=2000)
+        # Already in flight: only the connection is warmed
+        prewarmer.speculate(agent, history, prefix_tokens=2000)
+        # Too short for the prompt cache: only the connection is warmed
+        prewarmer.speculate(agent, messages(1), prefix_tokens=100)
+        await asyncio.sleep(0.05)
+        await prewarmer.aclose()
+        return prewarmer
+
+    prewarmer = asyncio.run(run())
+    assert service.requests == [(1, rate_limiter.BATCH, 4)]
+    assert (prewarmer.stats.speculations, prewarmer.stats.skipped, warm.calls) == (1, 2, 2)
+    # The agent's own settings are untouched by the one-token limit
+    assert agent.arguments.execution_settings["default"].max_tokens == 500
+
+
+def test_from_env_stays_off_while_a_cassette_is_active(monkeypatch):
+    monkeypatch.setenv("SK_PREWARM", "1")
+    monkeypatch.setenv("SK_PREWARM_SPECULATE", "1")
+    monkeypatch.setenv("SK_PREWARM_MIN_PREFIX_TOKENS", "2048")
+    monkeypatch.setattr("common.cassette.get_cassette", lambda: None)
+    prewarmer = Prewarmer.from_env()
+    assert (prewarmer.enabled, prewarmer.speculative, prewarmer.min_prefix_tokens) == (True, True, 2048)
+
+    monkeypatch.setattr("common.cassette.get_cassette", lambda: object())
+    prewarmer = Prewarmer.from_env()
+    assert (prewarmer.enabled, prewarmer.speculative) == (False, False)
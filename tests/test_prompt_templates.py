@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from semantic_kernel import Kernel
+from semantic_kernel.functions import KernelArguments
+
+from common.prompt_templates import CONFIG_FILE, TEMPLATE_FILE, KernelSkill, PromptTemplateCache, load_skill
+
+CONFIG = {"schema": 1, "description": "Greets a user.",
+          "input_variables": [{"name": "name", "description": "Name", "is_required": True}]}
+
+
+def write_function(skills_dir, skill: str, function: str, template: str) -> str:
+    function_dir = os.path.join(skills_dir, skill, function)
+    os.makedirs(function_dir, exist_ok=True)
+    with open(os.path.join(function_dir, TEMPLATE_FILE), "w", encoding="utf-8") as f:
+        f.write(template)
+    with open(os.path.join(function_dir, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(CONFIG, f)
+    return function_dir
+
+
+def touch_later(path: str):
+    # Make the change visible to mtime checks even on coarse clocks
+    now = time.time_ns() + 1_000_000_000
+    os.utime(path, ns=(now, now))
+
+
+def render(function, **arguments) -> str:
+    return asyncio.run(function.prompt_template.render(Kernel(), KernelArguments(**arguments)))
+
+
+@pytest.fixture
+def skills_dir(tmp_path):
+    write_function(tmp_path, "Greeting", "hello", "Hello {{$name}}!")
+    write_function(tmp_path, "Greeting", "bye", "Goodbye {{$name}}.")
+    return str(tmp_path)
+
+
+def test_functions_are_built_once_and_shared(skills_dir):
+    cache = PromptTemplateCache(reload_interval=60)
+    function_dir = os.path.join(skills_dir, "Greeting", "hello")
+    function = cache.get(function_dir, "Greeting")
+    assert cache.get(function_dir, "Greeting") is function
+    assert cache.compiles == 1 and len(cache) == 1
+    assert function.description == "Greets a user." and function.plugin_name == "Greeting"
+    assert render(function, name="Ada") == "Hello Ada!"
+
+
+def test_edited_template_is_rebuilt_after_the_interval(skills_dir):
+    cache = PromptTemplateCache(reload_interval=0.01)
+    function_dir = os.path.join(skills_dir, "Greeting", "hello")
+    first = cache.get(function_dir, "Greeting")
+    write_function(skills_dir, "Greeting", "hello", "Hi there, {{$name}}!")
+    touch_later(os.path.join(function_dir, TEMPLATE_FILE))
+    # Within the interval the files are not even looked at
+    cache.reload_interval = 60
+    assert cache.get(function_dir, "Greeting") is first
+    cache.reload_interval = 0.01
+    time.sleep(0.02)
+    second = cache.get(function_dir, "Greeting")
+    assert second is not first and cache.reloads == 1
+    assert render(second, name="Ada") == "Hi there, Ada!"
+
+
+def test_disabled_reload_never_rebuilds(skills_dir):
+    cache = PromptTemplateCache(reload_interval=0)
+    function_dir = os.path.join(skills_dir, "Greeting", "hello")
+    first = cache.get(function_dir, "Greeting")
+    touch_later(os.path.join(function_dir, CONFIG_FILE))
+    assert cache.get(function_dir, "Greeting") is first and cache.compiles == 1
+
+
+def test_load_skill_collects_every_function(skills_dir, tmp_path):
+    plugin = load_skill(skills_dir, "Greeting", PromptTemplateCache())
+    assert sorted(plugin.functions) == ["bye", "hello"]
+    os.makedirs(tmp_path / "Empty" / "nothing")
+    with pytest.raises(FileNotFoundError):
+        load_skill(skills_dir, "Empty")
+
+
+def test_kernel_skill_is_registered_once_until_a_function_changes(skills_dir):
+    cache = PromptTemplateCache(reload_interval=0.01)
+    kernel = Kernel()
+    skill = KernelSkill(kernel, skills_dir, "Greeting", cache)
+    for _ in range(5):
+        assert skill.refresh() is kernel
+    assert skill.registrations == 1 and cache.compiles == 2
+    assert render(kernel.get_function("Greeting", "bye"), name="Ada") == "Goodbye Ada."
+
+    write_function(skills_dir, "Greeting", "bye", "See you, {{$name}}.")
+    touch_later(os.path.join(skills_dir, "Greeting", "bye", TEMPLATE_FILE))
+    time.sleep(0.02)
+    skill.refresh()
+    skill.refresh()
+    assert skill.registrations == 2
+    assert render(kernel.get_function("Greeting", "bye"), name="Ada") == "See you, Ada."
@@ -0,0 +1,83 @@
+import asyncio
+
+from common import rate_limiter
+from common.rate_limiter import BATCH, INTERACTIVE, ChatScheduler
+
+
+async def admit_in_order(scheduler: ChatScheduler, waiters: list[tuple[str, int]]) -> list[str]:
+    """Queue ``waiters`` behind a held permit, then release it and record who runs, one at a time."""
+    admitted = []
+    held = await scheduler.acquire()
+
+    async def call(name: str, level: int):
+        async with scheduler.slot(level=level):
+            admitted.append(name)
+            await asyncio.sleep(0)
+
+    tasks = []
+    for name, level in waiters:
+        tasks.append(asyncio.create_task(call(name, level)))
+        await asyncio.sleep(0)  # queued in this order
+    assert scheduler.stats()["in_flight"] == 1 and admitted == []
+    held.release()
+    await asyncio.gather(*tasks)
+    return admitted
+
+
+def test_interactive_calls_overtake_queued_batch_calls():
+    waiters = [("batch-1", BATCH), ("batch-2", BATCH), ("chat-1", INTERACTIVE), ("batch-3", BATCH),
+               ("chat-2", INTERACTIVE)]
+    admitted = asyncio.run(admit_in_order(ChatScheduler(max_concurrency=1), waiters))
+    assert admitted == ["chat-1", "chat-2", "batch-1", "batch-2", "batch-3"]
+
+
+def test_priority_comes_from_the_context():
+    async def main():
+        scheduler = ChatScheduler(max_concurrency=1)
+        held = await scheduler.acquire()
+        with rate_limiter.priority(BATCH):
+            background = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        live = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == {"interactive": 1, "batch": 1}
+        held.release()
+        await asyncio.sleep(0)
+        assert live.done() and not background.done()
+        (await live).release()
+        (await background).release()
+        assert scheduler.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_does_not_hold_a_slot():
+    async def main():
+        scheduler = ChatScheduler(max_concurrency=1)
+        held = await scheduler.acquire()
+        gave_up = asyncio.create_task(scheduler.acquire(level=INTERACTIVE))
+        waiting = asyncio.create_task(scheduler.acquire(level=BATCH))
+        await asyncio.sleep(0)
+        gave_up.cancel()
+        held.release()
+        permit = await asyncio.wait_for(waiting, 1)
+        assert scheduler.in_flight == 1
+        permit.release()
+        permit.release()  # idempotent
+        assert scheduler.in_flight == 0
+
+    asyncio.run(main())
+
+
+def test_throttled_response_halves_the_limit_and_pauses():
+    async def main():
+        scheduler = ChatScheduler(max_concurrency=8)
+        permit = await scheduler.acquire()
+        permit.observe(429, retry_after=0.05)
+        permit.release()
+        assert scheduler.limit == 4 and scheduler.throttled == 1
+        start = asyncio.get_running_loop().time()
+        (await scheduler.acquire()).release()
+        assert asyncio.get_running_loop().time() - start >= 0.04
+
+    asyncio.run(main())
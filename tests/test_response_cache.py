@@ -0,0 +1,97 @@
+import asyncio
+
+from common.response_cache import ResponseCache, memory_context, normalize
+from tech_support_flow import STATE_HARDWARE_ASK_SYMPTOMS, STATE_SOFTWARE_ASK_PROBLEM, TECH_SUPPORT_FLOW as FLOW
+
+
+def follow_up_key(cache: ResponseCache, text: str, topic: str, memory: dict | None = None) -> str | None:
+    # As 02_multi_choice_agent.py builds it
+    return cache.key(text, "TechSupportBot", topic, memory_context(memory, FLOW.memory_fields(topic)))
+
+
+def test_normalize():
+    assert normalize("  Thanks!!  So   much. ") == "thanks so much"
+
+
+def test_near_identical_follow_ups_share_a_key_across_sessions():
+    cache = ResponseCache()
+    # Different sessions, different symptoms typed earlier: the follow-up is the same
+    assert follow_up_key(cache, "Thanks!", STATE_HARDWARE_ASK_SYMPTOMS) == \
+        follow_up_key(cache, "thanks", STATE_HARDWARE_ASK_SYMPTOMS)
+    assert follow_up_key(cache, "How long will it take?", STATE_SOFTWARE_ASK_PROBLEM, {"software_name": "Excel"}) == \
+        follow_up_key(cache, "how long will it take", STATE_SOFTWARE_ASK_PROBLEM, {"software_name": "excel"})
+
+
+def test_key_depends_on_agent_topic_and_used_memory():
+    cache = ResponseCache()
+    base = follow_up_key(cache, "thanks", STATE_SOFTWARE_ASK_PROBLEM, {"software_name": "Excel"})
+    assert base != cache.key("thanks", "OtherBot", STATE_SOFTWARE_ASK_PROBLEM, memory_context(
+        {"software_name": "Excel"}, ["software_name"]))
+    assert base != follow_up_key(cache, "thanks", STATE_HARDWARE_ASK_SYMPTOMS, {"software_name": "Excel"})
+    assert base != follow_up_key(cache, "thanks", STATE_SOFTWARE_ASK_PROBLEM, {"software_name": "Outlook"})
+    assert base != follow_up_key(cache, "thanks", STATE_SOFTWARE_ASK_PROBLEM)
+
+
+def test_memory_the_prompt_does_not_use_is_ignored():
+    cache = ResponseCache()
+    # The hardware branch never mentions the software an earlier branch stored
+    assert follow_up_key(cache, "thanks", STATE_HARDWARE_ASK_SYMPTOMS, {"software_name": "Excel"}) == \
+        follow_up_key(cache, "thanks", STATE_HARDWARE_ASK_SYMPTOMS)
+
+
+def test_memory_context():
+    assert memory_context({"software_name": "Excel", "other": "x"}, ["software_name"]) == "software_name=excel"
+    assert memory_context(None, ["software_name"]) == "software_name="
+    assert memory_context({"a": "1"}, []) == ""
+
+
+def test_long_or_empty_inputs_are_not_cached():
+    cache = ResponseCache(max_input_chars=10)
+    assert cache.key("this is far too long to be a follow-up", "bot") is None
+    assert cache.key("?!", "bot") is None
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"      # "b" is now the least recently used
+    cache.put("c", "C")
+    assert cache.get("b") is None and cache.stats.evictions == 1
+
+    expired = ResponseCache(ttl=-1)
+    expired.put("a", "A")
+    assert expired.get("a") is None and expired.stats.expirations == 1
+
+
+def test_stream_caches_a_completed_answer_and_replays_it():
+    cache = ResponseCache()
+    calls = 0
+
+    async def produce():
+        nonlocal calls
+        calls += 1
+        for token in ["You're", " welcome", "!"]:
+            yield token
+
+    async def answer():
+        return "".join([token async for token in cache.stream("k", produce)])
+
+    assert asyncio.run(answer()) == "You're welcome!"
+    assert asyncio.run(answer()) == "You're welcome!"
+    assert calls == 1 and cache.stats.hits == 1
+
+
+def test_abandoned_stream_is_not_cached():
+    cache = ResponseCache()
+
+    async def produce():
+        yield "partial"
+        yield " answer"
+
+    async def abandon():
+        async for _ in cache.stream("k", produce):
+            break
+
+    asyncio.run(abandon())
+    assert len(cache) == 0
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from common import config
+from common.config import AzureOpenAISettings
+from common.fake_openai import FakeOpenAIServer
+from common.service_registry import PoolSettings, ServiceRegistry
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with FakeOpenAIServer(reply="Hello from the pool") as server:
+        monkeypatch.setattr(config, "_settings", AzureOpenAISettings(
+            api_key="test", endpoint=server.url, api_version="2024-10-21", deployment_name="gpt-4o"))
+        monkeypatch.delenv("SK_CASSETTE", raising=False)
+        yield server
+
+
+def test_pool_settings_from_env(monkeypatch):
+    monkeypatch.setenv("SK_POOL_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("SK_POOL_TIMEOUT", "2.5")
+    settings = PoolSettings.from_env()
+    assert settings.max_connections == 7 and settings.timeout == 2.5
+    assert settings.max_keepalive_connections == PoolSettings.max_keepalive_connections
+
+
+def test_agents_are_shared_per_name_and_instructions(server):
+    registry = ServiceRegistry(PoolSettings())
+    agent = registry.agent("Bot", "Be brief.")
+    assert registry.agent("Bot", "Be brief.") is agent
+    other = registry.agent("Bot", "Be verbose.")
+    assert other is not agent and other.kernel is agent.kernel is registry.kernel
+    assert registry.kernel.get_service() is registry.service
+    asyncio.run(registry.aclose())
+
+
+def test_sessions_reuse_one_pooled_connection(server):
+    registry = ServiceRegistry(PoolSettings())
+
+    async def main():
+        try:
+            for session in range(5):
+                agent = registry.agent("Bot", "Be brief.")
+                response = await agent.get_response(messages=f"hi from session {session}")
+                assert str(response.message.content) == "Hello from the pool"
+        finally:
+            await registry.aclose()
+
+    asyncio.run(main())
+    assert server.requests == 5 and server.connections == 1
+
+
+def test_aclose_forgets_the_service(server):
+    registry = ServiceRegistry(PoolSettings())
+    service = registry.service
+    asyncio.run(registry.aclose())
+    assert registry.transport is None
+    assert registry.service is not service
+    asyncio.run(registry.aclose())
+
+
+def test_missing_settings_fail_on_first_use(monkeypatch):
+    monkeypatch.setattr(config, "_settings", AzureOpenAISettings(None, None, None, None))
+    monkeypatch.delenv("SK_CASSETTE", raising=False)
+    registry = ServiceRegistry(PoolSettings())
+    with pytest.raises(config.ConfigError, match="AZURE_OPENAI_API_KEY"):
+        registry.service
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from common.session_store import InMemoryBackend, SessionRecord, SessionStore, SqliteBackend
+
+
+class OnboardingState(SessionRecord):
+    __slots__ = ("next_step", "name", "company")
+
+
+def test_records_have_their_slots_as_fields():
+    state = OnboardingState("t1", name="Ada")
+    assert OnboardingState.fields() == ("next_step", "name", "company")
+    assert state.to_dict() == {"next_step": None, "name": "Ada", "company": None}
+    with pytest.raises(AttributeError):
+        state.other = 1
+
+
+def test_missing_session_gets_a_fresh_record():
+    sessions = SessionStore(OnboardingState)
+    state = sessions.get("t1")
+    assert state.session_id == "t1" and state.next_step is None
+    state.next_step = "ask_company"
+    sessions.save(state)
+    assert sessions.get("t1").next_step == "ask_company"
+    sessions.discard("t1")
+    assert sessions.get("t1").next_step is None
+
+
+def test_idle_sessions_expire():
+    sessions = SessionStore(OnboardingState, ttl=60)
+    state = sessions.get("t1")
+    state.name = "Ada"
+    sessions.save(state)
+    state.touched = time.time() - 61
+    assert sessions.get("t1").name is None
+
+
+def test_in_memory_backend_evicts_least_recently_used():
+    sessions = SessionStore(OnboardingState, InMemoryBackend(max_sessions=2))
+    for session_id in ("a", "b"):
+        sessions.save(sessions.get(session_id))
+    sessions.get("a")  # "b" is now the least recently used
+    sessions.save(sessions.get("c"))
+    assert len(sessions.backend) == 2
+    assert sessions.backend.load("b", OnboardingState) is None
+
+
+def test_purge_drops_expired_records():
+    backend = InMemoryBackend()
+    sessions = SessionStore(OnboardingState, backend, ttl=60, purge_interval=0)
+    sessions.save(sessions.get("old"))
+    backend.load("old", OnboardingState).touched -= 120
+    sessions.save(sessions.get("new"))
+    assert len(backend) == 1
+
+
+def test_sqlite_state_survives_a_worker_restart(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = SessionStore(OnboardingState, SqliteBackend(path))
+    state = first.get("thread-1")
+    state.name, state.next_step = "Ada", "complete"
+    first.save(state)
+    first.backend.close()
+
+    restarted = SessionStore(OnboardingState, SqliteBackend(path))
+    state = restarted.get("thread-1")
+    assert (state.name, state.next_step) == ("Ada", "complete")
+    restarted.backend.close()
+
+
+def test_async_access_keeps_sqlite_off_the_event_loop(tmp_path):
+    backend = SqliteBackend(str(tmp_path / "sessions.db"))
+    threads = []
+    load = backend.load
+
+    def recording_load(*args):
+        threads.append(threading.current_thread())
+        return load(*args)
+
+    backend.load = recording_load
+    sessions = SessionStore(OnboardingState, backend)
+
+    async def main():
+        state = await sessions.aget("thread-1")
+        state.company = "Contoso"
+        await sessions.asave(state)
+        return await sessions.aget("thread-1")
+
+    assert asyncio.run(main()).company == "Contoso"
+    assert threads and threading.main_thread() not in threads
+    backend.close()
+
+
+def test_async_access_to_memory_stays_inline():
+    sessions = SessionStore(OnboardingState)
+
+    async def main():
+        state = await sessions.aget("t1")
+        state.name = "Ada"
+        await sessions.asave(state)
+        return sessions.get("t1").name
+
+    assert asyncio.run(main()) == "Ada"
@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+
+from common.single_flight import SingleFlight
+
+
+class Agent:
+    name = "TechSupportBot"
+    instructions = "You are a Tech Support Bot."
+    arguments = None
+
+
+def test_keys_normalize_messages_and_separate_agents():
+    agent, other = Agent(), Agent()
+    other.instructions = "You are a pirate."
+    key = SingleFlight.key(agent, [{"role": "user", "content": "My WiFi is down!"}])
+    assert key == SingleFlight.key(agent, [{"role": "user", "content": "my wifi is down"}])
+    assert key != SingleFlight.key(other, [{"role": "user", "content": "my wifi is down"}])
+    assert key != SingleFlight.key(agent, [{"role": "assistant", "content": "my wifi is down"}])
+
+
+def test_only_the_last_user_message_is_normalized():
+    agent = Agent()
+
+    def history(topic, follow_up):
+        return [{"role": "user", "content": f"How do I install {topic}?"},
+                {"role": "assistant", "content": "Download the installer."},
+                {"role": "user", "content": follow_up}]
+
+    key = SingleFlight.key(agent, history("C++", "Thanks!"))
+    assert key == SingleFlight.key(agent, history("C++", "thanks"))
+    assert key != SingleFlight.key(agent, history("C#", "Thanks!"))
+    assert key != SingleFlight.key(agent, history("c++", "Thanks!"))
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def produce():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def run():
+        return await asyncio.gather(*(flight.call("k", produce) for _ in range(10)))
+
+    assert asyncio.run(run()) == ["answer"] * 10
+    assert calls == 1
+    assert (flight.stats.flights, flight.stats.shared) == (1, 9)
+    assert flight.in_flight == 0
+
+
+def test_cancelling_one_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+
+    async def produce():
+        await asyncio.sleep(0.02)
+        return "answer"
+
+    async def run():
+        first = asyncio.create_task(flight.call("k", produce))
+        second = asyncio.create_task(flight.call("k", produce))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second, first
+
+    result, first = asyncio.run(run())
+    assert result == "answer" and first.cancelled()
+    assert flight.stats.abandoned == 0
+
+
+def test_call_abandoned_by_every_caller_is_cancelled():
+    flight = SingleFlight()
+
+    async def run():
+        stopped = asyncio.Event()
+
+        async def produce():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        task = asyncio.create_task(flight.call("k", produce))
+        await asyncio.sleep(0.005)
+        task.cancel()
+        await asyncio.wait_for(stopped.wait(), 1)
+
+    asyncio.run(run())
+    assert flight.stats.abandoned == 1
+    assert flight.in_flight == 0
+
+
+def test_stream_fans_out_every_chunk_and_late_subscribers_catch_up():
+    flight = SingleFlight()
+    generations = 0
+
+    async def produce():
+        nonlocal generations
+        generations += 1
+        for token in ["a", "b", "c"]:
+            await asyncio.sleep(0.005)
+            yield token
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in flight.stream("k", produce)]
+
+    async def run():
+        return await asyncio.gather(consume(0), consume(0.008))
+
+    assert asyncio.run(run()) == [["a", "b", "c"], ["a", "b", "c"]]
+    assert generations == 1
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def produce():
+        await asyncio.sleep(0.005)
+        raise RuntimeError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(flight.call("k", produce), flight.call("k", produce), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+
+
+def test_no_key_means_no_sharing():
+    flight = SingleFlight()
+    calls = 0
+
+    async def produce():
+        nonlocal calls
+        calls += 1
+        number = calls
+        await asyncio.sleep(0)
+        return number
+
+    async def run():
+        return await asyncio.gather(flight.call(None, produce), flight.call(None, produce))
+
+    assert sorted(asyncio.run(run())) == [1, 2]
+    assert flight.stats.flights == 0
+
+
+@pytest.mark.parametrize("key", ["k", None])
+def test_stream_without_subscribers_left_is_closed(key):
+    flight = SingleFlight()
+    closed = False
+
+    async def produce():
+        nonlocal closed
+        try:
+            for token in ["a", "b"]:
+                yield token
+                await asyncio.sleep(0.005)
+        finally:
+            closed = True
+
+    async def run():
+        async for _ in flight.stream(key, produce):
+            break
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert closed
@@ -0,0 +1,81 @@
+import asyncio
+
+from common.streaming import TokenCoalescer
+
+
+def test_first_token_goes_out_alone_and_the_rest_in_batches():
+    async def main():
+        sent = []
+
+        async def send(chunk):
+            sent.append(chunk)
+
+        stream = TokenCoalescer(send, interval=60, max_chars=10)
+        for token in ["Hello", " there", ", how", " can", " I", " help?"]:
+            await stream.push(token)
+        await stream.aclose()
+        return sent, stream.text
+
+    sent, text = asyncio.run(main())
+    assert sent[0] == "Hello" and len(sent) < 6
+    assert "".join(sent) == text == "Hello there, how can I help?"
+
+
+def test_quiet_model_is_flushed_by_the_timer():
+    async def main():
+        sent = []
+
+        async def send(chunk):
+            sent.append(chunk)
+
+        stream = TokenCoalescer(send, interval=0.01, max_chars=1000)
+        await stream.push("a")
+        await stream.push("b")
+        await asyncio.sleep(0.05)
+        assert sent == ["a", "b"]
+        await stream.aclose()
+
+    asyncio.run(main())
+
+
+def test_close_during_a_timer_flush_sends_every_chunk_once():
+    async def main():
+        sent = []
+        started = asyncio.Event()
+
+        async def slow_send(chunk):
+            started.set()
+            await asyncio.sleep(0.02)
+            sent.append(chunk)
+
+        stream = TokenCoalescer(slow_send, interval=0.01, max_chars=1000)
+        await stream.push("first")
+        started.clear()
+        await stream.push(" second")
+        await started.wait()       # the timer's flush is sending " second"
+        await stream.push(" third")
+        await stream.aclose()
+        return sent
+
+    assert asyncio.run(main()) == ["first", " second", " third"]
+
+
+def test_close_on_error_sends_the_buffer():
+    async def main():
+        sent = []
+
+        async def send(chunk):
+            sent.append(chunk)
+
+        stream = TokenCoalescer(send, interval=60, max_chars=1000)
+        try:
+            await stream.push("partial")
+            await stream.push(" answer")
+            raise ConnectionError
+        except ConnectionError:
+            pass
+        finally:
+            await stream.aclose()
+        return sent
+
+    assert asyncio.run(main()) == ["partial", " answer"]
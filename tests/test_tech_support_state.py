@@ -0,0 +1,49 @@
+import pytest
+
+from common.history import BoundedHistory
+from tech_support_flow import (STATE_FINAL, STATE_INITIAL, STATE_SOFTWARE_ASK_NAME, STATE_SOFTWARE_ASK_PROBLEM,
+                               TECH_SUPPORT_FLOW as FLOW)
+from tech_support_state import TechSupportSession
+
+
+def new_session(state: str = STATE_INITIAL, conversation_id: str = "thread-1") -> TechSupportSession:
+    return TechSupportSession(None, BoundedHistory(), state, conversation_id)
+
+
+def test_states_are_interned_also_when_restored():
+    # Built at run time, like a state read back from the conversation log
+    restored = "".join(["SOFTWARE_", "ASK_NAME"])
+    assert restored is not STATE_SOFTWARE_ASK_NAME
+    session = new_session(restored)
+    assert session.state is new_session(STATE_SOFTWARE_ASK_NAME).state
+    session.move_to("".join(["SOFTWARE_", "ASK_PROBLEM"]))
+    assert session.state is new_session(STATE_SOFTWARE_ASK_PROBLEM).state
+
+
+def test_move_to_remembers_where_the_conversation_came_from():
+    session = new_session()
+    assert session.topic is None
+    session.move_to(STATE_SOFTWARE_ASK_NAME)
+    session.move_to(STATE_SOFTWARE_ASK_PROBLEM)
+    session.move_to(STATE_FINAL)
+    assert (session.state, session.topic) == (STATE_FINAL, STATE_SOFTWARE_ASK_PROBLEM)
+    # Follow-ups stay in STATE_FINAL and keep the topic they are about
+    session.move_to(STATE_FINAL)
+    assert session.topic == STATE_SOFTWARE_ASK_PROBLEM
+
+
+def test_memory_is_created_with_the_first_value():
+    session = new_session()
+    assert session.memory is None
+    session.remember("software_name", "Excel")
+    session.remember("software_name", "Outlook")
+    assert session.memory == {"software_name": "Outlook"}
+    assert FLOW.dispatch(STATE_SOFTWARE_ASK_PROBLEM, text="it crashes", memory=session.memory).response.startswith(
+        "Thanks for explaining the issue with Outlook")
+
+
+def test_sessions_are_slotted():
+    session = new_session()
+    with pytest.raises(AttributeError):
+        session.language = "en"
+    assert not hasattr(session, "__dict__")
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from semantic_kernel import Kernel
+from semantic_kernel.functions import kernel_function
+
+from common import telemetry
+from common.telemetry import NOOP_TURN, Histogram, instrument_kernel, registry
+
+
+@pytest.fixture
+def sampled():
+    registry.clear()
+    telemetry.set_sample_rate(1)
+    yield registry
+    telemetry.set_sample_rate(0)
+    registry.clear()
+
+
+def recorded(name: str) -> list[dict]:
+    return [row for row in registry.snapshot() if row["name"] == name]
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert histogram.count == 100 and histogram.max == 0.1
+    assert histogram.mean == pytest.approx(0.0505)
+    # Bucket upper bounds are at most 19 % above the true value
+    assert 0.050 <= histogram.percentile(0.5) <= 0.050 * 1.19
+    assert 0.095 <= histogram.percentile(0.95) <= 0.1
+    assert Histogram().percentile(0.5) == 0.0
+
+
+def test_unsampled_turns_record_nothing():
+    registry.clear()
+    telemetry.set_sample_rate(0)
+    with telemetry.turn("message") as turn:
+        assert turn is NOOP_TURN and telemetry.current_turn() is NOOP_TURN
+        with turn.span("transition"):
+            pass
+    assert registry.snapshot() == []
+
+
+def test_turn_spans_ttft_and_sends(sampled):
+    async def send(chunk):
+        await asyncio.sleep(0.001)
+
+    async def main():
+        with telemetry.turn("message", state="FINAL") as turn:
+            with turn.span("transition"):
+                pass
+            timed_send = turn.wrap("ui.send", send)
+            for token in ["a", "b"]:
+                turn.first_token()
+                await timed_send(token)
+            await telemetry.timed("ui.send", send("done"))
+
+    asyncio.run(main())
+    assert recorded("turn")[0]["labels"] == {"kind": "message", "state": "FINAL"}
+    assert recorded("transition")[0]["count"] == 1
+    assert recorded("llm.ttft")[0]["count"] == 1
+    assert recorded("ui.send")[0]["count"] == 3
+    assert telemetry.current_turn() is NOOP_TURN
+
+
+class Menu:
+    @kernel_function(name="get_specials")
+    def get_specials(self) -> str:
+        return "Clam Chowder"
+
+
+def test_kernel_filters_time_tool_calls_of_the_current_turn(sampled):
+    kernel = instrument_kernel(Kernel())
+    assert instrument_kernel(kernel) is kernel and len(kernel.function_invocation_filters) == 1
+    kernel.add_plugin(Menu(), plugin_name="Menu")
+
+    async def main():
+        await kernel.invoke(plugin_name="Menu", function_name="get_specials")  # outside a turn
+        with telemetry.turn("message"):
+            return await kernel.invoke(plugin_name="Menu", function_name="get_specials")
+
+    assert str(asyncio.run(main())) == "Clam Chowder"
+    [tool] = recorded("tool")
+    assert tool["labels"] == {"function": "Menu-get_specials"} and tool["count"] == 1
+
+
+def test_exporters_see_every_value(sampled):
+    seen = []
+    registry.exporters.append(lambda name, seconds, labels: seen.append((name, labels)))
+    try:
+        with telemetry.turn("action", state="INITIAL"):
+            pass
+    finally:
+        registry.exporters.pop()
+    assert seen == [("turn", {"kind": "action", "state": "INITIAL"})]
+    assert "turn{kind=action,state=INITIAL}" in registry.report()
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Annotated
+
+from semantic_kernel import Kernel
+from semantic_kernel.functions import kernel_function
+
+from common.tool_cache import ToolResultCache, canonical_arguments
+
+
+class FakeGithub:
+    """Stands in for the MCP server's tools: counts the calls that get through."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    @kernel_function(name="get_issue")
+    async def get_issue(self, issue_number: Annotated[int, "Issue number"], repo: Annotated[str, "Repository"] = "sk"):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"issue {issue_number} of {repo} (call {self.calls})"
+
+    @kernel_function(name="create_issue")
+    async def create_issue(self, title: Annotated[str, "Title"]):
+        self.calls += 1
+        return f"created {title}"
+
+
+def make_kernel(cache: ToolResultCache, github: FakeGithub) -> Kernel:
+    kernel = Kernel()
+    kernel.add_plugin(github, plugin_name="Github")
+    kernel.add_filter("function_invocation", cache)
+    return kernel
+
+
+def invoke(kernel: Kernel, function_name: str, **arguments):
+    return kernel.invoke(plugin_name="Github", function_name=function_name, **arguments)
+
+
+def test_canonical_arguments_ignore_order_and_none():
+    assert canonical_arguments({"b": 1, "a": "x", "c": None}) == canonical_arguments({"a": "x", "b": 1})
+
+
+def test_repeated_read_is_served_from_the_cache():
+    github = FakeGithub()
+    cache = ToolResultCache(plugin_names={"Github"}, ttls={"get_issue": 60})
+    kernel = make_kernel(cache, github)
+
+    async def run():
+        first = await invoke(kernel, "get_issue", issue_number=1)
+        second = await invoke(kernel, "get_issue", issue_number=1)
+        other = await invoke(kernel, "get_issue", issue_number=2)
+        return str(first), str(second), str(other)
+
+    first, second, other = asyncio.run(run())
+    assert first == second == "issue 1 of sk (call 1)"
+    assert other == "issue 2 of sk (call 2)"
+    assert github.calls == 2
+    assert (cache.stats["get_issue"].hits, cache.stats["get_issue"].misses) == (1, 2)
+
+
+def test_concurrent_identical_reads_are_coalesced():
+    github = FakeGithub(delay=0.01)
+    cache = ToolResultCache(plugin_names={"Github"}, ttls={"get_issue": 60})
+    kernel = make_kernel(cache, github)
+
+    async def run():
+        return await asyncio.gather(*(invoke(kernel, "get_issue", issue_number=7) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert {str(r) for r in results} == {"issue 7 of sk (call 1)"}
+    assert github.calls == 1
+    assert cache.stats["get_issue"].coalesced == 4
+
+
+def test_tools_without_ttl_and_other_plugins_are_not_cached():
+    github = FakeGithub()
+    cache = ToolResultCache(plugin_names={"Other"}, ttls={"get_issue": 60})
+    kernel = make_kernel(cache, github)
+    writes = ToolResultCache(plugin_names={"Github"}, ttls={"get_issue": 60})
+    write_kernel = make_kernel(writes, FakeGithub())
+
+    async def run():
+        await invoke(kernel, "get_issue", issue_number=1)
+        await invoke(kernel, "get_issue", issue_number=1)
+        await invoke(write_kernel, "create_issue", title="bug")
+        await invoke(write_kernel, "create_issue", title="bug")
+
+    asyncio.run(run())
+    assert github.calls == 2
+    assert len(cache) == 0 and len(writes) == 0
+
+
+def test_expired_results_are_fetched_again():
+    github = FakeGithub()
+    cache = ToolResultCache(plugin_names={"Github"}, ttls={"get_issue": 0.01})
+    kernel = make_kernel(cache, github)
+
+    async def run():
+        await invoke(kernel, "get_issue", issue_number=1)
+        await asyncio.sleep(0.02)
+        await invoke(kernel, "get_issue", issue_number=1)
+
+    asyncio.run(run())
+    assert github.calls == 2
+    assert cache.stats["get_issue"].expirations == 1
+
+
+def test_lru_keeps_at_most_max_entries():
+    cache = ToolResultCache(plugin_names={"Github"}, ttls={"get_issue": 60}, max_entries=2)
+    kernel = make_kernel(cache, FakeGithub())
+
+    async def run():
+        for number in range(4):
+            await invoke(kernel, "get_issue", issue_number=number)
+
+    asyncio.run(run())
+    assert len(cache) == 2 and cache.evictions == 2